@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import random
+import time
+
+from app.api.bluesky_client import get_credentials, parse_post
+
+logger = logging.getLogger(__name__)
+
+PER_PAGE = 100  # Bluesky API limit is 100 per request
+MAX_PAGES = 10  # Same page cap as fetch_public_posts, per query
+
+
+def _default_client_factory():
+    from atproto import AsyncClient
+    return AsyncClient()
+
+
+def _status_code(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retry_after(error):
+    """Seconds to wait before retrying a rate limited request, from the response headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    headers = {str(k).lower(): v for k, v in headers.items()}
+
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+    if "ratelimit-reset" in headers:
+        try:
+            return max(0.0, float(headers["ratelimit-reset"]) - time.time())
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+class AsyncBlueskyFetcher:
+    """
+    Fetches Bluesky search results with asyncio.
+
+    The fetcher logs in once and reuses the session for every request,
+    logging in again only when the server rejects it. Several queries are
+    paged concurrently, bounded by max_concurrency in-flight requests, and
+    failed requests are retried with exponential backoff (waiting out the
+    server's rate limit window on 429s).
+
+    client_factory must return an object shaped like atproto.AsyncClient:
+    an awaitable login(handle, password) and an awaitable
+    app.bsky.feed.search_posts(params=...). Tests pass a local stub here.
+    """
+
+    def __init__(self, client_factory=None, credentials=None, max_concurrency=4,
+                 max_retries=3, backoff_seconds=0.5, max_backoff_seconds=30.0):
+        self.client_factory = client_factory or _default_client_factory
+        self.credentials = credentials
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._client = None
+        self._login_lock = None
+        self._semaphore = None
+        self.login_count = 0
+
+    def _ensure_primitives(self):
+        # Created lazily so they bind to the event loop that actually runs the fetch
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _get_client(self, refresh=False, stale=None):
+        self._ensure_primitives()
+        async with self._login_lock:
+            # If another task already replaced the stale client, use the new one
+            if self._client is not None and not (refresh and self._client is stale):
+                return self._client
+
+            handle, password = self.credentials or get_credentials()
+            client = self.client_factory()
+            await client.login(handle, password)
+            self.login_count += 1
+            self._client = client
+            return client
+
+    async def _search(self, params):
+        client = await self._get_client()
+        attempt = 0
+
+        while True:
+            try:
+                async with self._semaphore:
+                    return await client.app.bsky.feed.search_posts(params=params)
+            except Exception as e:
+                status = _status_code(e)
+                if attempt >= self.max_retries or status in (400, 403, 404):
+                    raise
+                attempt += 1
+
+                if status == 401:
+                    # Session was revoked or could not be refreshed; log in again
+                    client = await self._get_client(refresh=True, stale=client)
+                    continue
+
+                delay = None
+                if status == 429:
+                    delay = _retry_after(e)
+                if delay is None:
+                    delay = self.backoff_seconds * (2 ** (attempt - 1))
+                    delay += random.uniform(0, self.backoff_seconds)
+                delay = min(delay, self.max_backoff_seconds)
+
+                logger.warning(f"search_posts failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def stream_posts(self, query="tech", limit=100):
+        """Yields post dicts for one query as each page arrives."""
+        cursor = None
+        count = 0
+        per_page = min(PER_PAGE, limit)
+
+        for _ in range(MAX_PAGES):
+            if count >= limit:
+                break
+
+            params = {"q": query, "limit": per_page}
+            if cursor:
+                params["cursor"] = cursor
+
+            try:
+                search_res = await self._search(params)
+            except Exception as e:
+                # If pagination fails, stop this query with what we have
+                logger.error(f"Error during pagination for '{query}': {e}")
+                break
+
+            if not search_res or not getattr(search_res, "posts", None):
+                break
+
+            for post in search_res.posts:
+                if count >= limit:
+                    break
+                try:
+                    parsed = parse_post(post)
+                except Exception:
+                    # Skip posts that can't be parsed
+                    continue
+                if parsed:
+                    count += 1
+                    yield parsed
+
+            cursor = getattr(search_res, "cursor", None)
+            if not cursor:
+                break
+
+    async def stream_many(self, queries, limit=100):
+        """
+        Pages several queries concurrently and yields (query, post) pairs
+        in arrival order. limit applies to each query.
+        """
+        self._ensure_primitives()
+        queue = asyncio.Queue()
+        done = object()
+
+        async def pump(query):
+            try:
+                async for post in self.stream_posts(query, limit):
+                    await queue.put((query, post))
+            finally:
+                await queue.put(done)
+
+        tasks = [asyncio.create_task(pump(query)) for query in queries]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            # Stop paging if the consumer went away early
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_posts(self, query="tech", limit=100):
+        return [post async for post in self.stream_posts(query, limit)]
+
+    async def fetch_many(self, queries, limit=100):
+        """Returns {query: [posts]} for several queries fetched concurrently."""
+        results = {query: [] for query in queries}
+        async for query, post in self.stream_many(queries, limit):
+            results[query].append(post)
+        return results
@@ -1,29 +1,76 @@
 from atproto import Client
 from dotenv import load_dotenv
+import logging
 import os
+import threading
 
 load_dotenv()
 
-def get_client():
+logger = logging.getLogger(__name__)
+
+# One logged-in client per process. atproto refreshes the access token on its own,
+# so there is no need to log in again for every pipeline run.
+_client = None
+_client_lock = threading.Lock()
+
+def get_credentials():
     handle = os.getenv("BSKY_HANDLE")
     password = os.getenv("BSKY_APP_PASSWORD")
 
     if not handle or not password:
         raise ValueError("Bluesky credentials not found in .env")
 
-    client = Client()
-    client.login(handle, password)
-    return client
+    return handle, password
+
+def get_client(refresh=False):
+    global _client
+
+    with _client_lock:
+        if _client is None or refresh:
+            handle, password = get_credentials()
+            client = Client()
+            client.login(handle, password)
+            _client = client
+        return _client
+
 
+def is_auth_error(error):
+    """True when the server rejected the session (401, or an expired/invalid token)."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status == 401:
+        return True
+    content = getattr(response, "content", None)
+    return status == 400 and getattr(content, "error", None) in ("ExpiredToken", "InvalidToken")
 
-def fetch_public_posts(limit=100, query="tech"):
+
+def parse_post(post):
+    """Converts a search_posts result into the post dict used by the pipeline, or None if it has no text."""
+    record = post.record
+    # Check if record has text (it might be an image post or other type)
+    text = getattr(record, 'text', '')
+    if not text:
+        return None
+
+    return {
+        "uri": getattr(post, 'uri', None),
+        "text": text,
+        "created_at": getattr(record, 'created_at', ''),
+        "likes": post.like_count or 0,
+        "reposts": post.repost_count or 0
+    }
+
+
+def fetch_public_posts(limit=100, query="tech", since=None):
+    """Newest posts matching query. since (ISO timestamp) restricts the search to posts after it."""
     client = get_client()
 
     posts = []
     cursor = None
     max_iterations = 10  # Prevent infinite loops
     per_page = min(100, limit)  # Bluesky API limit is 100 per request
-    
+    relogged = False
+
     for iteration in range(max_iterations):
         if len(posts) >= limit:
             break
@@ -33,8 +80,19 @@ def fetch_public_posts(limit=100, query="tech"):
             params = {'q': query, 'limit': per_page}
             if cursor:
                 params['cursor'] = cursor
+            if since:
+                params['since'] = since
             
-            search_res = client.app.bsky.feed.search_posts(params=params)
+            try:
+                search_res = client.app.bsky.feed.search_posts(params=params)
+            except Exception as e:
+                if relogged or not is_auth_error(e):
+                    raise
+                # Session expired and could not be refreshed; log in again once
+                logger.warning(f"Bluesky session rejected ({e}), logging in again")
+                relogged = True
+                client = get_client(refresh=True)
+                search_res = client.app.bsky.feed.search_posts(params=params)
             
             if not search_res or not hasattr(search_res, 'posts') or not search_res.posts:
                 break
@@ -43,18 +101,11 @@ def fetch_public_posts(limit=100, query="tech"):
                 if len(posts) >= limit:
                     break
                 try:
-                    record = post.record
-                    # Check if record has text (it might be an image post or other type)
-                    text = getattr(record, 'text', '')
-                    if not text:
+                    parsed = parse_post(post)
+                    if not parsed:
                         continue
                         
-                    posts.append({
-                        "text": text,
-                        "created_at": getattr(record, 'created_at', ''),
-                        "likes": post.like_count or 0,
-                        "reposts": post.repost_count or 0
-                    })
+                    posts.append(parsed)
                 except Exception as e:
                     # Skip posts that can't be parsed
                     continue
@@ -66,7 +117,7 @@ def fetch_public_posts(limit=100, query="tech"):
                 
         except Exception as e:
             # If pagination fails, just return what we have
-            print(f"Error during pagination: {e}")
+            logger.error(f"Error during pagination for '{query}': {e}")
             break
 
     return posts[:limit]
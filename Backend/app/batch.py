@@ -0,0 +1,164 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.trends.trend_detector import calculate_engagement
+
+# Posts converted per step in to_records
+RECORD_BLOCK = 8192
+
+
+class PostBatch:
+    """
+    Prepared posts as columns: NumPy arrays for the numeric fields and plain
+    lists for the strings, one entry per post, instead of one dict per post.
+
+    Topic assignments are stored CSR-style: the topics of post i are
+    topic_index[topic_offsets[i]:topic_offsets[i + 1]] (indices into the run's
+    trend list), most important first, so single- and multi-topic runs share
+    one layout and per-topic aggregates are bincount reductions over it.
+    """
+
+    def __init__(self, ids, uris, texts, cleaned_texts, created_at, likes, reposts,
+                 duplicate_count, sentiment_score, sentiment_label):
+        self.ids = ids
+        self.uris = uris
+        self.texts = texts
+        self.cleaned_texts = cleaned_texts
+        self.created_at = created_at
+        self.likes = np.asarray(likes, dtype=np.int64)
+        self.reposts = np.asarray(reposts, dtype=np.int64)
+        self.engagement = calculate_engagement(self.likes, self.reposts)
+        self.duplicate_count = np.asarray(duplicate_count, dtype=np.int64)
+        self.sentiment_score = np.asarray(sentiment_score, dtype=np.float64)
+        self.sentiment_label = sentiment_label
+        self.topic_offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        self.topic_index = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def from_posts(cls, posts: List[Dict[str, Any]]) -> "PostBatch":
+        """Builds a batch from prepared post dicts (pipeline.prepare_post)."""
+        return cls(
+            ids=[post["id"] for post in posts],
+            uris=[post.get("uri") for post in posts],
+            texts=[post["original_text"] for post in posts],
+            cleaned_texts=[post["cleaned_text"] for post in posts],
+            created_at=[post["created_at"] for post in posts],
+            likes=np.fromiter((post["likes"] for post in posts), dtype=np.int64, count=len(posts)),
+            reposts=np.fromiter((post["reposts"] for post in posts), dtype=np.int64, count=len(posts)),
+            duplicate_count=np.fromiter(
+                (post.get("duplicate_count", 1) for post in posts), dtype=np.int64, count=len(posts)
+            ),
+            sentiment_score=np.fromiter(
+                (post["sentiment_score"] for post in posts), dtype=np.float64, count=len(posts)
+            ),
+            sentiment_label=[post["sentiment_label"] for post in posts],
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set_topics(self, matches: List[List[str]], topic_numbers: Dict[str, int]):
+        """
+        Sets each post's topics from its matched topic names, most important
+        first ([] for unassigned posts); topic_numbers maps a name to its index.
+        """
+        counts = np.fromiter((len(match) for match in matches), dtype=np.int64, count=len(matches))
+        self.topic_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.topic_index = np.fromiter(
+            (topic_numbers[name] for match in matches for name in match), dtype=np.int32, count=int(counts.sum())
+        )
+
+    def topic_counts(self) -> np.ndarray:
+        """Number of topics per post."""
+        return np.diff(self.topic_offsets)
+
+    def assigned(self) -> np.ndarray:
+        """Indices of the posts with at least one topic, in batch order."""
+        return np.flatnonzero(self.topic_counts())
+
+    def topic_entries(self):
+        """(post, topic) index pairs of every assignment, as two aligned arrays."""
+        return np.repeat(np.arange(len(self)), self.topic_counts()), self.topic_index
+
+    def group_by_topic(self, n_topics: int) -> Dict[str, np.ndarray]:
+        """
+        Per-topic post_count, engagement_score and sentiment_sum. A collapsed
+        cluster counts as duplicate_count posts with its representative's sentiment.
+        """
+        counts = self.topic_counts()
+
+        def total(column):
+            # Each post's value repeated once per topic it belongs to, summed per topic
+            return np.bincount(self.topic_index, weights=np.repeat(column, counts), minlength=n_topics)
+
+        return {
+            "post_count": total(self.duplicate_count).astype(np.int64),
+            "engagement_score": total(self.engagement).astype(np.int64),
+            "sentiment_sum": total(self.sentiment_score * self.duplicate_count),
+        }
+
+    def group_by_category(self, topic_category: np.ndarray, n_categories: int) -> Dict[str, np.ndarray]:
+        """
+        Per-category post_count, engagement_score and sentiment_sum, like group_by_topic,
+        but a post counts once per category even when several of its topics share it.
+        topic_category maps each topic number to its category number.
+        """
+        posts, topics = self.topic_entries()
+        if n_categories == 0 or len(posts) == 0:
+            posts = categories = np.zeros(0, dtype=np.int64)
+        else:
+            # Distinct (post, category) pairs
+            pairs = np.unique(posts * n_categories + topic_category[topics])
+            posts, categories = np.divmod(pairs, n_categories)
+
+        def total(column):
+            return np.bincount(categories, weights=column[posts], minlength=n_categories)
+
+        return {
+            "post_count": total(self.duplicate_count).astype(np.int64),
+            "engagement_score": total(self.engagement).astype(np.int64),
+            "sentiment_sum": total(self.sentiment_score * self.duplicate_count),
+        }
+
+    def to_records(self, indices, topic_ids: List[str]) -> List[Dict[str, Any]]:
+        """The posts at indices in the API's post format; topic_ids maps topic index to topic id."""
+        indices = np.asarray(indices, dtype=np.int64)
+        records = []
+        # Columns are converted to Python objects a block at a time, bounding the temporary lists
+        for block_start in range(0, len(indices), RECORD_BLOCK):
+            block = indices[block_start:block_start + RECORD_BLOCK]
+            starts = self.topic_offsets[block]
+            ends = self.topic_offsets[block + 1]
+            # Topic ids of every assignment in the range the block covers, sliced per post below
+            first = int(starts.min())
+            entry_ids = [topic_ids[topic] for topic in self.topic_index[first:int(ends.max())].tolist()]
+            for i, start, end, sentiment, engagement, likes, reposts, duplicates in zip(
+                block.tolist(), (starts - first).tolist(), (ends - first).tolist(),
+                self.sentiment_score[block].tolist(), self.engagement[block].tolist(),
+                self.likes[block].tolist(), self.reposts[block].tolist(),
+                self.duplicate_count[block].tolist()
+            ):
+                post_topics = entry_ids[start:end]
+                records.append({
+                    "id": self.ids[i],
+                    "topic_id": post_topics[0] if post_topics else None,
+                    "topic_ids": post_topics,
+                    "text": self.texts[i],
+                    "sentiment_score": sentiment,
+                    "posted_at": self.created_at[i],
+                    "engagement_score": engagement,
+                    "likes": likes,
+                    "reposts": reposts,
+                    "duplicate_count": duplicates
+                })
+        return records
+
+    def trend_posts(self) -> List[Dict[str, Any]]:
+        """Post dicts with the fields trend detection reads, for code that needs dicts (e.g. worker processes)."""
+        return [
+            {"text": text, "likes": likes, "reposts": reposts, "created_at": created_at}
+            for text, likes, reposts, created_at in zip(
+                self.cleaned_texts, self.likes.tolist(), self.reposts.tolist(), self.created_at
+            )
+        ]
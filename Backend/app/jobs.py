@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
+
+from app.pipeline import run_pipeline
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How long a finished run is served to repeat callers, and how long job ids stay pollable
+RESULT_TTL_SECONDS = float(os.getenv("RESULT_TTL_SECONDS", "60"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, key):
+        self.id = str(uuid.uuid4())
+        self.key = key
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.future = None
+        self.view = None  # app.results.RunView, built on first read
+
+    def to_dict(self, include_result=False):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "params": dict(self.key),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Runs pipeline jobs on a small thread pool.
+
+    Identical in-flight requests (same pipeline parameters) share one job
+    instead of each doing the full fetch and inference, and completed
+    results are kept for RESULT_TTL_SECONDS so repeat callers are answered
+    from memory.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, result_ttl=RESULT_TTL_SECONDS, job_ttl=JOB_TTL_SECONDS,
+                 runner=run_pipeline):
+        self.runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline-job")
+        self._lock = threading.Lock()
+        self._jobs = TTLCache(maxsize=10000, ttl=job_ttl)
+        self._in_flight = {}  # key -> Job
+        self._results = TTLCache(maxsize=256, ttl=result_ttl)  # key -> finished Job
+
+    def submit(self, **params):
+        """Returns the job for these parameters, reusing a cached or running one when possible."""
+        key = tuple(sorted(params.items()))
+        with self._lock:
+            job = self._results.get(key) or self._in_flight.get(key)
+            if job is not None:
+                return job
+
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            job.future = self._executor.submit(self._run, job)
+        # Outside the lock: the callback runs right away if the future is already done
+        job.future.add_done_callback(lambda future: self._cancelled(job, future))
+        return job
+
+    def _cancelled(self, job, future):
+        # A job cancelled while still queued never reaches _run's cleanup, and would
+        # otherwise be handed to every later request with the same parameters
+        if not future.cancelled():
+            return
+        job.status = FAILED
+        job.error = "Job was cancelled"
+        job.finished_at = time.time()
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    async def wait(self, job):
+        """
+        Waits for the job from async code. Shielded: a cancelled caller (e.g. a
+        disconnected client) must not cancel the run the job shares with others.
+        """
+        await asyncio.shield(asyncio.wrap_future(job.future))
+
+    def _run(self, job):
+        job.status = RUNNING
+        try:
+            job.result = self.runner(**dict(job.key))
+            job.status = DONE
+        except Exception as e:
+            logger.error(f"Pipeline job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+                # Failures aren't cached so the next request retries
+                if job.status == DONE:
+                    self._results[job.key] = job
+                    self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+jobs = JobManager()
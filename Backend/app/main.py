@@ -1,10 +1,22 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import logging
+import os
+import time
 
+from app.jobs import jobs, DONE, FAILED
 from app.pipeline import run_pipeline
+from app.progress import stream_events
+from app.results import view_for, parse_fields, TOPIC_FIELDS, POST_FIELDS
+from app.streaming import get_stream
+from app.storage.rollups import get_rollup_store, hour_iso, HOUR, TOPIC, CATEGORY
+from app.ml.registry import models
+from app.trends.velocity import RANKINGS, parse_timestamp
+from app import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +33,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Load models in a background thread at startup so the first request doesn't pay for it.
+# With MODEL_WARMUP=false models load lazily on the first /pipeline/run call instead.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes")
+
+@app.on_event("startup")
+def warm_up_models():
+    if MODEL_WARMUP:
+        models.warm_up(background=True)
+
 # --- Data Models (Strictly aligned with requirements) ---
 
 class Category(BaseModel):
@@ -38,26 +59,48 @@ class Topic(BaseModel):
     post_count: int
     engagement_score: int
     avg_sentiment: float
+    # Only generated when the run asks for summaries; None if skipped by the latency budget
+    summary: Optional[str] = None
 
 class Post(BaseModel):
     id: str
     topic_id: str
+    topic_ids: List[str] = []
     text: str
     sentiment_score: float
     posted_at: str
     engagement_score: int
+    # Near-duplicate posts collapsed into this one (their engagement is included)
+    duplicate_count: int = 1
 
 class PipelineResponse(BaseModel):
     categories: List[Category]
     topics: List[Topic]
     posts: List[Post]
+    # Per-stage wall/CPU time, item counts and model calls of the run, when requested
+    timings: Optional[Dict[str, Any]] = None
 
 # --- Endpoints ---
 
+def _ranking(ranking):
+    if ranking not in RANKINGS:
+        raise HTTPException(status_code=400, detail=f"ranking must be one of {', '.join(RANKINGS)}")
+    return ranking
+
+def _with_timings(result, timings):
+    """Drops the run's timings block unless the caller asked for it."""
+    if timings:
+        return result
+    return {key: value for key, value in result.items() if key != "timings"}
+
 @app.get("/pipeline/run", response_model=PipelineResponse)
-def run_analysis(
+async def run_analysis(
     limit: int = Query(100, description="Number of posts to fetch"),
-    query: str = Query("tech", description="Search query for posts")
+    query: str = Query("tech", description="Search query for posts"),
+    multi_topic: bool = Query(False, description="Assign posts to every matching topic, not just the top one"),
+    summaries: bool = Query(False, description="Generate a summary for each topic"),
+    ranking: str = Query("frequency", description="Trend ranking: frequency, velocity or burst"),
+    timings: bool = Query(False, description="Include per-stage timings of the run")
 ):
     """
     Triggers the full analysis pipeline:
@@ -65,14 +108,255 @@ def run_analysis(
     2. Clean and detect trends
     3. Analyze sentiment and categories
     4. Return structured results
+    
+    Runs as a background job: identical concurrent requests share one run,
+    and recent results are answered from the job result cache.
+    """
+    job = jobs.submit(limit=limit, query=query, multi_topic=multi_topic, summaries=summaries,
+                      ranking=_ranking(ranking))
+    await jobs.wait(job)
+    if job.status == FAILED:
+        logger.error(f"Pipeline failed: {job.error}")
+        raise HTTPException(status_code=500, detail=job.error)
+    return _with_timings(job.result, timings)
+
+@app.get("/pipeline/events")
+async def run_analysis_events(
+    request: Request,
+    limit: int = Query(100, description="Number of posts to fetch"),
+    query: str = Query("tech", description="Search query for posts"),
+    multi_topic: bool = Query(False, description="Assign posts to every matching topic, not just the top one"),
+    summaries: bool = Query(False, description="Generate a summary for each topic"),
+    ranking: str = Query("frequency", description="Trend ranking: frequency, velocity or burst"),
+    timings: bool = Query(False, description="Include per-stage timings of the run")
+):
+    """
+    Runs the pipeline like /pipeline/run but streams partial results as
+    Server-Sent Events while it goes: "stage", "topics", "posts" (batches with
+    sentiment), "categories", then "result" with the full response or "error".
+    The run is cancelled when the client disconnects.
+
+    Each stream is its own run; it isn't shared with or cached by the job manager.
+    """
+    ranking = _ranking(ranking)
+
+    def run(**params):
+        return _with_timings(run_pipeline(**params), timings)
+
+    events = stream_events(run, request, limit=limit, query=query, multi_topic=multi_topic,
+                           summaries=summaries, ranking=ranking)
+    # No buffering by nginx-style proxies, or the events arrive all at once at the end
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/pipeline/jobs", status_code=202)
+def submit_analysis(
+    limit: int = Query(100, description="Number of posts to fetch"),
+    query: str = Query("tech", description="Search query for posts"),
+    multi_topic: bool = Query(False, description="Assign posts to every matching topic, not just the top one"),
+    summaries: bool = Query(False, description="Generate a summary for each topic"),
+    ranking: str = Query("frequency", description="Trend ranking: frequency, velocity or burst")
+):
+    """Starts a pipeline run in the background and returns its job id for polling."""
+    job = jobs.submit(limit=limit, query=query, multi_topic=multi_topic, summaries=summaries,
+                      ranking=_ranking(ranking))
+    return job.to_dict()
+
+@app.get("/pipeline/jobs/{job_id}")
+def get_job(job_id: str):
+    """Job status; includes the result once the job is done."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict(include_result=job.status == DONE)
+
+@app.get("/pipeline/jobs/{job_id}/result", response_model=PipelineResponse)
+async def get_job_result(
+    job_id: str,
+    timeout: float = Query(30, description="Seconds to wait for the job to finish"),
+    timings: bool = Query(False, description="Include per-stage timings of the run")
+):
+    """Waits up to timeout seconds for the job and returns its result (202 if still running)."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    try:
+        await asyncio.wait_for(jobs.wait(job), timeout=timeout)
+    except asyncio.TimeoutError:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    return _with_timings(job.result, timings)
+
+# --- Read endpoints over a completed run ---
+
+def _finished_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job
+
+def _fields(fields, allowed):
+    try:
+        return parse_fields(fields, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/pipeline/summary")
+async def run_summary(
+    limit: int = Query(100, description="Number of posts to fetch"),
+    query: str = Query("tech", description="Search query for posts"),
+    multi_topic: bool = Query(False, description="Assign posts to every matching topic, not just the top one"),
+    summaries: bool = Query(False, description="Generate a summary for each topic"),
+    ranking: str = Query("frequency", description="Trend ranking: frequency, velocity or burst"),
+    fields: Optional[str] = Query(None, description="Comma-separated topic fields to return")
+):
+    """
+    Runs (or reuses) the pipeline like /pipeline/run but returns only categories
+    and topics with server-side aggregates. Use the returned job_id to page
+    through posts per topic.
+    """
+    topic_fields = _fields(fields, TOPIC_FIELDS)
+    job = jobs.submit(limit=limit, query=query, multi_topic=multi_topic, summaries=summaries,
+                      ranking=_ranking(ranking))
+    await jobs.wait(job)
+    job = _finished_job(job.id)
+    return {"job_id": job.id, **view_for(job).summary(topic_fields)}
+
+@app.get("/pipeline/jobs/{job_id}/topics")
+def list_topics(
+    job_id: str,
+    category_id: Optional[str] = Query(None, description="Only topics in this category"),
+    fields: Optional[str] = Query(None, description="Comma-separated topic fields to return")
+):
+    topic_fields = _fields(fields, TOPIC_FIELDS)
+    return view_for(_finished_job(job_id)).list_topics(category_id, topic_fields)
+
+@app.get("/pipeline/jobs/{job_id}/topics/{topic_id}/posts")
+def list_topic_posts(
+    job_id: str,
+    topic_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(50, description="Posts per page (max 200)"),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return")
+):
+    post_fields = _fields(fields, POST_FIELDS)
+    view = view_for(_finished_job(job_id))
+    try:
+        return view.topic_posts(topic_id, cursor=cursor, page_size=page_size, fields=post_fields)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/pipeline/stream", response_model=PipelineResponse)
+async def stream_analysis(
+    query: str = Query("tech", description="Search query for posts")
+):
+    """
+    Live mode: returns the current results over a sliding time window
+    (STREAM_WINDOW_SECONDS) for a query that is polled in the background.
+    Only new posts are cleaned and analysed, and unchanged windows are
+    served from the last snapshot.
     """
     try:
-        results = run_pipeline(limit=limit, query=query)
-        return results
+        stream = await get_stream(query)
+        return await asyncio.to_thread(stream.snapshot)
     except Exception as e:
-        logger.error(f"Pipeline failed: {e}")
+        logger.error(f"Stream snapshot failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+ANALYTICS_DEFAULT_HOURS = int(os.getenv("ANALYTICS_DEFAULT_HOURS", "168"))
+
+def _rollups():
+    store = get_rollup_store()
+    if not store:
+        raise HTTPException(status_code=503, detail="Rollups are disabled (ROLLUP_STORE_PATH is empty)")
+    return store
+
+def _time_range(since, until):
+    """[since, until) in epoch seconds, rounded out to whole hours. Defaults to the last ANALYTICS_DEFAULT_HOURS."""
+    end = parse_timestamp(until) if until else time.time()
+    if end is None:
+        raise HTTPException(status_code=400, detail=f"Invalid until timestamp: {until}")
+    start = parse_timestamp(since) if since else end - ANALYTICS_DEFAULT_HOURS * HOUR
+    if start is None:
+        raise HTTPException(status_code=400, detail=f"Invalid since timestamp: {since}")
+    start = int(start // HOUR) * HOUR
+    end = -int(-end // HOUR) * HOUR
+    if end <= start:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return start, end
+
+def _ranking_over(kind, since, until, limit):
+    start, end = _time_range(since, until)
+    return {"since": hour_iso(start), "until": hour_iso(end), "items": _rollups().totals(kind, start, end, limit)}
+
+def _series(kind, name, since, until):
+    start, end = _time_range(since, until)
+    return {"name": name, "since": hour_iso(start), "until": hour_iso(end),
+            "hours": _rollups().series(kind, name, start, end)}
+
+# Time-range analytics, answered from the hourly rollups each run leaves behind (no raw posts, no models)
+@app.get("/analytics/topics")
+def topic_totals(
+    since: Optional[str] = Query(None, description="Start of the range (ISO 8601)"),
+    until: Optional[str] = Query(None, description="End of the range (ISO 8601), defaults to now"),
+    limit: int = Query(50, description="Number of topics to return")
+):
+    """Topics with posts in the range, most posts first, with their summed rollups."""
+    return _ranking_over(TOPIC, since, until, limit)
+
+@app.get("/analytics/topics/{name}/hourly")
+def topic_hourly(
+    name: str,
+    since: Optional[str] = Query(None, description="Start of the range (ISO 8601)"),
+    until: Optional[str] = Query(None, description="End of the range (ISO 8601), defaults to now")
+):
+    """Hour-by-hour post count, engagement and sentiment of a topic. Hours without posts are omitted."""
+    return _series(TOPIC, name, since, until)
+
+@app.get("/analytics/categories")
+def category_totals(
+    since: Optional[str] = Query(None, description="Start of the range (ISO 8601)"),
+    until: Optional[str] = Query(None, description="End of the range (ISO 8601), defaults to now"),
+    limit: int = Query(50, description="Number of categories to return")
+):
+    """Categories with posts in the range, most posts first, with their summed rollups."""
+    return _ranking_over(CATEGORY, since, until, limit)
+
+@app.get("/analytics/categories/{name}/hourly")
+def category_hourly(
+    name: str,
+    since: Optional[str] = Query(None, description="Start of the range (ISO 8601)"),
+    until: Optional[str] = Query(None, description="End of the range (ISO 8601), defaults to now")
+):
+    """Hour-by-hour post count, engagement and sentiment of a category. Hours without posts are omitted."""
+    return _series(CATEGORY, name, since, until)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Stage timings, item counts and model calls since startup, in the Prometheus text format."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness probe. Reports the load state and load time of each model.
+    While warm-up is enabled the worker is only ready once every model has loaded;
+    without it, models load lazily, but a model that failed to load is never ready.
+    """
+    failed = models.has_failed()
+    ready = not failed and (models.is_ready() or not MODEL_WARMUP)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else ("failed" if failed else "loading"), "models": models.status()}
+    )
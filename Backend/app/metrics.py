@@ -0,0 +1,212 @@
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set PIPELINE_METRICS=false to turn stage timing off; stage() and record_model_call() become no-ops
+PIPELINE_METRICS = os.getenv("PIPELINE_METRICS", "true").lower() in ("1", "true", "yes")
+
+# Histogram buckets (seconds) for stage wall time
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def peak_rss_bytes():
+    """Peak resident memory of this process so far, or None where getrusage isn't available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else None
+
+
+def current_rss_bytes():
+    """Resident memory of this process right now (from /proc/self/statm), or None where that isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError, TypeError):
+        return None
+
+
+class RunTimings:
+    """Per-stage timings and model calls of one pipeline run, returned as the response's timings block."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.models = {}
+
+    def add_stage(self, record):
+        self.stages.append(record)
+
+    def add_model_call(self, model, batch_size):
+        entry = self.models.setdefault(model, {"calls": 0, "items": 0, "max_batch_size": 0})
+        entry["calls"] += 1
+        entry["items"] += batch_size
+        entry["max_batch_size"] = max(entry["max_batch_size"], batch_size)
+
+    def to_dict(self):
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": self.stages,
+            "models": self.models,
+            # Process-lifetime high-water mark, not this run's: reported once, per run
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide stage and model-call totals, rendered in the Prometheus text format.
+
+    CPU time is process CPU time, so it includes the model's intra-op threads
+    but also overlaps between concurrently running jobs. Work done in the
+    PIPELINE_WORKERS process pool isn't counted here.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_count = defaultdict(int)
+        self.stage_seconds = defaultdict(float)
+        self.stage_cpu_seconds = defaultdict(float)
+        self.stage_items = defaultdict(int)
+        self.stage_buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.model_calls = defaultdict(int)
+        self.model_items = defaultdict(int)
+        self.model_max_batch = defaultdict(int)
+
+    def observe_stage(self, name, wall, cpu, items):
+        with self._lock:
+            self.stage_count[name] += 1
+            self.stage_seconds[name] += wall
+            self.stage_cpu_seconds[name] += cpu
+            self.stage_items[name] += items or 0
+            buckets = self.stage_buckets[name]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if wall <= bound:
+                    buckets[i] += 1
+
+    def observe_model_call(self, model, batch_size):
+        with self._lock:
+            self.model_calls[model] += 1
+            self.model_items[model] += batch_size
+            self.model_max_batch[model] = max(self.model_max_batch[model], batch_size)
+
+    def render(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            stages = sorted(self.stage_count)
+            models = sorted(self.model_calls)
+            lines.append("# HELP pipeline_stage_duration_seconds Wall time per pipeline stage.")
+            lines.append("# TYPE pipeline_stage_duration_seconds histogram")
+            for stage in stages:
+                for bound, count in zip(DURATION_BUCKETS, self.stage_buckets[stage]):
+                    lines.append(f'pipeline_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'pipeline_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {self.stage_count[stage]}')
+                lines.append(f'pipeline_stage_duration_seconds_sum{{stage="{stage}"}} {self.stage_seconds[stage]}')
+                lines.append(f'pipeline_stage_duration_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+            metric("pipeline_stage_cpu_seconds_total", "counter", "Process CPU time per pipeline stage.",
+                   [({"stage": stage}, self.stage_cpu_seconds[stage]) for stage in stages])
+            metric("pipeline_stage_items_total", "counter", "Items processed per pipeline stage.",
+                   [({"stage": stage}, self.stage_items[stage]) for stage in stages])
+            metric("model_calls_total", "counter", "Batched model invocations.",
+                   [({"model": model}, self.model_calls[model]) for model in models])
+            metric("model_items_total", "counter", "Inputs sent to each model.",
+                   [({"model": model}, self.model_items[model]) for model in models])
+            metric("model_max_batch_size", "gauge", "Largest batch sent to each model.",
+                   [({"model": model}, self.model_max_batch[model]) for model in models])
+        peak = peak_rss_bytes()
+        if peak is not None:
+            metric("process_peak_rss_bytes", "gauge", "Peak resident memory of the API process.", [({}, peak)])
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_current_run = contextvars.ContextVar("pipeline_run_timings", default=None)
+
+
+class _Stage:
+    __slots__ = ("items",)
+
+    def __init__(self, items=None):
+        self.items = items
+
+
+@contextmanager
+def stage(name, items=None):
+    """
+    Times a pipeline stage. Set .items on the yielded object when the
+    item count is only known at the end of the stage.
+    """
+    current = _Stage(items)
+    if not PIPELINE_METRICS:
+        yield current
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    rss_start = current_rss_bytes()
+    try:
+        yield current
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        registry.observe_stage(name, wall, cpu, current.items)
+        run = _current_run.get()
+        if run is not None:
+            rss_end = current_rss_bytes()
+            run.add_stage({
+                "stage": name,
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(cpu, 6),
+                "items": current.items,
+                # Change in resident memory over the stage (memory it kept, not its transient peak);
+                # concurrent runs in the same process show up here too
+                "rss_delta_bytes": rss_end - rss_start if rss_start is not None and rss_end is not None else None,
+            })
+
+
+def record_model_call(model, batch_size):
+    """Counts one model invocation on a batch of batch_size inputs."""
+    if not PIPELINE_METRICS:
+        return
+    registry.observe_model_call(model, batch_size)
+    run = _current_run.get()
+    if run is not None:
+        run.add_model_call(model, batch_size)
+
+
+def timed_run(func):
+    """Collects a RunTimings for each call of a pipeline entry point and adds it to the result as "timings"."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PIPELINE_METRICS:
+            return func(*args, **kwargs)
+        run = RunTimings()
+        token = _current_run.set(run)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _current_run.reset(token)
+        result["timings"] = run.to_dict()
+        return result
+    return wrapper
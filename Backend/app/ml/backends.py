@@ -0,0 +1,80 @@
+import logging
+import os
+
+from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+logger = logging.getLogger(__name__)
+
+# How the sequence-classification models (sentiment and zero-shot categories) run on CPU:
+#   "pytorch"   - full-precision PyTorch (the default)
+#   "int8"      - PyTorch with dynamically quantized INT8 Linear layers
+#   "onnx"      - ONNX Runtime session of the exported model (needs optimum[onnxruntime])
+#   "onnx-int8" - ONNX Runtime session of the exported, dynamically quantized model
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch")
+BACKENDS = ("pytorch", "int8", "onnx", "onnx-int8")
+
+# Exported ONNX models are written here once and reused by later processes
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "onnx_models")
+
+
+def cache_namespace(model_id, backend=None):
+    """
+    Result-cache namespace for a model on a backend. Quantized backends may
+    disagree with FP32 on borderline inputs, so they don't share cached results;
+    the default backend keeps the plain model id so existing caches stay valid.
+    """
+    backend = backend or INFERENCE_BACKEND
+    return model_id if backend == "pytorch" else f"{model_id}|{backend}"
+
+
+def _quantized_torch_model(model_id):
+    import torch
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _onnx_model(model_id, quantize):
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_id.replace("/", "--"))
+    if not os.path.isdir(export_dir):
+        logger.info(f"Exporting {model_id} to ONNX in {export_dir}...")
+        ORTModelForSequenceClassification.from_pretrained(model_id, export=True).save_pretrained(export_dir)
+    if not quantize:
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+    quantized_dir = export_dir + "-int8"
+    if not os.path.isdir(quantized_dir):
+        logger.info(f"Quantizing the ONNX export of {model_id} in {quantized_dir}...")
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        # Dynamic quantization needs no calibration data; avx2 kernels run on any recent x86 CPU
+        quantizer.quantize(save_dir=quantized_dir, quantization_config=AutoQuantizationConfig.avx2(is_static=False))
+    return ORTModelForSequenceClassification.from_pretrained(quantized_dir, file_name="model_quantized.onnx")
+
+
+def build_pipeline(task, model_id, backend=None):
+    """
+    A transformers pipeline for a sequence-classification task on the configured
+    backend, and the backend it actually runs on: one that can't be built
+    (missing optimum, failed export) falls back to PyTorch FP32.
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend == "pytorch":
+        return pipeline(task, model=model_id), backend
+
+    try:
+        if backend == "int8":
+            model = _quantized_torch_model(model_id)
+        else:
+            model = _onnx_model(model_id, quantize=backend == "onnx-int8")
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        logger.info(f"Loaded {model_id} on the {backend} backend.")
+        return pipeline(task, model=model, tokenizer=tokenizer), backend
+    except Exception as e:
+        logger.error(f"Failed to load {model_id} on the {backend} backend, using pytorch: {e}")
+        return pipeline(task, model=model_id), "pytorch"
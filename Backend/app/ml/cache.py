@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# On-disk cache location, shared by every model. Set RESULT_CACHE_PATH="" to keep the cache in memory only.
+CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "result_cache.sqlite3")
+MEMORY_MAX_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "10000"))
+DISK_MAX_ITEMS = int(os.getenv("RESULT_CACHE_DISK_ITEMS", "500000"))
+
+
+def cache_key(model_id: str, text: str) -> str:
+    """Content address of a model result: hash of the model id plus the input text."""
+    return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for model outputs.
+    An in-process LRU sits in front of a SQLite table that survives restarts.
+    Both tiers are size bounded; the disk tier evicts the least recently used rows.
+    """
+
+    def __init__(self, model_id, path=CACHE_PATH, memory_max_items=MEMORY_MAX_ITEMS, disk_max_items=DISK_MAX_ITEMS):
+        self.model_id = model_id
+        self.memory_max_items = memory_max_items
+        self.disk_max_items = disk_max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_count = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+                self._conn.commit()
+                self._disk_count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            except Exception as e:
+                logger.error(f"Failed to open result cache at {path}: {e}")
+                self._conn = None
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts):
+        """Returns a list aligned with texts holding the cached value or None."""
+        keys = [cache_key(self.model_id, text) for text in texts]
+        memory_found = {}
+        disk_found = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory and key not in memory_found:
+                    self._memory.move_to_end(key)
+                    memory_found[key] = self._memory[key]
+
+            missing = list({key for key in keys if key not in memory_found})
+            if missing and self._conn:
+                try:
+                    # Stay under SQLite's bound-parameter limit
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = self._conn.execute(
+                            f"SELECT key, value FROM results WHERE key IN ({placeholders})", chunk
+                        ).fetchall()
+                        for key, value in rows:
+                            disk_found[key] = json.loads(value)
+                            self._remember(key, disk_found[key])
+                    if disk_found:
+                        now = time.time()
+                        self._conn.executemany(
+                            "UPDATE results SET accessed = ? WHERE key = ?",
+                            [(now, key) for key in disk_found]
+                        )
+                        self._conn.commit()
+                except Exception as e:
+                    logger.error(f"Error reading result cache: {e}")
+
+            results = []
+            for key in keys:
+                if key in memory_found:
+                    self.memory_hits += 1
+                    results.append(memory_found[key])
+                elif key in disk_found:
+                    self.disk_hits += 1
+                    results.append(disk_found[key])
+                else:
+                    self.misses += 1
+                    results.append(None)
+
+        return results
+
+    def get(self, text):
+        return self.get_many([text])[0]
+
+    def set_many(self, items):
+        """Stores (text, value) pairs. Values must be JSON serializable."""
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, value in items:
+                key = cache_key(self.model_id, text)
+                self._remember(key, value)
+                rows.append((key, json.dumps(value), now))
+
+            if rows and self._conn:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)", rows
+                    )
+                    self._disk_count += len(rows)
+                    if self._disk_count > self.disk_max_items:
+                        self._evict()
+                    self._conn.commit()
+                except Exception as e:
+                    logger.error(f"Error writing result cache: {e}")
+
+    def set(self, text, value):
+        self.set_many([(text, value)])
+
+    def _evict(self):
+        # _disk_count over-counts replaced rows, so recount before deleting anything
+        self._disk_count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        overflow = self._disk_count - self.disk_max_items
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._disk_count -= overflow
+
+    def stats(self):
+        with self._lock:
+            return {
+                "model_id": self.model_id,
+                "memory_items": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_items": self._disk_count,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,135 @@
+"""
+Two-tier sentiment: a VADER lexicon scorer answers the posts it is confident
+about, and only the rest go to the transformer (SentimentAnalyzer, local or
+on the inference server). Enabled with SENTIMENT_MODE=cascade.
+
+The lexicon comes from NLTK (`python -m nltk.downloader vader_lexicon`);
+without it every post is escalated, which is the same as SENTIMENT_MODE=bert.
+Use check_sentiment_cascade.py to pick a threshold against BERT-only output.
+"""
+import logging
+import os
+import random
+import threading
+
+from app import metrics
+from app.ml.labels import LABEL_MAP
+
+logger = logging.getLogger(__name__)
+
+# Lexicon answers at or above this confidence are kept; lower ones go to the transformer
+SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0.6"))
+# Longer posts tend to mix sentiment and are always escalated
+SENTIMENT_CASCADE_MAX_WORDS = int(os.getenv("SENTIMENT_CASCADE_MAX_WORDS", "30"))
+# Share of lexicon answers also sent to the transformer to measure live agreement (0 = off)
+SENTIMENT_CASCADE_AUDIT_RATE = float(os.getenv("SENTIMENT_CASCADE_AUDIT_RATE", "0"))
+
+# VADER compound scores at least this strong map to +/-2 (1 or 5 stars), weaker ones to +/-1
+STRONG_COMPOUND = 0.75
+
+
+class LexiconScorer:
+    def __init__(self, lexicon_file=None):
+        try:
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            self.analyzer = SentimentIntensityAnalyzer(lexicon_file) if lexicon_file else SentimentIntensityAnalyzer()
+            logger.info("Sentiment lexicon loaded successfully.")
+        except Exception as e:
+            logger.warning(f"Sentiment lexicon unavailable, every post will go to the transformer: {e}")
+            self.analyzer = None
+
+    def score(self, text, max_words=SENTIMENT_CASCADE_MAX_WORDS):
+        """
+        (score in [-2, 2], confidence in [0, 1]) for a cleaned text.
+        Confidence is the strength of VADER's compound score, scaled down by how
+        much the positive and negative words offset each other; texts with no
+        sentiment words, or over max_words words, get 0.
+        """
+        if not self.analyzer or not text:
+            return 0, 0.0
+        # Demojized emoji are runs like "smiling_face_with_hearteyes"; split them into words
+        words = text.replace("_", " ").split()
+        if len(words) > max_words:
+            return 0, 0.0
+        polarity = self.analyzer.polarity_scores(" ".join(words))
+        compound = polarity["compound"]
+        strongest = max(polarity["pos"], polarity["neg"])
+        if not strongest:
+            return 0, 0.0
+        mixed = min(polarity["pos"], polarity["neg"]) / strongest
+        strength = 2 if abs(compound) >= STRONG_COMPOUND else 1
+        return (strength if compound > 0 else -strength), abs(compound) * (1 - mixed)
+
+
+class _CascadeCache:
+    """The transformer's cache stats plus the cascade's, for the pipeline's cache log line."""
+
+    def __init__(self, cascade):
+        self._cascade = cascade
+
+    def stats(self):
+        return {**self._cascade.model.cache.stats(), "cascade": self._cascade.stats()}
+
+
+class CascadeSentimentAnalyzer:
+    """Same analyze/analyze_many interface as SentimentAnalyzer, with the lexicon tier in front of it."""
+
+    def __init__(self, model, scorer=None, threshold=SENTIMENT_CASCADE_THRESHOLD,
+                 audit_rate=SENTIMENT_CASCADE_AUDIT_RATE):
+        self.model = model
+        self.scorer = scorer or LexiconScorer()
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.backend = getattr(model, "backend", None)
+        self.cache = _CascadeCache(self)
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.answered = 0
+        self.escalated = 0
+        self.audited = 0
+        self.audit_agreed = 0
+
+    def analyze_many(self, texts, batch_size=32):
+        results = [None] * len(texts)
+        escalate = []
+        audit = []
+        for i, text in enumerate(texts):
+            score, confidence = self.scorer.score(text)
+            if confidence < self.threshold:
+                escalate.append(i)
+                continue
+            results[i] = {"score": score, "label": LABEL_MAP[score]}
+            if self.audit_rate and self._random.random() < self.audit_rate:
+                audit.append(i)
+
+        answered = len(texts) - len(escalate)
+        if answered:
+            metrics.record_model_call("sentiment-lexicon", answered)
+        model_results = self.model.analyze_many([texts[i] for i in escalate + audit], batch_size=batch_size)
+        for i, result in zip(escalate, model_results):
+            results[i] = result
+        agreed = sum(
+            results[i]["score"] == result["score"] for i, result in zip(audit, model_results[len(escalate):])
+        )
+
+        with self._lock:
+            self.answered += answered
+            self.escalated += len(escalate)
+            self.audited += len(audit)
+            self.audit_agreed += agreed
+        return results
+
+    def analyze(self, text):
+        return self.analyze_many([text])[0]
+
+    def stats(self):
+        with self._lock:
+            total = self.answered + self.escalated
+            return {
+                "threshold": self.threshold,
+                "lexicon_answered": self.answered,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / total, 4) if total else None,
+                "audited": self.audited,
+                "audit_agreement": round(self.audit_agreed / self.audited, 4) if self.audited else None,
+            }
@@ -1,32 +1,157 @@
-from transformers import pipeline
+from transformers import AutoTokenizer, AutoModel
 import logging
+import os
+
+import numpy as np
+
+from app import metrics
+from app.ml.backends import build_pipeline, cache_namespace
+from app.ml.cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
+MODEL_ID = "valhalla/distilbart-mnli-12-1"
+EMBEDDING_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+# "zero-shot" (NLI pass per label, per topic) or "embedding" (nearest label by cosine similarity)
+CATEGORIZER_MODE = os.getenv("CATEGORIZER_MODE", "zero-shot")
+
+CATEGORIES = [
+    "Technology", "Politics", "Sports", "Entertainment", 
+    "Finance", "Science", "Travel", "Food", "Lifestyle", "General"
+]
+
+# Labels are embedded as short sentences, which sit closer to topic names than bare words do
+LABEL_TEMPLATE = "This topic is about {}."
+
 class Categorizer:
-    def __init__(self):
+    def __init__(self, backend=None):
         # Zero-shot classification for topic categorization
         # Using a smaller model to ensure it runs in the environment
+        self.backend = backend
         try:
-            self.classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1")
+            self.classifier, self.backend = build_pipeline("zero-shot-classification", MODEL_ID, backend)
             logger.info("Categorizer loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load categorizer: {e}")
             self.classifier = None
         
-        self.categories = [
-            "Technology", "Politics", "Sports", "Entertainment", 
-            "Finance", "Science", "Travel", "Food", "Lifestyle", "General"
-        ]
+        self.categories = list(CATEGORIES)
+
+        # Topic name -> category, keyed on the model and label set so changing either invalidates it
+        self.cache = ResultCache(f"{cache_namespace(MODEL_ID, self.backend)}|{','.join(self.categories)}")
+
+    @property
+    def is_loaded(self):
+        return self.classifier is not None
 
     def categorize(self, text):
         if not self.classifier or not text:
             return "General"
 
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
+
         try:
+            # One call runs an NLI pass per candidate label
+            metrics.record_model_call("categorizer", len(self.categories))
             result = self.classifier(text, candidate_labels=self.categories)
             # result['labels'][0] is the top category
-            return result['labels'][0]
+            category = result['labels'][0]
         except Exception as e:
             logger.error(f"Error classifying topic: {e}")
             return "General"
+
+        self.cache.set(text, category)
+        return category
+
+    def categorize_many(self, texts):
+        # Zero-shot needs one NLI pass per (topic, label) pair, so there is nothing to batch across topics
+        return [self.categorize(text) for text in texts]
+
+
+class EmbeddingCategorizer:
+    """
+    Assigns each topic to the category whose label embedding is most similar.
+    Label embeddings are computed once at load time, so categorizing a run
+    costs a single batched encoder pass over the topic names.
+    """
+
+    def __init__(self):
+        self.categories = list(CATEGORIES)
+        self.label_embeddings = None
+
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_ID)
+            self.model = AutoModel.from_pretrained(EMBEDDING_MODEL_ID)
+            self.model.eval()
+            self.label_embeddings = self._embed([LABEL_TEMPLATE.format(c) for c in self.categories])
+            logger.info("Embedding categorizer loaded successfully.")
+        except Exception as e:
+            logger.error(f"Failed to load embedding categorizer: {e}")
+            self.tokenizer = None
+            self.model = None
+
+        self.cache = ResultCache(f"{EMBEDDING_MODEL_ID}|{LABEL_TEMPLATE}|{','.join(self.categories)}")
+
+    @property
+    def is_loaded(self):
+        return self.model is not None
+
+    def _embed(self, texts):
+        import torch
+
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=64, return_tensors="pt")
+        with torch.no_grad():
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+        # Mean pooling over real tokens, then L2-normalize so a dot product is cosine similarity
+        mask = inputs["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+        summed = (token_embeddings * mask).sum(dim=1)
+        counts = mask.sum(dim=1).clamp(min=1e-9)
+        embeddings = (summed / counts).numpy()
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def categorize(self, text):
+        return self.categorize_many([text])[0]
+
+    def categorize_many(self, texts):
+        results = ["General"] * len(texts)
+        if self.label_embeddings is None:
+            return results
+
+        order = [i for i, text in enumerate(texts) if text]
+        cached = self.cache.get_many([texts[i] for i in order])
+        for i, value in zip(order, cached):
+            if value is not None:
+                results[i] = value
+        order = [i for i, value in zip(order, cached) if value is None]
+        if not order:
+            return results
+
+        try:
+            metrics.record_model_call("categorizer", len(order))
+            embeddings = self._embed([texts[i] for i in order])
+            best = np.argmax(embeddings @ self.label_embeddings.T, axis=1)
+        except Exception as e:
+            logger.error(f"Error classifying topics: {e}")
+            return results
+
+        computed = []
+        for i, label_idx in zip(order, best):
+            results[i] = self.categories[label_idx]
+            computed.append((texts[i], results[i]))
+        self.cache.set_many(computed)
+        return results
+
+
+def create_categorizer(mode=None):
+    """Builds the categorizer selected by CATEGORIZER_MODE."""
+    mode = mode or CATEGORIZER_MODE
+    if mode == "embedding":
+        return EmbeddingCategorizer()
+    if mode != "zero-shot":
+        logger.warning(f"Unknown CATEGORIZER_MODE '{mode}', using zero-shot.")
+    return Categorizer()
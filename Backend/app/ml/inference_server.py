@@ -0,0 +1,272 @@
+"""
+Local inference server: one process owns the models and serves every API
+worker over a Unix socket, so N uvicorn workers share one copy of each model
+instead of loading N.
+
+Run it with `python -m app.ml.inference_server` and start the API workers with
+INFERENCE_SOCKET pointing at the same path; the model registry then hands out
+RemoteModel clients instead of loading the models in-process.
+
+Requests from all workers are micro-batched per model: the first queued
+request waits at most INFERENCE_MAX_LATENCY_MS for others to join, and a batch
+is closed early once it holds INFERENCE_MAX_BATCH texts.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Empty keeps the models in-process (the default)
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_MAX_LATENCY_MS = float(os.getenv("INFERENCE_MAX_LATENCY_MS", "10"))
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "120"))
+
+# Messages are length-prefixed JSON: a 4-byte big-endian size, then the UTF-8 body
+HEADER = struct.Struct(">I")
+
+
+def encode_message(message):
+    body = json.dumps(message).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+# --- Server ---
+
+class MicroBatcher:
+    """Collects requests for one model and runs them through it together, one batch at a time."""
+
+    def __init__(self, name, run_batch, max_batch=INFERENCE_MAX_BATCH, max_latency_ms=INFERENCE_MAX_LATENCY_MS):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self.queue = asyncio.Queue()
+        # One thread per model: batches for a model run one after another, different models in parallel
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"inference-{name}")
+        self.batches = 0
+
+    async def submit(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_latency
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            # Workers often send the same posts; each distinct text goes through the model once
+            unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+            self.batches += 1
+            try:
+                results = await loop.run_in_executor(self._executor, self.run_batch, unique)
+                by_text = dict(zip(unique, results))
+                for texts, future in batch:
+                    if not future.done():
+                        future.set_result([by_text[text] for text in texts])
+            except Exception as e:
+                logger.error(f"Inference batch for '{self.name}' failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class InferenceServer:
+    def __init__(self, models, max_batch=INFERENCE_MAX_BATCH, max_latency_ms=INFERENCE_MAX_LATENCY_MS):
+        """models maps a model name to an object with analyze_many (sentiment) or categorize_many (categories)."""
+        self.models = models
+        self.batchers = {}
+        for name, model in models.items():
+            if hasattr(model, "analyze_many"):
+                run_batch = lambda texts, model=model: model.analyze_many(texts, batch_size=max_batch)
+            else:
+                run_batch = model.categorize_many
+            self.batchers[name] = MicroBatcher(name, run_batch, max_batch, max_latency_ms)
+        self._server = None
+
+    async def start(self, path):
+        # A socket file left behind by a previous run would make bind fail
+        if os.path.exists(path):
+            os.unlink(path)
+        for batcher in self.batchers.values():
+            asyncio.create_task(batcher.run())
+        self._server = await asyncio.start_unix_server(self._handle_client, path=path)
+        logger.info(f"Inference server listening on {path} for {', '.join(self.models)}.")
+
+    async def serve_forever(self, path):
+        await self.start(path)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                request = json.loads(await reader.readexactly(HEADER.unpack(header)[0]))
+                writer.write(encode_message(await self._dispatch(request)))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass  # Client closed the connection
+        except Exception as e:
+            logger.error(f"Inference client connection failed: {e}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request):
+        op = request.get("op")
+        name = request.get("model")
+        try:
+            if op == "ping":
+                return {"ok": True, "models": list(self.models)}
+            if name not in self.models:
+                raise ValueError(f"Unknown model '{name}'")
+            if op == "run":
+                return {"results": await self.batchers[name].submit(request["texts"])}
+            if op == "stats":
+                cache = getattr(self.models[name], "cache", None)
+                return {"stats": {**(cache.stats() if cache else {}), "batches": self.batchers[name].batches}}
+            raise ValueError(f"Unknown op '{op}'")
+        except Exception as e:
+            return {"error": str(e)}
+
+
+# --- Client ---
+
+class InferenceError(RuntimeError):
+    pass
+
+
+class _RemoteCache:
+    """Lets callers log cache stats for a remote model like they do for a local one."""
+
+    def __init__(self, model):
+        self._model = model
+
+    def stats(self):
+        try:
+            return self._model._call({"op": "stats", "model": self._model.name})["stats"]
+        except Exception as e:
+            return {"error": str(e)}
+
+
+class RemoteModel:
+    """
+    Client for one model on the inference server, with the same analyze/categorize
+    methods as the in-process models. Each thread keeps its own connection.
+    """
+
+    def __init__(self, name, path=INFERENCE_SOCKET, timeout=INFERENCE_TIMEOUT_SECONDS):
+        self.name = name
+        self.path = path
+        self.timeout = timeout
+        self.cache = _RemoteCache(self)
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    @staticmethod
+    def _recv_exactly(sock, size):
+        chunks = []
+        while size:
+            chunk = sock.recv(size)
+            if not chunk:
+                raise ConnectionError("Inference server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _call(self, request):
+        # One reconnect covers a server restart between calls
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                sock.sendall(encode_message(request))
+                size = HEADER.unpack(self._recv_exactly(sock, HEADER.size))[0]
+                response = json.loads(self._recv_exactly(sock, size))
+                break
+            except OSError:
+                self._close()
+                if attempt:
+                    raise
+        if "error" in response:
+            raise InferenceError(response["error"])
+        return response
+
+    def _run(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        return self._call({"op": "run", "model": self.name, "texts": texts})["results"]
+
+    def ping(self):
+        return self._call({"op": "ping"})
+
+    def analyze_many(self, texts, batch_size=32):
+        # Batch size is the server's call (INFERENCE_MAX_BATCH)
+        return self._run(texts)
+
+    def analyze(self, text):
+        return self._run([text])[0]
+
+    def categorize_many(self, texts):
+        return self._run(texts)
+
+    def categorize(self, text):
+        return self._run([text])[0]
+
+
+def main():
+    import argparse
+
+    from app.ml.categorizer import create_categorizer
+    from app.ml.registry import require_loaded
+    from app.ml.sentiment import SentimentAnalyzer
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serves the sentiment and category models over a Unix socket.")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET or "/tmp/trend-inference.sock")
+    parser.add_argument("--max-batch", type=int, default=INFERENCE_MAX_BATCH)
+    parser.add_argument("--max-latency-ms", type=float, default=INFERENCE_MAX_LATENCY_MS)
+    args = parser.parse_args()
+
+    # A server without its models would answer every request with defaults; fail instead
+    server = InferenceServer(
+        {"sentiment": require_loaded(SentimentAnalyzer()), "categorizer": require_loaded(create_categorizer())},
+        max_batch=args.max_batch,
+        max_latency_ms=args.max_latency_ms,
+    )
+    asyncio.run(server.serve_forever(args.socket))
+
+
+if __name__ == "__main__":
+    main()
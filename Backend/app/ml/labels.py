@@ -0,0 +1,9 @@
+# Sentiment labels for the [-2, 2] score scale (1-5 stars minus 3). Kept free of model
+# imports so the lexicon tier can use them without transformers installed.
+LABEL_MAP = {
+    -2: "Very Negative",
+    -1: "Negative",
+    0: "Neutral",
+    1: "Positive",
+    2: "Very Positive"
+}
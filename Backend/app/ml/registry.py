@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# With a socket path, models live in the shared inference server (app.ml.inference_server)
+# and every worker talks to it instead of loading its own copy
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+# "bert" sends every post to the transformer; "cascade" puts a lexicon scorer in front
+# of it and only sends the posts it is unsure about (app.ml.cascade)
+SENTIMENT_MODE = os.getenv("SENTIMENT_MODE", "bert")
+# A failed load is retried only after this many seconds, doubling per failure up to the max
+MODEL_RETRY_SECONDS = float(os.getenv("MODEL_RETRY_SECONDS", "30"))
+MODEL_RETRY_MAX_SECONDS = float(os.getenv("MODEL_RETRY_MAX_SECONDS", "600"))
+
+
+class ModelRegistry:
+    """
+    Loads models on first use instead of at import time.
+    Each model is built by a factory exactly once, even when several
+    requests ask for it at the same time, and its load state and load time
+    are kept for the readiness endpoint. A failed load is remembered: until
+    its backoff expires, get() raises straight away instead of loading again.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._models = {}
+        self._status = {}
+        self._locks = {}
+        self._warm = set()
+        self._warmup_thread = None
+
+    def register(self, name, factory, warm_up=True):
+        """warm_up=False leaves an optional model out of warm-up and readiness; it loads on first use."""
+        self._factories[name] = factory
+        if warm_up:
+            self._warm.add(name)
+        else:
+            self._warm.discard(name)
+        self._locks[name] = threading.Lock()
+        self._status[name] = {"state": NOT_LOADED, "load_time_seconds": None, "error": None, "failures": 0,
+                              "retry_at": None}
+
+    def get(self, name):
+        if name in self._models:
+            return self._models[name]
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            status = self._status[name]
+            if status["state"] == FAILED and time.time() < status["retry_at"]:
+                raise RuntimeError(f"Model '{name}' failed to load ({status['error']}); "
+                                   f"retrying in {status['retry_at'] - time.time():.0f}s")
+
+            status["state"] = LOADING
+            start = time.perf_counter()
+            try:
+                model = self._factories[name]()
+            except Exception as e:
+                failures = status["failures"] + 1
+                backoff = min(MODEL_RETRY_SECONDS * 2 ** (failures - 1), MODEL_RETRY_MAX_SECONDS)
+                status.update(state=FAILED, error=str(e), failures=failures, retry_at=time.time() + backoff)
+                logger.error(f"Failed to load model '{name}': {e} (retrying in {backoff:.0f}s)")
+                raise
+
+            elapsed = time.perf_counter() - start
+            status.update(state=READY, load_time_seconds=round(elapsed, 3), error=None, failures=0, retry_at=None)
+            self._models[name] = model
+            logger.info(f"Model '{name}' loaded in {elapsed:.2f}s.")
+            return model
+
+    def warm_up(self, background=True):
+        """Loads every warm-up model, in a daemon thread unless background is False."""
+        def load_all():
+            for name in list(self._warm):
+                try:
+                    self.get(name)
+                except Exception:
+                    # Already logged; the model is retried on first use after its backoff
+                    pass
+
+        if not background:
+            load_all()
+            return
+
+        if self._warmup_thread is None or not self._warmup_thread.is_alive():
+            self._warmup_thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def is_ready(self):
+        return all(self._status[name]["state"] == READY for name in self._warm)
+
+    def has_failed(self):
+        """True while any warm-up model is in its failed state."""
+        return any(self._status[name]["state"] == FAILED for name in self._warm)
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+def require_loaded(model):
+    """
+    Returns model, or raises if its underlying pipeline failed to load. The in-process
+    wrappers log a failed load and carry on with is_loaded False (scoring everything
+    Neutral, "General", ...); the registry treats that as a failed load.
+    """
+    if not getattr(model, "is_loaded", True):
+        raise RuntimeError(f"{type(model).__name__} could not load its model (see the error logged above)")
+    return model
+
+
+def _remote_model(name):
+    from app.ml.inference_server import RemoteModel
+    model = RemoteModel(name, INFERENCE_SOCKET)
+    # Fails the load (and readiness) while the server is unreachable
+    model.ping()
+    return model
+
+
+def _load_sentiment_analyzer():
+    if INFERENCE_SOCKET:
+        model = _remote_model("sentiment")
+    else:
+        # Imported here so that importing the app doesn't pull in transformers
+        from app.ml.sentiment import SentimentAnalyzer
+        model = require_loaded(SentimentAnalyzer())
+    if SENTIMENT_MODE == "cascade":
+        # The lexicon tier runs in this process, in front of a local or remote transformer
+        from app.ml.cascade import CascadeSentimentAnalyzer
+        return CascadeSentimentAnalyzer(model)
+    if SENTIMENT_MODE != "bert":
+        logger.warning(f"Unknown SENTIMENT_MODE '{SENTIMENT_MODE}', using bert.")
+    return model
+
+
+def _load_categorizer():
+    if INFERENCE_SOCKET:
+        return _remote_model("categorizer")
+    from app.ml.categorizer import create_categorizer
+    return require_loaded(create_categorizer())
+
+
+def _load_summarizer():
+    # Only used when a run asks for topic summaries, and always in-process
+    from app.ml.summarizer import TopicSummarizer
+    return require_loaded(TopicSummarizer())
+
+
+models = ModelRegistry()
+models.register("sentiment", _load_sentiment_analyzer)
+models.register("categorizer", _load_categorizer)
+models.register("summarizer", _load_summarizer, warm_up=False)
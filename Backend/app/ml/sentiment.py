@@ -1,46 +1,106 @@
-from transformers import pipeline
 import logging
 
+from app import metrics
+from app.ml.backends import build_pipeline, cache_namespace
+from app.ml.cache import ResultCache
+from app.ml.labels import LABEL_MAP
+
 logger = logging.getLogger(__name__)
 
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+NEUTRAL = {"score": 0, "label": "Neutral"}
+
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, backend=None):
         # Using a 5-class sentiment model (BERT-based) to match the [-2, 2] requirement.
         # This is a robust alternative to running Mistral 7B locally, which would require massive RAM/GPU.
         # Maps 1-5 stars to -2 to +2.
+        # The backend (FP32, INT8 or ONNX Runtime) comes from INFERENCE_BACKEND unless given.
+        self.backend = backend
         try:
-            self.analyzer = pipeline("text-classification", model="nlptown/bert-base-multilingual-uncased-sentiment")
+            self.analyzer, self.backend = build_pipeline("text-classification", MODEL_ID, backend)
             logger.info("Sentiment analyzer loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load sentiment analyzer: {e}")
             self.analyzer = None
 
+        # Results keyed on (model, backend, cleaned text) so repeated posts skip the model
+        self.cache = ResultCache(cache_namespace(MODEL_ID, self.backend))
+
+    @property
+    def is_loaded(self):
+        """False when the pipeline failed to load and every post would score Neutral."""
+        return self.analyzer is not None
+
+    @staticmethod
+    def _map_result(result):
+        label = result['label'] # e.g., "1 star", "5 stars"
+
+        # Map stars to [-2, 2]
+        star = int(label.split()[0])
+        mapped_score = star - 3 # 1->-2, 2->-1, 3->0, 4->1, 5->2
+
+        return {
+            "score": mapped_score,
+            "label": LABEL_MAP.get(mapped_score, "Neutral")
+        }
+
     def analyze(self, text):
         if not self.analyzer or not text:
-            return {"score": 0, "label": "Neutral"}
+            return dict(NEUTRAL)
+
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
 
         try:
+            metrics.record_model_call("sentiment", 1)
             # Truncate text to 512 tokens to avoid errors
-            result = self.analyzer(text[:512])[0]
-            label = result['label'] # e.g., "1 star", "5 stars"
-            score = float(result['score']) # Confidence
-
-            # Map stars to [-2, 2]
-            star = int(label.split()[0])
-            mapped_score = star - 3 # 1->-2, 2->-1, 3->0, 4->1, 5->2
-            
-            label_map = {
-                -2: "Very Negative",
-                -1: "Negative",
-                0: "Neutral",
-                1: "Positive",
-                2: "Very Positive"
-            }
-            
-            return {
-                "score": mapped_score,
-                "label": label_map.get(mapped_score, "Neutral")
-            }
+            result = self._map_result(self.analyzer(text[:512])[0])
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {e}")
-            return {"score": 0, "label": "Neutral"}
+            return dict(NEUTRAL)
+
+        self.cache.set(text, result)
+        return result
+
+    def analyze_many(self, texts, batch_size=32):
+        """
+        Analyzes a list of texts in padded batches.
+        Texts are sorted by length so each batch pads to a similar size,
+        and results are returned in the same order as the input.
+        """
+        results = [dict(NEUTRAL) for _ in texts]
+        if not self.analyzer:
+            return results
+
+        # Empty texts stay Neutral, same as analyze()
+        order = [i for i, text in enumerate(texts) if text]
+
+        # Only texts missing from the cache go to the model
+        cached = self.cache.get_many([texts[i] for i in order])
+        for i, value in zip(order, cached):
+            if value is not None:
+                results[i] = value
+        order = [i for i, value in zip(order, cached) if value is None]
+        order.sort(key=lambda i: len(texts[i][:512]))
+
+        computed = []
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch = [texts[i][:512] for i in batch_idx]
+            try:
+                metrics.record_model_call("sentiment", len(batch))
+                outputs = self.analyzer(batch, batch_size=len(batch), truncation=True)
+                for i, output in zip(batch_idx, outputs):
+                    results[i] = self._map_result(output)
+                    computed.append((texts[i], results[i]))
+            except Exception as e:
+                # Fall back to one-by-one so a single bad post doesn't blank the batch
+                logger.error(f"Error analyzing sentiment batch: {e}")
+                for i in batch_idx:
+                    results[i] = self.analyze(texts[i])
+
+        self.cache.set_many(computed)
+        return results
@@ -1,42 +1,128 @@
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import hashlib
 import logging
+import os
+import time
+
+from app import metrics
+from app.ml.cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
+MODEL_ID = "t5-small"
+PREFIX = "summarize: "
+# T5 was trained on 512-token inputs; longer inputs are cut at a token boundary
+MAX_INPUT_TOKENS = 512
+SUMMARY_MAX_TOKENS = 60
+SUMMARY_MIN_TOKENS = 10
+# Topics per generate() call
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "16"))
+# Uncached topics are only summarized while the stage is within this many seconds
+SUMMARY_BUDGET_SECONDS = float(os.getenv("SUMMARY_BUDGET_SECONDS", "10"))
+# A token is never longer than this many characters in practice, so posts past
+# MAX_INPUT_TOKENS * this many characters can't make it into the input and aren't tokenized
+CHARS_PER_TOKEN_BOUND = 10
+
+
+def content_fingerprint(topic, texts):
+    """
+    Identifies a topic's input. Order and repeats count: the model reads the posts
+    in the given order (most engaging first) and truncates the tail, so a reordered
+    list can summarize differently.
+    """
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return f"{topic}\x00{digest.hexdigest()}"
+
+
 class TopicSummarizer:
     def __init__(self):
         # Using T5-small for efficiency and low memory footprint
         try:
-            model_name = "t5-small"
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID)
             logger.info("Topic summarizer loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load summarizer: {e}")
             self.tokenizer = None
             self.model = None
 
+        # Summaries keyed on topic + content fingerprint, so unchanged topics aren't regenerated
+        self.cache = ResultCache(f"{MODEL_ID}|summary|{MAX_INPUT_TOKENS}|{SUMMARY_MAX_TOKENS}")
+
+    @property
+    def is_loaded(self):
+        return self.model is not None and self.tokenizer is not None
+
+    @staticmethod
+    def _input_text(texts):
+        """Joins posts in the given order, stopping once the tokenizer would truncate anyway."""
+        limit = MAX_INPUT_TOKENS * CHARS_PER_TOKEN_BOUND
+        parts = []
+        length = len(PREFIX)
+        for text in texts:
+            if length >= limit:
+                break
+            parts.append(text)
+            length += len(text) + 1
+        return PREFIX + " ".join(parts)
+
+    def _generate(self, inputs):
+        encoded = self.tokenizer(
+            inputs, max_length=MAX_INPUT_TOKENS, truncation=True, padding=True, return_tensors="pt"
+        )
+        metrics.record_model_call("summarizer", len(inputs))
+        summary_ids = self.model.generate(
+            **encoded,
+            max_length=SUMMARY_MAX_TOKENS,
+            min_length=SUMMARY_MIN_TOKENS,
+            do_sample=False,
+            early_stopping=True
+        )
+        return self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+    def summarize_many(self, topic_texts, budget_seconds=SUMMARY_BUDGET_SECONDS):
+        """
+        Summarizes several topics, given as {topic: [post texts, most important first]}.
+        Cached summaries are always returned. The rest are generated in padded
+        batches until budget_seconds have passed; topics left over map to None.
+        """
+        start = time.perf_counter()
+        topics = [topic for topic, texts in topic_texts.items() if texts]
+        summaries = dict.fromkeys(topic_texts)
+        if not self.model or not self.tokenizer or not topics:
+            return summaries
+
+        keys = [content_fingerprint(topic, topic_texts[topic]) for topic in topics]
+        pending = []
+        for topic, key, cached in zip(topics, keys, self.cache.get_many(keys)):
+            if cached is not None:
+                summaries[topic] = cached
+            else:
+                pending.append((topic, key))
+
+        computed = []
+        for batch_start in range(0, len(pending), SUMMARY_BATCH_SIZE):
+            if time.perf_counter() - start > budget_seconds:
+                logger.info(f"Summary budget of {budget_seconds}s used up; skipped {len(pending) - batch_start} topics.")
+                break
+            batch = pending[batch_start:batch_start + SUMMARY_BATCH_SIZE]
+            try:
+                outputs = self._generate([self._input_text(topic_texts[topic]) for topic, _ in batch])
+            except Exception as e:
+                logger.error(f"Error summarizing topics: {e}")
+                break
+            for (topic, key), summary in zip(batch, outputs):
+                summaries[topic] = summary
+                computed.append((key, summary))
+
+        self.cache.set_many(computed)
+        return summaries
+
     def summarize(self, texts):
         if not self.model or not self.tokenizer or not texts:
             return "No summary available."
-
-        # Combine texts
-        combined_text = "summarize: " + " ".join(texts)
-        if len(combined_text) > 1024:
-            combined_text = combined_text[:1024]
-
-        try:
-            inputs = self.tokenizer(combined_text, return_tensors="pt", max_length=1024, truncation=True)
-            # Generate summary
-            summary_ids = self.model.generate(
-                inputs["input_ids"], 
-                max_length=60, 
-                min_length=10, 
-                do_sample=False,
-                early_stopping=True
-            )
-            summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-            return summary
-        except Exception as e:
-            logger.error(f"Error summarizing topic: {e}")
-            return "Summary generation failed."
+        summary = self.summarize_many({"": texts}, budget_seconds=float("inf"))[""]
+        return summary if summary is not None else "Summary generation failed."
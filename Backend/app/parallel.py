@@ -0,0 +1,115 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from app.preprocessing.cleaner import clean_many as clean_batch
+from app.trends.heavy_hitters import TREND_SKETCH_CAPACITY, HeavyHitterSketch
+from app.trends.trend_detector import count_terms, score_trends
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes for cleaning, keyword extraction and sentiment. 0 or 1 keeps everything in-process.
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "0"))
+# Batches smaller than this aren't worth the inter-process round trip
+PARALLEL_MIN_POSTS = int(os.getenv("PARALLEL_MIN_POSTS", "200"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def enabled(n_items=None):
+    if PIPELINE_WORKERS <= 1:
+        return False
+    return n_items is None or n_items >= PARALLEL_MIN_POSTS
+
+
+def _init_worker(threads):
+    # Split the cores between workers instead of letting every worker's torch use all of them
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(threads))
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            threads = max(1, (os.cpu_count() or 1) // PIPELINE_WORKERS)
+            # spawn, not fork: the parent may already hold torch threads and open sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=PIPELINE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+            logger.info(f"Started {PIPELINE_WORKERS} pipeline worker processes.")
+        return _executor
+
+
+def _shards(items, n_shards):
+    """Splits items into up to n_shards contiguous slices, preserving order."""
+    size = -(-len(items) // n_shards) if items else 0
+    return [items[i:i + size] for i in range(0, len(items), size)] if size else []
+
+
+def _map_shards(func, items, *args):
+    shards = _shards(items, PIPELINE_WORKERS)
+    futures = [get_executor().submit(func, shard, *args) for shard in shards]
+    # Results are collected in shard order, so output order matches single-process mode
+    return [future.result() for future in futures]
+
+
+# --- Worker-side functions (run in the pool processes) ---
+
+def _clean_shard(texts):
+    return clean_batch(texts)
+
+
+def _sketch_shard(posts, capacity):
+    # Sent back serialized: a few bytes per term instead of a pickled dict of lists
+    return HeavyHitterSketch(capacity).add_posts(posts).to_bytes()
+
+
+def _sentiment_shard(texts, batch_size):
+    # Each worker loads its own model once, on its first shard, through its own registry
+    from app.ml.registry import models
+    return models.get("sentiment").analyze_many(texts, batch_size=batch_size)
+
+
+# --- Parent-side API ---
+
+def clean_many(texts):
+    """cleaner.clean_many over texts, sharded across the worker pool."""
+    return [cleaned for shard in _map_shards(_clean_shard, list(texts)) for cleaned in shard]
+
+
+def detect_trends(posts, top_n=10, exclude=None):
+    """
+    trend_detector.detect_trends with counting sharded across the worker pool.
+    Shard counters are merged in shard order, which keeps first-seen order
+    (the tie-break) identical to a single sequential pass.
+    """
+    hashtag_counter = Counter()
+    keyword_counter = Counter()
+    engagement_counter = Counter()
+    for hashtags, keywords, engagement in _map_shards(count_terms, list(posts)):
+        hashtag_counter.update(hashtags)
+        keyword_counter.update(keywords)
+        engagement_counter.update(engagement)
+    return score_trends(hashtag_counter, keyword_counter, engagement_counter, top_n=top_n, exclude=exclude)
+
+
+def detect_trends_sketched(posts, top_n=10, exclude=None, capacity=None):
+    """heavy_hitters.detect_trends_sketched with one sketch per shard, merged in shard order."""
+    sketch = None
+    for data in _map_shards(_sketch_shard, list(posts), capacity or TREND_SKETCH_CAPACITY):
+        shard = HeavyHitterSketch.from_bytes(data)
+        sketch = shard if sketch is None else sketch.merge(shard)
+    return sketch.top(top_n=top_n, exclude=exclude) if sketch else []
+
+
+def analyze_many(texts, batch_size=32):
+    """SentimentAnalyzer.analyze_many sharded across the worker pool, one model per worker."""
+    return [result for shard in _map_shards(_sentiment_shard, list(texts), batch_size) for result in shard]
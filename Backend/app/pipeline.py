@@ -4,216 +4,345 @@ import hashlib
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
 from app.api.bluesky_client import fetch_public_posts
-from app.preprocessing.cleaner import clean_text
-from app.trends.trend_detector import detect_trends, calculate_engagement
-from app.ml.sentiment import SentimentAnalyzer
-from app.ml.categorizer import Categorizer
+from app.batch import PostBatch
+from app.preprocessing.cleaner import clean_text, clean_many, URL_PATTERN
+from app.preprocessing.dedup import DEDUP_ENABLED, collapse_duplicates
+from app.trends.trend_detector import calculate_engagement
+from app.trends.trend_engine import detect_trends_vectorized
+from app.trends.heavy_hitters import TREND_SKETCH_ENABLED, detect_trends_sketched
+from app.trends.velocity import detect_trends_by_velocity
+from app.trends.topic_assigner import TopicAssigner
+from app.ml.registry import models
+from app import metrics, parallel
+from app.storage.post_store import get_post_store
+from app.storage.rollups import get_rollup_store
+from app.progress import PROGRESS_POST_BATCH
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize ML models
-# Loading them at module level ensures they are loaded once
-sentiment_analyzer = SentimentAnalyzer()
-categorizer = Categorizer()
+# ML models are loaded lazily through the registry on first use (or by the
+# background warm-up in app.main), so importing this module stays cheap
+
+# Number of posts per sentiment forward pass
+SENTIMENT_BATCH_SIZE = 32
 
 def generate_id() -> str:
     """Generates a unique ID."""
     return str(uuid.uuid4())
 
+def post_id_from_uri(uri: str) -> str:
+    """Stable post ID derived from the Bluesky URI, so a post keeps its ID across runs."""
+    return hashlib.md5(uri.encode('utf-8')).hexdigest()
+
 def topic_id_from_name(name: str) -> str:
     return hashlib.md5(name.encode('utf-8')).hexdigest()
 
-def run_pipeline(limit: int = 100, query: str = "tech") -> Dict[str, Any]:
+def prepare_post(post: Dict[str, Any], cleaned_text: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Cleans a fetched post into the mutable dict the later steps fill in. None if nothing is left after cleaning.
+    cleaned_text can be passed in when the text was already cleaned (e.g. by the worker pool).
+    """
+    if cleaned_text is None:
+        # Posts loaded from the post store carry the cleaned text from an earlier run
+        cleaned_text = post.get("cleaned_text")
+    if cleaned_text is None:
+        cleaned_text = clean_text(post["text"])
+    if not cleaned_text:
+        return None
+        
+    uri = post.get("uri")
+    return {
+        "id": post_id_from_uri(uri) if uri else generate_id(),
+        "uri": uri,
+        "original_text": post["text"],
+        "cleaned_text": cleaned_text,
+        "created_at": post["created_at"],
+        "likes": post["likes"],
+        "reposts": post["reposts"],
+        "engagement_score": calculate_engagement(post["likes"], post["reposts"]),
+        "topic_names": [], # To be assigned
+        # To be calculated, unless stored from an earlier run
+        "sentiment_score": post.get("sentiment_score") or 0.0,
+        "sentiment_label": post.get("sentiment_label")
+    }
+
+@metrics.timed_run
+def run_pipeline(limit: int = 100, query: str = "tech", multi_topic: bool = False,
+                 summaries: bool = False, ranking: str = "frequency", progress=None) -> Dict[str, Any]:
     """
     Executes the full data processing pipeline.
     
     Steps:
     1. Fetch public Bluesky posts.
-    2. Clean and preprocess text.
-    3. Detect trending topics using hashtags + keywords.
-    4. Associate posts with detected topics.
+    2. Clean and preprocess text, collapsing near-duplicate posts into one (DEDUP_ENABLED).
+    3. Detect trending topics using hashtags + keywords, ranked by frequency and engagement
+       or, with ranking="velocity"/"burst", by how fast they are rising over time buckets.
+    4. Associate posts with detected topics (one topic each, or all matching ones with multi_topic).
     5. Perform sentiment analysis on posts.
     6. Categorize topics.
     7. Aggregate results into Categories -> Topics -> Posts.
+    8. With summaries, summarize each topic's posts (T5, cached, within SUMMARY_BUDGET_SECONDS).
+
+    Each step is timed through app.metrics; the result carries the run's
+    per-stage timings under "timings" unless PIPELINE_METRICS is off.
+
+    With an app.progress.ProgressReporter, partial results are emitted as the
+    steps finish and the run stops at the next emit once it is cancelled.
     """
     logger.info("Starting pipeline execution...")
     
     # Step 1: Fetch posts
-    logger.info(f"Fetching posts with query='{query}' and limit={limit}...")
-    raw_posts = fetch_public_posts(limit=limit, query=query)
+    # With the post store, only posts newer than the last stored ones are fetched (and
+    # everything while the store holds fewer than `limit`); refetched posts get fresh
+    # engagement. The run then uses the newest `limit` stored posts, with their earlier analysis.
+    store = get_post_store()
+    since = store.fetch_since(query, limit) if store else None
+    logger.info(f"Fetching posts with query='{query}', limit={limit}, since={since}...")
+    with metrics.stage("fetch") as stage:
+        raw_posts = fetch_public_posts(limit=limit, query=query, since=since)
+        stage.items = len(raw_posts)
     logger.info(f"Fetched {len(raw_posts)} posts.")
+    if store:
+        with metrics.stage("store_load") as stage:
+            store.add_posts(raw_posts, query)
+            # Posts without a URI can't be stored; keep them for this run only
+            raw_posts = store.recent_posts(query, limit) + [post for post in raw_posts if not post.get("uri")]
+            raw_posts = raw_posts[:limit]
+            stage.items = len(raw_posts)
+        logger.info(f"Using {len(raw_posts)} posts from the post store.")
+    if progress:
+        progress.emit("stage", {"stage": "fetch", "posts": len(raw_posts)})
     
     # Step 2: Clean text and prepare post objects
     # We maintain a list of mutable post dictionaries to add analysis results
     processed_posts = []
-    for post in raw_posts:
-        cleaned_text = clean_text(post["text"])
-        if not cleaned_text:
-            continue
-            
-        processed_posts.append({
-            "id": generate_id(),
-            "original_text": post["text"],
-            "cleaned_text": cleaned_text,
-            "created_at": post["created_at"],
-            "likes": post["likes"],
-            "reposts": post["reposts"],
-            "engagement_score": calculate_engagement(post["likes"], post["reposts"]),
-            "topic_id": None, # To be assigned
-            "sentiment_score": 0.0, # To be calculated
-            "sentiment_label": "Neutral"
-        })
+    cleaned_texts = [post.get("cleaned_text") for post in raw_posts]
+    uncleaned = [i for i, cleaned_text in enumerate(cleaned_texts) if cleaned_text is None]
+    with metrics.stage("clean", items=len(uncleaned)):
+        clean = parallel.clean_many if parallel.enabled(len(uncleaned)) else clean_many
+        for i, cleaned_text in zip(uncleaned, clean([raw_posts[i]["text"] for i in uncleaned])):
+            cleaned_texts[i] = cleaned_text
+        for post, cleaned_text in zip(raw_posts, cleaned_texts):
+            processed = prepare_post(post, cleaned_text)
+            if processed:
+                processed_posts.append(processed)
+
+    # Copies of a post (bots, quote chains) are analysed once: the cluster's representative
+    # carries their engagement and a duplicate_count, so spam can't inflate term counts
+    prepared_posts = processed_posts
+    if DEDUP_ENABLED:
+        with metrics.stage("dedup", items=len(processed_posts)):
+            processed_posts = collapse_duplicates(processed_posts)
+        logger.info(f"Collapsed {len(prepared_posts)} posts into {len(processed_posts)} distinct posts.")
+    if progress:
+        progress.emit("stage", {"stage": "clean", "posts": len(processed_posts)})
         
     # Step 3: Detect Trends (Topics)
-    # We pass the raw objects because detect_trends might need original text or specific fields
-    # But detect_trends expects a list of dicts with "text", "likes", "reposts"
-    # We can pass the processed_posts as they have these fields (mapped or added)
-    # Actually detect_trends uses "text" key. processed_posts has "original_text" and "cleaned_text".
-    # Let's create a temporary list for trend detection to ensure compatibility
-    posts_for_detection = [
-        {"text": p["cleaned_text"], "likes": p["likes"], "reposts": p["reposts"]} 
-        for p in processed_posts
-    ]
+    # From here on the posts are read as columns; the dicts are only updated for the post store
+    batch = PostBatch.from_posts(processed_posts)
     
     # Get top 20 trends (exclude the query term to avoid trivial topics)
-    trends = detect_trends(posts_for_detection, top_n=20, exclude={query.lower()})
+    with metrics.stage("trends", items=len(batch)):
+        if ranking != "frequency":
+            trends = detect_trends_by_velocity(batch, top_n=20, exclude={query.lower()}, ranking=ranking)
+        elif TREND_SKETCH_ENABLED:
+            # Bounded memory, approximate counts (see app/trends/heavy_hitters.py for the error bounds)
+            if parallel.enabled(len(batch)):
+                trends = parallel.detect_trends_sketched(batch.trend_posts(), top_n=20, exclude={query.lower()})
+            else:
+                trends = detect_trends_sketched(batch, top_n=20, exclude={query.lower()})
+        elif parallel.enabled(len(batch)):
+            trends = parallel.detect_trends(batch.trend_posts(), top_n=20, exclude={query.lower()})
+        else:
+            trends = detect_trends_vectorized(batch, top_n=20, exclude={query.lower()})
     logger.info(f"Detected {len(trends)} trends.")
+    if progress:
+        # Topics are known before any model runs: the first thing a client can show
+        progress.emit("topics", {"topics": [
+            {"id": topic_id_from_name(name), "name": name, "trend_score": score} for name, score in trends
+        ]})
     
-    # Create Topic objects
-    topics_map = {} # trend_name -> topic_data
-    for trend_name, trend_score in trends:
-        topics_map[trend_name] = {
-            "id": topic_id_from_name(trend_name),
-            "name": trend_name,
-            "category_id": None, # To be assigned
-            "post_ids": [],
-            "engagement_score": 0, # To be aggregated
-            "sentiment_sum": 0.0, # To be aggregated
-            "post_count": 0,
-            "trend_score": trend_score # Keep for reference
-        }
-        
+    results = assemble_results(processed_posts, trends, multi_topic=multi_topic, summaries=summaries,
+                               progress=progress, batch=batch)
+    if store:
+        for post in prepared_posts:
+            # Collapsed copies share their representative's analysis
+            representative = post.get("duplicate_of")
+            if representative is not None:
+                post["sentiment_score"] = representative["sentiment_score"]
+                post["sentiment_label"] = representative["sentiment_label"]
+                post["topic_names"] = representative["topic_names"]
+        with metrics.stage("store_save", items=len(prepared_posts)):
+            store.save_analysis(prepared_posts)
+
+    # Step 9: Fold the run into the hourly topic/category rollups behind /analytics
+    rollups = get_rollup_store()
+    if rollups:
+        category_names = {category["id"]: category["name"] for category in results["categories"]}
+        topic_categories = {topic["name"]: category_names[topic["category_id"]] for topic in results["topics"]}
+        try:
+            with metrics.stage("rollups", items=len(prepared_posts)):
+                rollups.upsert(prepared_posts, topic_categories)
+        except Exception as e:
+            logger.error(f"Failed to update rollups: {e}")
+    logger.info("Pipeline execution completed.")
+    return results
+
+def assemble_results(processed_posts: List[Dict[str, Any]], trends, multi_topic: bool = False,
+                     summaries: bool = False, progress=None, batch: Optional[PostBatch] = None) -> Dict[str, Any]:
+    """
+    Steps 4-8 of the pipeline: assigns prepared posts to the detected trends,
+    scores sentiment for assigned posts that don't have it yet, categorizes
+    the topics and aggregates everything into Categories -> Topics -> Posts,
+    optionally with a generated summary per topic. progress is passed on
+    from run_pipeline.
+
+    The work is done on a PostBatch of processed_posts (built here unless
+    passed in). Topic names and new sentiment are also written back to the
+    post dicts, which the post store and streaming windows keep.
+    """
+    if batch is None:
+        batch = PostBatch.from_posts(processed_posts)
+    topic_names = [trend_name for trend_name, _ in trends]
+    topic_ids = [topic_id_from_name(trend_name) for trend_name in topic_names]
+    topic_numbers = {trend_name: i for i, trend_name in enumerate(topic_names)}
+
     # Step 4: Associate Posts with Topics
-    # Strategy: Assign post to the first matching top trend (simple, deterministic)
-    # Or best match? Simple: if post contains trend keyword.
-    
-    assigned_posts = []
+    # Strategy: Assign post to the most important trend it contains as a whole word
+    # (or to every trend it contains when multi_topic is set), in one scan per post.
+    # Posts that match no trend are left out of the results.
+    assigner = TopicAssigner(topic_names)
     
-    for post in processed_posts:
-        matched_topic_name = None
-        
-        # Check against trends in order of importance (trend_score)
-        for trend_name, _ in trends:
-            # Check if trend_name is in cleaned_text (whole word match preferred)
-            # Using simple string inclusion for robustness as per "simple logic"
-            if trend_name in post["cleaned_text"]:
-                matched_topic_name = trend_name
-                break
-        
-        if matched_topic_name:
-            topic = topics_map[matched_topic_name]
-            
-            # Step 5: Sentiment Analysis
-            sentiment_result = sentiment_analyzer.analyze(post["cleaned_text"])
-            post["sentiment_score"] = sentiment_result["score"]
-            post["sentiment_label"] = sentiment_result["label"]
-            post["topic_id"] = topic["id"]
-            
-            # Update Topic Stats
-            topic["post_ids"].append(post["id"])
-            topic["post_count"] += 1
-            topic["engagement_score"] += post["engagement_score"]
-            topic["sentiment_sum"] += post["sentiment_score"]
-            
-            assigned_posts.append(post)
-        else:
-            # Post didn't match any top trend, ignore or put in "Other"?
-            # Contract says "Posts (id, topic_id...)"
-            # If we exclude them, we reduce noise. Let's exclude for now.
-            pass
-            
-    # Step 6: Categorize Topics and Aggregate
-    categories_map = {} # category_name -> category_data
+    with metrics.stage("assign_topics", items=len(batch)):
+        matches = [assigner.assign(text, multi_topic=multi_topic) for text in batch.cleaned_texts]
+        batch.set_topics(matches, topic_numbers)
+        for post, names in zip(processed_posts, matches):
+            if names:
+                post["topic_names"] = names
+    assigned = batch.assigned().tolist()
     
-    final_topics = []
-    
-    for topic_name, topic_data in topics_map.items():
-        if topic_data["post_count"] == 0:
-            continue
-            
-        # Calculate average sentiment
-        topic_data["avg_sentiment"] = topic_data["sentiment_sum"] / topic_data["post_count"]
-        
-        # Categorize
-        category_name = categorizer.categorize(topic_name)
-        
-        # Create Category if not exists
-        if category_name not in categories_map:
-            categories_map[category_name] = {
-                "id": generate_id(),
-                "name": category_name,
-                "topic_ids": [],
-                "total_posts": 0,
-                "sentiment_sum": 0.0,
-                "total_engagement": 0.0
-            }
+    # Step 5: Sentiment Analysis
+    # Run assigned posts through the model in batches instead of one call per post.
+    # Posts that were already scored (e.g. kept from an earlier streaming snapshot) are skipped.
+    pending = [i for i in assigned if batch.sentiment_label[i] is None]
+    if progress:
+        scored = [i for i in assigned if batch.sentiment_label[i] is not None]
+        for start in range(0, len(scored), PROGRESS_POST_BATCH):
+            progress.emit("posts", {"posts": batch.to_records(scored[start:start + PROGRESS_POST_BATCH], topic_ids)})
+    # Only loaded (and its cache stats logged) when this run has posts to score in-process
+    sentiment_model = None
+    with metrics.stage("sentiment", items=len(pending)):
+        if parallel.enabled(len(pending)):
+            # Sharded across worker processes, each with its own model
+            analyze_many = parallel.analyze_many
+        elif pending:
+            sentiment_model = models.get("sentiment")
+            analyze_many = sentiment_model.analyze_many
+        # A streamed run scores in chunks so each chunk can be sent as soon as it's done
+        chunk_size = PROGRESS_POST_BATCH if progress else max(1, len(pending))
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            sentiment_results = analyze_many(
+                [batch.cleaned_texts[i] for i in chunk],
+                batch_size=SENTIMENT_BATCH_SIZE
+            )
+            for i, sentiment_result in zip(chunk, sentiment_results):
+                batch.sentiment_score[i] = sentiment_result["score"]
+                batch.sentiment_label[i] = sentiment_result["label"]
+                processed_posts[i]["sentiment_score"] = sentiment_result["score"]
+                processed_posts[i]["sentiment_label"] = sentiment_result["label"]
+            if progress:
+                progress.emit("posts", {"posts": batch.to_records(chunk, topic_ids)})
+
+    # Topic stats: group-by over the (post, topic) assignments
+    topic_stats = batch.group_by_topic(len(topic_names))
+    active = np.flatnonzero(topic_stats["post_count"] > 0)
             
-        category = categories_map[category_name]
-        topic_data["category_id"] = category["id"]
-        
-        # Update Category Stats
-        category["topic_ids"].append(topic_data["id"])
-        category["total_posts"] += topic_data["post_count"]
-        category["sentiment_sum"] += topic_data["sentiment_sum"]
-        category["total_engagement"] += topic_data["engagement_score"]
-        
-        final_topics.append({
-            "id": topic_data["id"],
-            "name": topic_data["name"],
-            "category_id": topic_data["category_id"],
-            "post_count": topic_data["post_count"],
-            "engagement_score": topic_data["engagement_score"],
-            "avg_sentiment": topic_data["avg_sentiment"]
-        })
+    # Step 6: Categorize Topics
+    # Categorize every topic that has posts in one call so batched categorizers can use a single pass
+    categorizer = models.get("categorizer")
+    active_names = [topic_names[t] for t in active.tolist()]
+    with metrics.stage("categorize", items=len(active_names)):
+        topic_categories = categorizer.categorize_many(active_names)
+
+    # Step 7: Aggregate topics into categories (in order of each category's first topic)
+    category_names = list(dict.fromkeys(topic_categories))
+    category_numbers = {name: i for i, name in enumerate(category_names)}
+    topic_category = np.fromiter(
+        (category_numbers[name] for name in topic_categories), dtype=np.int64, count=len(topic_categories)
+    )
+    post_count = topic_stats["post_count"][active]
+    engagement = topic_stats["engagement_score"][active]
+    sentiment_sum = topic_stats["sentiment_sum"][active]
+    n_categories = len(category_names)
+    category_ids = [generate_id() for _ in category_names]
+    # Categories are aggregated over distinct posts: with multi_topic, a post in two
+    # topics of the same category counts once, as it does in the rollups
+    category_of_topic = np.full(len(topic_names), -1, dtype=np.int64)
+    category_of_topic[active] = topic_category
+    category_stats = batch.group_by_category(category_of_topic, n_categories)
+
+    final_topics = [
+        {
+            "id": topic_ids[t],
+            "name": topic_names[t],
+            "category_id": category_ids[c],
+            "post_count": count,
+            "engagement_score": topic_engagement,
+            "avg_sentiment": topic_sentiment / count
+        }
+        for t, c, count, topic_engagement, topic_sentiment in zip(
+            active.tolist(), topic_category.tolist(), post_count.tolist(), engagement.tolist(), sentiment_sum.tolist()
+        )
+    ]
 
     # Finalize Categories
-    final_categories = []
-    for cat_name, cat_data in categories_map.items():
-        if cat_data["total_posts"] > 0:
-            avg_sent = cat_data["sentiment_sum"] / cat_data["total_posts"]
-            # Relevance Score: Average Engagement per Post
-            relevance_score = cat_data["total_engagement"] / cat_data["total_posts"]
-        else:
-            avg_sent = 0.0
-            relevance_score = 0.0
-            
-        final_categories.append({
-            "id": cat_data["id"],
-            "name": cat_data["name"],
-            "topic_count": len(cat_data["topic_ids"]),
-            "total_posts": cat_data["total_posts"],
-            "avg_sentiment": avg_sent,
-            "relevance_score": relevance_score
-        })
-        
+    # Relevance Score: Average Engagement per Post
+    final_categories = [
+        {
+            "id": category_id,
+            "name": name,
+            "topic_count": topic_count,
+            "total_posts": total_posts,
+            "avg_sentiment": category_sentiment / total_posts,
+            "relevance_score": category_engagement / total_posts
+        }
+        for category_id, name, topic_count, total_posts, category_sentiment, category_engagement in zip(
+            category_ids, category_names,
+            np.bincount(topic_category, minlength=n_categories).tolist(),
+            category_stats["post_count"].tolist(),
+            category_stats["sentiment_sum"].tolist(),
+            category_stats["engagement_score"].tolist()
+        )
+    ]
+
+    if progress:
+        progress.emit("categories", {"categories": final_categories, "topics": final_topics})
+
+    # Step 8: Summarize topics (optional)
+    if summaries:
+        # Each topic's posts, most engaging first, so truncation keeps the most important ones
+        entry_posts, entry_topics = batch.topic_entries()
+        order = np.lexsort((entry_posts, -batch.engagement[entry_posts], entry_topics))
+        topic_texts = {name: [] for name in active_names}
+        for i, t in zip(entry_posts[order].tolist(), entry_topics[order].tolist()):
+            topic_texts[topic_names[t]].append(URL_PATTERN.sub("", batch.texts[i]).strip())
+        with metrics.stage("summarize", items=len(topic_texts)):
+            topic_summaries = models.get("summarizer").summarize_many(topic_texts)
+        for topic in final_topics:
+            topic["summary"] = topic_summaries.get(topic["name"])
+
     # Format final Posts output
-    final_posts = []
-    for p in assigned_posts:
-        final_posts.append({
-            "id": p["id"],
-            "topic_id": p["topic_id"],
-            "text": p["original_text"],
-            "sentiment_score": p["sentiment_score"],
-            "posted_at": p["created_at"],
-            "engagement_score": p["engagement_score"],
-            "likes": p["likes"],
-            "reposts": p["reposts"]
-        })
+    final_posts = batch.to_records(assigned, topic_ids)
     
-    logger.info("Pipeline execution completed.")
+    if sentiment_model is not None:
+        logger.info(f"Sentiment cache: {sentiment_model.cache.stats()}")
+    logger.info(f"Category cache: {categorizer.cache.stats()}")
     
     return {
         "categories": final_categories,
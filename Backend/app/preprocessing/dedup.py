@@ -0,0 +1,109 @@
+import os
+import zlib
+
+import numpy as np
+
+from app.trends.trend_detector import calculate_engagement
+
+# Collapse near-duplicate posts (bot copies, quote chains) before trends and sentiment
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Estimated Jaccard similarity of word shingles at which two posts count as copies
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+SHINGLE_SIZE = 3
+# 16 bands of 4 rows: pairs above ~0.5 similarity share a bucket with high probability,
+# and the signature comparison then applies DEDUP_THRESHOLD
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(1)
+# Fixed seed: signatures (and so clusters) are the same in every process and run
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+# Posts whose shingles are hashed together in one matrix, bounding memory per step
+_CHUNK_POSTS = 2000
+
+
+def shingles(text):
+    """Hashes of the text's word 3-grams (the whole text when it's shorter)."""
+    words = text.split()
+    if len(words) <= SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signatures(texts):
+    """(len(texts), NUM_PERM) MinHash signatures of the texts' shingle sets."""
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint64)
+    for start in range(0, len(texts), _CHUNK_POSTS):
+        sets = [shingles(text) for text in texts[start:start + _CHUNK_POSTS]]
+        hashes = np.fromiter((h for s in sets for h in s), dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(s) for s in sets[:-1]])
+        # Universal hashing (a*x + b) mod p; crc32 values (< 2^32) times a (< 2^31) can't overflow uint64
+        permuted = (hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME
+        signatures[start:start + len(sets)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures
+
+
+def cluster_near_duplicates(texts, threshold=DEDUP_THRESHOLD):
+    """
+    Groups texts whose estimated shingle Jaccard similarity is at least threshold.
+    Returns a cluster label per text: the index of the cluster's first text.
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if len(texts) < 2:
+        return parent
+    signatures = minhash_signatures(texts)
+    for band in range(BANDS):
+        buckets = {}
+        band_rows = signatures[:, band * ROWS:(band + 1) * ROWS]
+        for i, key in enumerate(map(bytes, band_rows)):
+            head = buckets.setdefault(key, i)
+            if head == i:
+                continue
+            # Only members of a shared bucket are compared, against the bucket's first text
+            root_head, root_i = find(head), find(i)
+            if root_head != root_i and np.mean(signatures[head] == signatures[i]) >= threshold:
+                parent[max(root_head, root_i)] = min(root_head, root_i)
+    return [find(i) for i in range(len(texts))]
+
+
+def collapse_duplicates(posts, threshold=DEDUP_THRESHOLD):
+    """
+    Collapses near-duplicate prepared posts (dicts with cleaned_text, likes and reposts)
+    into one representative per cluster: the member with the most engagement of its own.
+    The representative gets the cluster's summed likes, reposts and engagement_score
+    and a duplicate_count; the other members are dropped from the returned list
+    (order is preserved) and point at it through duplicate_of.
+    """
+    labels = cluster_near_duplicates([post["cleaned_text"] for post in posts], threshold)
+    clusters = {}
+    for post, label in zip(posts, labels):
+        clusters.setdefault(label, []).append(post)
+
+    representatives = {}
+    for label, members in clusters.items():
+        best = max(members, key=lambda post: calculate_engagement(post["likes"], post["reposts"]))
+        if len(members) > 1:
+            best["likes"] = sum(post["likes"] for post in members)
+            best["reposts"] = sum(post["reposts"] for post in members)
+            best["engagement_score"] = calculate_engagement(best["likes"], best["reposts"])
+        best["duplicate_count"] = len(members)
+        representatives[id(best)] = best
+        for post in members:
+            if post is not best:
+                post["duplicate_of"] = best
+    return [post for post in posts if id(post) in representatives]
@@ -0,0 +1,94 @@
+"""
+Progressive results for a pipeline run, sent as Server-Sent Events.
+
+run_pipeline takes an optional ProgressReporter and emits events as stages
+finish: "stage" (fetch/clean progress), "topics" (detected trends, before any
+model runs), "posts" (batches of posts with their sentiment), "categories"
+(category assignments and topic/category aggregates), then "result" (the
+full response) or "error". Every emit is also a cancellation point: once the
+client disconnects, the next emit raises PipelineCancelled and the run stops.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Posts per "posts" event; sentiment is scored in chunks of this size when streaming
+PROGRESS_POST_BATCH = int(os.getenv("PROGRESS_POST_BATCH", "64"))
+# A comment line is sent after this many idle seconds so proxies keep the connection open
+PROGRESS_KEEPALIVE_SECONDS = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+PROGRESS_WORKERS = int(os.getenv("PROGRESS_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=PROGRESS_WORKERS, thread_name_prefix="pipeline-stream")
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class ProgressReporter:
+    """Passes pipeline events to a callback until cancelled."""
+
+    def __init__(self, callback):
+        self._callback = callback
+        self.cancelled = threading.Event()
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise PipelineCancelled()
+
+    def emit(self, event, data):
+        self.check()
+        self._callback(event, data)
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_events(run, request, **params):
+    """
+    Runs run(progress=..., **params) on a worker thread and yields its events as
+    SSE text. Stops the run when the client goes away.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def put(event, data):
+        # Encoded on the pipeline thread, before later steps can change the objects
+        loop.call_soon_threadsafe(queue.put_nowait, format_event(event, data))
+
+    reporter = ProgressReporter(put)
+
+    def work():
+        try:
+            result = run(progress=reporter, **params)
+            reporter.emit("result", result)
+        except PipelineCancelled:
+            logger.info(f"Streamed pipeline run cancelled by the client: {params}")
+        except Exception as e:
+            logger.error(f"Streamed pipeline run failed: {e}")
+            put("error", {"detail": str(e)})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    loop.run_in_executor(_executor, work)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), PROGRESS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        # Runs on normal completion and when the server drops the generator after a disconnect
+        reporter.cancelled.set()
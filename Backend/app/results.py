@@ -0,0 +1,127 @@
+import threading
+from collections import defaultdict
+
+TOPIC_FIELDS = {
+    "id", "name", "category_id", "post_count", "engagement_score", "avg_sentiment",
+    "sentiment_distribution", "total_likes", "total_reposts", "first_posted_at", "last_posted_at", "summary",
+}
+POST_FIELDS = {
+    "id", "topic_id", "topic_ids", "text", "sentiment_score", "posted_at", "engagement_score", "likes", "reposts",
+    "duplicate_count",
+}
+MAX_PAGE_SIZE = 200
+
+
+def parse_fields(fields, allowed):
+    """Turns a "a,b,c" projection parameter into a set of field names. None means all fields."""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def project(item, fields):
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
+
+
+def sentiment_bucket(score):
+    # Same buckets as the dashboard's sentiment_distribution
+    if score >= 2:
+        return "extreme_positive"
+    if score >= 1:
+        return "positive"
+    if score == 0:
+        return "neutral"
+    if score <= -2:
+        return "extreme_negative"
+    return "negative"
+
+
+class RunView:
+    """
+    Read-side index over one completed pipeline result.
+
+    Posts are grouped by topic once, and per-topic aggregates the dashboard
+    used to compute client-side (sentiment distribution, like/repost totals,
+    time span) are precomputed, so callers can page through a topic's posts
+    or list a category's topics without downloading the whole response.
+    """
+
+    def __init__(self, result):
+        self.categories = result["categories"]
+        self.posts_by_topic = defaultdict(list)
+        for post in result["posts"]:
+            for topic_id in post.get("topic_ids") or [post["topic_id"]]:
+                self.posts_by_topic[topic_id].append(post)
+
+        self.topics = []
+        for topic in result["topics"]:
+            posts = self.posts_by_topic.get(topic["id"], [])
+            distribution = dict.fromkeys(
+                ("extreme_negative", "negative", "neutral", "positive", "extreme_positive"), 0
+            )
+            for post in posts:
+                distribution[sentiment_bucket(post["sentiment_score"])] += 1
+            posted = sorted(post["posted_at"] for post in posts if post.get("posted_at"))
+            self.topics.append({
+                **topic,
+                "sentiment_distribution": distribution,
+                "total_likes": sum(post.get("likes", 0) for post in posts),
+                "total_reposts": sum(post.get("reposts", 0) for post in posts),
+                "first_posted_at": posted[0] if posted else None,
+                "last_posted_at": posted[-1] if posted else None,
+            })
+        self.topics_by_id = {topic["id"]: topic for topic in self.topics}
+
+    def summary(self, fields=None):
+        """Categories and topics with their aggregates, without any posts."""
+        return {
+            "categories": self.categories,
+            "topics": [project(topic, fields) for topic in self.topics],
+        }
+
+    def list_topics(self, category_id=None, fields=None):
+        topics = self.topics
+        if category_id is not None:
+            topics = [topic for topic in topics if topic["category_id"] == category_id]
+        return [project(topic, fields) for topic in topics]
+
+    def topic_posts(self, topic_id, cursor=None, page_size=50, fields=None):
+        """
+        One page of a topic's posts. The cursor is the opaque next_cursor of
+        the previous page; a result never changes, so offsets stay valid.
+        """
+        if topic_id not in self.topics_by_id:
+            raise KeyError(topic_id)
+        posts = self.posts_by_topic.get(topic_id, [])
+        try:
+            start = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        # Negative offsets would slice from the end of the list
+        if start < 0 or start > len(posts):
+            raise ValueError("Invalid cursor")
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        end = start + page_size
+        return {
+            "items": [project(post, fields) for post in posts[start:end]],
+            "total": len(posts),
+            "next_cursor": str(end) if end < len(posts) else None,
+        }
+
+
+_view_lock = threading.Lock()
+
+
+def view_for(job):
+    """The RunView of a finished job, built on first use and kept with the job."""
+    with _view_lock:
+        view = getattr(job, "view", None)
+        if view is None:
+            view = job.view = RunView(job.result)
+        return view
@@ -0,0 +1,203 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.trends.velocity import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Set POST_STORE_PATH="" to disable the store and fetch everything on every run
+POST_STORE_PATH = os.getenv("POST_STORE_PATH", "post_store.sqlite3")
+# Incremental fetches reach this far back before the newest stored post, so posts from
+# the last hour come back from the API with fresh likes and reposts
+POST_STORE_REFRESH_SECONDS = float(os.getenv("POST_STORE_REFRESH_SECONDS", "3600"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    uri TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    cleaned_text TEXT,
+    created_at TEXT NOT NULL,
+    likes INTEGER NOT NULL DEFAULT 0,
+    reposts INTEGER NOT NULL DEFAULT 0,
+    sentiment_score REAL,
+    sentiment_label TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_created_at ON posts (created_at);
+
+CREATE TABLE IF NOT EXISTS post_queries (
+    query TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (query, uri)
+);
+CREATE INDEX IF NOT EXISTS post_queries_recent ON post_queries (query, created_at);
+
+CREATE TABLE IF NOT EXISTS post_topics (
+    topic TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (topic, uri)
+);
+CREATE INDEX IF NOT EXISTS post_topics_recent ON post_topics (topic, created_at);
+CREATE INDEX IF NOT EXISTS post_topics_uri ON post_topics (uri);
+"""
+
+POST_COLUMNS = "p.uri, p.text, p.cleaned_text, p.created_at, p.likes, p.reposts, p.sentiment_score, p.sentiment_label"
+
+
+def _row_to_post(row):
+    uri, text, cleaned_text, created_at, likes, reposts, sentiment_score, sentiment_label = row
+    return {
+        "uri": uri,
+        "text": text,
+        "cleaned_text": cleaned_text,
+        "created_at": created_at,
+        "likes": likes,
+        "reposts": reposts,
+        "sentiment_score": sentiment_score,
+        "sentiment_label": sentiment_label,
+    }
+
+
+class PostStore:
+    """
+    Embedded SQLite store of fetched posts and their analysis.
+
+    Posts are keyed by Bluesky URI and indexed by created_at, by the search
+    query that returned them and by the topics they were assigned to.
+    The newest created_at per query is the cursor for incremental fetching.
+    """
+
+    def __init__(self, path=POST_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def fetch_since(self, query, limit, refresh_seconds=POST_STORE_REFRESH_SECONDS):
+        """
+        The since cursor for the next fetch of query. None (fetch the newest posts)
+        while fewer than limit posts are stored, so a larger limit backfills;
+        otherwise the newest stored created_at, moved back refresh_seconds.
+        """
+        with self._lock:
+            count, latest = self._conn.execute(
+                "SELECT COUNT(*), MAX(created_at) FROM post_queries WHERE query = ?", (query,)
+            ).fetchone()
+        if count < limit or not latest:
+            return None
+        timestamp = parse_timestamp(latest)
+        if timestamp is None:
+            return latest
+        return datetime.fromtimestamp(timestamp - refresh_seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def add_posts(self, posts, query):
+        """Upserts fetched posts. Text and engagement are refreshed; stored analysis is kept."""
+        now = time.time()
+        rows = [
+            (post["uri"], post["text"], post["created_at"], post["likes"], post["reposts"], now)
+            for post in posts if post.get("uri")
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO posts (uri, text, created_at, likes, reposts, fetched_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (uri) DO UPDATE SET likes = excluded.likes, reposts = excluded.reposts, "
+                "fetched_at = excluded.fetched_at, "
+                # Edited text invalidates the analysis done on the old text
+                "cleaned_text = CASE WHEN posts.text = excluded.text THEN posts.cleaned_text END, "
+                "sentiment_score = CASE WHEN posts.text = excluded.text THEN posts.sentiment_score END, "
+                "sentiment_label = CASE WHEN posts.text = excluded.text THEN posts.sentiment_label END, "
+                "text = excluded.text",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO post_queries (query, uri, created_at) VALUES (?, ?, ?)",
+                [(query, row[0], row[2]) for row in rows]
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def save_analysis(self, posts):
+        """
+        Stores cleaned text, sentiment and topic assignments for processed pipeline posts
+        (dicts with uri, cleaned_text, sentiment_score, sentiment_label and topic_names).
+        """
+        posts = [post for post in posts if post.get("uri")]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE posts SET cleaned_text = ?, sentiment_score = ?, sentiment_label = ? WHERE uri = ?",
+                [
+                    (post["cleaned_text"], post["sentiment_score"], post["sentiment_label"], post["uri"])
+                    for post in posts
+                ]
+            )
+            # Topic assignments are replaced with the latest run's
+            self._conn.executemany("DELETE FROM post_topics WHERE uri = ?", [(post["uri"],) for post in posts])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO post_topics (topic, uri, created_at) VALUES (?, ?, ?)",
+                [
+                    (topic, post["uri"], post["created_at"])
+                    for post in posts for topic in post.get("topic_names", [])
+                ]
+            )
+            self._conn.commit()
+
+    def recent_posts(self, query, limit):
+        """The newest limit posts stored for query, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {POST_COLUMNS} FROM post_queries q JOIN posts p ON p.uri = q.uri "
+                "WHERE q.query = ? ORDER BY q.created_at DESC LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [_row_to_post(row) for row in rows]
+
+    def posts_by_topic(self, topic, since=None, until=None, limit=100):
+        """Posts last assigned to topic, newest first, optionally within [since, until)."""
+        sql = f"SELECT {POST_COLUMNS} FROM post_topics t JOIN posts p ON p.uri = t.uri WHERE t.topic = ?"
+        params = [topic]
+        if since:
+            sql += " AND t.created_at >= ?"
+            params.append(since)
+        if until:
+            sql += " AND t.created_at < ?"
+            params.append(until)
+        sql += " ORDER BY t.created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_post(row) for row in rows]
+
+    def posts_between(self, since, until, limit=1000):
+        """Posts created within [since, until), newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {POST_COLUMNS} FROM posts p WHERE p.created_at >= ? AND p.created_at < ? "
+                "ORDER BY p.created_at DESC LIMIT ?",
+                (since, until, limit)
+            ).fetchall()
+        return [_row_to_post(row) for row in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_post_store():
+    """The process-wide store, or None when POST_STORE_PATH is empty or the store can't be opened."""
+    global _store
+    if not POST_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = PostStore(POST_STORE_PATH)
+            except Exception as e:
+                logger.error(f"Failed to open post store at {POST_STORE_PATH}: {e}")
+                return None
+        return _store
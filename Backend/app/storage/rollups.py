@@ -0,0 +1,196 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from app.results import sentiment_bucket
+from app.trends.velocity import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Set ROLLUP_STORE_PATH="" to stop recording hourly rollups
+ROLLUP_STORE_PATH = os.getenv("ROLLUP_STORE_PATH", "rollups.sqlite3")
+
+HOUR = 3600
+TOPIC = "topic"
+CATEGORY = "category"
+HISTOGRAM = ("extreme_negative", "negative", "neutral", "positive", "extreme_positive")
+
+# hourly_rollups holds the aggregates the query endpoints read. WITHOUT ROWID clusters
+# the rows by (kind, name, hour), so one topic's time range is a contiguous scan.
+# rollup_contributions records what each post currently adds to which rollup, so a
+# post that is analysed again (new likes, new topics) replaces its old contribution.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS hourly_rollups (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    post_count INTEGER NOT NULL,
+    engagement_sum INTEGER NOT NULL,
+    sentiment_sum REAL NOT NULL,
+    {", ".join(f"{bucket} INTEGER NOT NULL" for bucket in HISTOGRAM)},
+    PRIMARY KEY (kind, name, hour)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hourly_rollups_hour ON hourly_rollups (kind, hour);
+
+CREATE TABLE IF NOT EXISTS rollup_contributions (
+    uri TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    posts INTEGER NOT NULL,
+    engagement INTEGER NOT NULL,
+    sentiment REAL NOT NULL,
+    PRIMARY KEY (uri, kind, name)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_COLUMNS = ("post_count", "engagement_sum", "sentiment_sum") + HISTOGRAM
+
+# SQLite's default limit on bound parameters is 999
+_URI_CHUNK = 500
+
+
+def hour_iso(hour):
+    return datetime.fromtimestamp(hour, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _rollup_dict(row):
+    post_count, engagement_sum, sentiment_sum = row[:3]
+    return {
+        "post_count": post_count,
+        "engagement_sum": engagement_sum,
+        "avg_sentiment": sentiment_sum / post_count if post_count else 0.0,
+        "sentiment_distribution": dict(zip(HISTOGRAM, row[3:])),
+    }
+
+
+class RollupStore:
+    """
+    Embedded SQLite store of per-hour topic and category aggregates:
+    post count, engagement sum, sentiment sum and sentiment histogram.
+
+    Runs upsert their posts as they complete; the query methods read only the
+    rollups, never raw posts. Counts follow the pipeline: a collapsed duplicate
+    cluster counts as duplicate_count posts with its representative's
+    engagement and sentiment. A post counts once per category even when several
+    of its topics are in the same category.
+    """
+
+    def __init__(self, path=ROLLUP_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def contributions(posts, topic_categories):
+        """(uri, kind, name, hour, posts, engagement, sentiment) rows for processed pipeline posts."""
+        rows = []
+        for post in posts:
+            timestamp = parse_timestamp(post.get("created_at"))
+            # Copies are counted through their representative's duplicate_count
+            if not post.get("uri") or timestamp is None or post.get("duplicate_of") is not None:
+                continue
+            hour = int(timestamp // HOUR) * HOUR
+            topics = post.get("topic_names") or []
+            categories = dict.fromkeys(topic_categories[topic] for topic in topics if topic in topic_categories)
+            for kind, names in ((TOPIC, topics), (CATEGORY, categories)):
+                for name in names:
+                    rows.append((post["uri"], kind, name, hour, post.get("duplicate_count", 1),
+                                 post["engagement_score"], post["sentiment_score"] or 0.0))
+        return rows
+
+    def upsert(self, posts, topic_categories):
+        """
+        Records a completed run: posts are processed pipeline posts (with uri,
+        created_at, topic_names, engagement_score and sentiment_score) and
+        topic_categories maps each topic name to its category name. Posts seen
+        by earlier runs have their previous contribution replaced.
+        """
+        uris = list(dict.fromkeys(post["uri"] for post in posts if post.get("uri")))
+        rows = self.contributions(posts, topic_categories)
+        deltas = defaultdict(lambda: [0, 0, 0.0] + [0] * len(HISTOGRAM))
+
+        def add(row, sign):
+            _, kind, name, hour, count, engagement, sentiment = row
+            delta = deltas[(kind, name, hour)]
+            delta[0] += sign * count
+            delta[1] += sign * engagement
+            delta[2] += sign * sentiment * count
+            delta[3 + HISTOGRAM.index(sentiment_bucket(sentiment))] += sign * count
+
+        with self._lock:
+            for start in range(0, len(uris), _URI_CHUNK):
+                chunk = uris[start:start + _URI_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for row in self._conn.execute(
+                    f"SELECT uri, kind, name, hour, posts, engagement, sentiment FROM rollup_contributions "
+                    f"WHERE uri IN ({placeholders})", chunk
+                ):
+                    add(row, -1)
+                self._conn.execute(f"DELETE FROM rollup_contributions WHERE uri IN ({placeholders})", chunk)
+            for row in rows:
+                add(row, 1)
+            self._conn.executemany(
+                "INSERT INTO rollup_contributions (uri, kind, name, hour, posts, engagement, sentiment) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+            # Posts analysed again unchanged cancel out and leave their rollups untouched
+            changed = [
+                (*key, *delta) for key, delta in deltas.items()
+                if any(delta[:2]) or abs(delta[2]) > 1e-9 or any(delta[3:])
+            ]
+            self._conn.executemany(
+                f"INSERT INTO hourly_rollups (kind, name, hour, {', '.join(ROLLUP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (3 + len(ROLLUP_COLUMNS)))}) "
+                "ON CONFLICT (kind, name, hour) DO UPDATE SET "
+                + ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_COLUMNS),
+                changed
+            )
+            self._conn.execute("DELETE FROM hourly_rollups WHERE post_count <= 0")
+            self._conn.commit()
+        return len(changed)
+
+    def series(self, kind, name, since, until):
+        """Hourly rollups of one topic or category for hours in [since, until) (epoch seconds), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT hour, {', '.join(ROLLUP_COLUMNS)} FROM hourly_rollups "
+                "WHERE kind = ? AND name = ? AND hour >= ? AND hour < ? ORDER BY hour",
+                (kind, name, since, until)
+            ).fetchall()
+        return [{"hour": hour_iso(row[0]), **_rollup_dict(row[1:])} for row in rows]
+
+    def totals(self, kind, since, until, limit=50):
+        """Every topic or category with posts in [since, until), summed over the range, most posts first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT name, {', '.join(f'SUM({column})' for column in ROLLUP_COLUMNS)} FROM hourly_rollups "
+                "WHERE kind = ? AND hour >= ? AND hour < ? GROUP BY name ORDER BY SUM(post_count) DESC, name LIMIT ?",
+                (kind, since, until, limit)
+            ).fetchall()
+        return [{"name": row[0], **_rollup_dict(row[1:])} for row in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rollup_store():
+    """The process-wide rollup store, or None when ROLLUP_STORE_PATH is empty or the store can't be opened."""
+    global _store
+    if not ROLLUP_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = RollupStore(ROLLUP_STORE_PATH)
+            except Exception as e:
+                logger.error(f"Failed to open rollup store at {ROLLUP_STORE_PATH}: {e}")
+                return None
+        return _store
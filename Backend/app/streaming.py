@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from app.pipeline import prepare_post, assemble_results
+from app.trends.trend_detector import extract_hashtags, extract_keywords, score_trends
+from app.trends.velocity import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Live mode settings for the /pipeline/stream endpoint
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "3600"))
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "30"))
+STREAM_FETCH_LIMIT = int(os.getenv("STREAM_FETCH_LIMIT", "100"))
+# Every distinct query gets its own poller; cap them and stop the ones nobody reads
+STREAM_MAX_QUERIES = int(os.getenv("STREAM_MAX_QUERIES", "32"))
+STREAM_IDLE_SECONDS = float(os.getenv("STREAM_IDLE_SECONDS", "900"))
+
+
+class StreamingPipeline:
+    """
+    Incremental version of run_pipeline over a sliding time window.
+
+    Posts are ingested continuously (from an iterable, an async iterator or
+    in batches). Each new post is cleaned and tokenized once; its hashtag,
+    keyword and engagement counts are added to running counters and
+    subtracted again when the post falls out of the window. Sentiment is
+    computed once per post, the first time it is assigned to a topic, and
+    kept for later snapshots.
+
+    snapshot() returns a PipelineResponse-shaped dict. It is rebuilt only
+    when posts were added or evicted since the last call, so repeated reads
+    are cheap.
+    """
+
+    def __init__(self, window_seconds: float = 3600, top_n: int = 20, exclude=None,
+                 multi_topic: bool = False, clock=time.time):
+        self.window_seconds = window_seconds
+        self.top_n = top_n
+        self.exclude = set(exclude or ())
+        self.multi_topic = multi_topic
+        self.clock = clock
+
+        self.hashtag_counter = Counter()
+        self.keyword_counter = Counter()
+        self.engagement_counter = Counter()
+
+        self._window = []  # heap of (timestamp, seq, post)
+        self._seq = itertools.count()
+        self._seen_uris = set()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._window)
+
+    def _count(self, post, sign):
+        engagement = post["engagement_score"]
+        for tag in post["hashtags"]:
+            self._bump(self.hashtag_counter, tag, 2 * sign)
+            self._bump(self.engagement_counter, tag, engagement * sign)
+        for kw in post["keywords"]:
+            self._bump(self.keyword_counter, kw, sign)
+            self._bump(self.engagement_counter, kw, engagement * sign)
+
+    @staticmethod
+    def _bump(counter, key, amount):
+        value = counter[key] + amount
+        if value:
+            counter[key] = value
+        else:
+            # Drop zeroed terms so memory follows the window, not everything ever seen
+            del counter[key]
+
+    def ingest(self, raw_post: Dict[str, Any]) -> bool:
+        """Adds one fetched post. Returns False if it was a duplicate, empty or already outside the window."""
+        uri = raw_post.get("uri")
+        if uri and uri in self._seen_uris:
+            return False
+
+        timestamp = parse_timestamp(raw_post.get("created_at"))
+        if timestamp is None:
+            timestamp = self.clock()
+        if timestamp < self.clock() - self.window_seconds:
+            return False
+
+        post = prepare_post(raw_post)
+        if not post:
+            return False
+        post["uri"] = uri
+        post["hashtags"] = extract_hashtags(post["cleaned_text"])
+        post["keywords"] = extract_keywords(post["cleaned_text"])
+
+        with self._lock:
+            if uri:
+                self._seen_uris.add(uri)
+            heapq.heappush(self._window, (timestamp, next(self._seq), post))
+            self._count(post, 1)
+            self._dirty = True
+        return True
+
+    def ingest_many(self, raw_posts: Iterable[Dict[str, Any]]) -> int:
+        added = sum(1 for raw_post in raw_posts if self.ingest(raw_post))
+        self.evict()
+        return added
+
+    async def consume(self, source, batch_size: int = 50):
+        """Ingests posts from an async iterator (e.g. AsyncBlueskyFetcher.stream_posts) as they arrive."""
+        batch = []
+        async for raw_post in source:
+            batch.append(raw_post)
+            if len(batch) >= batch_size:
+                self.ingest_many(batch)
+                batch = []
+        if batch:
+            self.ingest_many(batch)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Removes posts older than the window and subtracts their counts."""
+        cutoff = (self.clock() if now is None else now) - self.window_seconds
+        evicted = 0
+        with self._lock:
+            while self._window and self._window[0][0] < cutoff:
+                _, _, post = heapq.heappop(self._window)
+                self._count(post, -1)
+                if post["uri"]:
+                    self._seen_uris.discard(post["uri"])
+                evicted += 1
+            if evicted:
+                self._dirty = True
+        return evicted
+
+    def trends(self):
+        with self._lock:
+            return score_trends(self.hashtag_counter, self.keyword_counter, self.engagement_counter,
+                                top_n=self.top_n, exclude=self.exclude)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current results for the window, rebuilt only if the window changed."""
+        self.evict()
+        with self._lock:
+            if self._snapshot is not None and not self._dirty:
+                return self._snapshot
+            trends = score_trends(self.hashtag_counter, self.keyword_counter, self.engagement_counter,
+                                  top_n=self.top_n, exclude=self.exclude)
+            # Time order, like a batch run over the same posts
+            posts = [post for _, _, post in sorted(self._window, key=lambda item: item[:2])]
+            self._snapshot = assemble_results(posts, trends, multi_topic=self.multi_topic)
+            self._dirty = False
+            return self._snapshot
+
+
+# query -> StreamingPipeline fed by a background polling task
+_streams = {}
+_stream_tasks = {}
+_last_access = {}  # query -> time.monotonic() of the last get_stream
+_starting = {}  # query -> task doing the first fetch, shared by concurrent first callers
+_fetcher = None
+
+
+def _stop(query):
+    _streams.pop(query, None)
+    _last_access.pop(query, None)
+    task = _stream_tasks.pop(query, None)
+    if task:
+        task.cancel()
+
+
+def _evict_streams(now):
+    """Stops streams idle for STREAM_IDLE_SECONDS, then the least recently used until there is room for one more."""
+    for query, accessed in list(_last_access.items()):
+        if now - accessed > STREAM_IDLE_SECONDS:
+            logger.info(f"Stream '{query}' idle, stopping.")
+            _stop(query)
+    while _streams and len(_streams) >= STREAM_MAX_QUERIES:
+        query = min(_last_access, key=_last_access.get)
+        logger.info(f"Stream '{query}' evicted ({STREAM_MAX_QUERIES} live streams).")
+        _stop(query)
+
+
+async def _poll(stream, query):
+    while True:
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+        if time.monotonic() - _last_access.get(query, 0) > STREAM_IDLE_SECONDS:
+            # Nobody has read this stream for a while: stop polling for it
+            if _streams.get(query) is stream:
+                logger.info(f"Stream '{query}' idle, stopping.")
+                _streams.pop(query, None)
+                _last_access.pop(query, None)
+                _stream_tasks.pop(query, None)
+            return
+        try:
+            posts = await _fetcher.fetch_posts(query, STREAM_FETCH_LIMIT)
+            added = await asyncio.to_thread(stream.ingest_many, posts)
+            logger.info(f"Stream '{query}': {added} new posts, {len(stream)} in window.")
+        except Exception as e:
+            logger.error(f"Stream '{query}' poll failed: {e}")
+
+
+async def _start(query):
+    global _fetcher
+    from app.api.async_bluesky_client import AsyncBlueskyFetcher
+    if _fetcher is None:
+        _fetcher = AsyncBlueskyFetcher()
+
+    stream = StreamingPipeline(window_seconds=STREAM_WINDOW_SECONDS, exclude={query.lower()})
+    posts = await _fetcher.fetch_posts(query, STREAM_FETCH_LIMIT)
+    await asyncio.to_thread(stream.ingest_many, posts)
+    # Registered only once the first fetch worked, so a failed start is retried by the next caller
+    _evict_streams(time.monotonic())
+    _streams[query] = stream
+    _last_access[query] = time.monotonic()
+    _stream_tasks[query] = asyncio.create_task(_poll(stream, query))
+    return stream
+
+
+async def get_stream(query: str) -> StreamingPipeline:
+    """
+    Returns the live pipeline for query, starting it on first use.
+    The first call waits for an initial fetch (concurrent first callers
+    share it); after that posts are polled in the background and repeat
+    posts are skipped by URI. At most STREAM_MAX_QUERIES streams are live,
+    and streams unread for STREAM_IDLE_SECONDS are stopped.
+    """
+    stream = _streams.get(query)
+    if stream is not None:
+        _last_access[query] = time.monotonic()
+        return stream
+
+    starting = _starting.get(query)
+    if starting is None:
+        starting = asyncio.ensure_future(_start(query))
+        _starting[query] = starting
+        starting.add_done_callback(lambda _: _starting.pop(query, None))
+    # Shielded: one caller giving up must not cancel the start for the others
+    return await asyncio.shield(starting)
@@ -0,0 +1,169 @@
+"""
+Bounded-memory trend counting for corpora too large for the exact counters of
+trend_detector.detect_trends (backfills over millions of posts, sharded runs).
+
+HeavyHitterSketch is a weighted Misra-Gries summary of at most `capacity`
+terms. A term's weight is its detect_trends score without the hashtag bonus,
+in tenths of a point: 10 x freq + engagement. Each held term also keeps its
+freq and engagement since it was last admitted. Sketches merge (the
+mergeable-summaries rule of Agarwal et al.: add, then subtract the
+capacity+1-th largest weight), so shard and per-run sketches combine into one
+with the same guarantees, and serialize to a few bytes per term.
+
+Error bounds, with W = total weight added and D = sketch.error:
+- freq, engagement and score are never overestimated
+- a term's score is underestimated by at most D / 10 points (plus the hashtag
+  bonus, below), its freq by at most D / 10 and its engagement by at most D
+- D <= W / (capacity + 1), so the relative error shrinks as capacity grows
+- every term whose true weight exceeds D is held, so no term with a score
+  above D / 10 + 2 is missed; hashtags rank above keywords whatever their
+  score, so a hashtag scoring less than that can still drop out of top()
+- with no more distinct terms than capacity, D = 0 and top() returns exactly
+  what detect_trends does
+- a term only counts as a hashtag if it was used as one while held; a term
+  evicted and readmitted can lose its hashtag bonus and priority
+"""
+import heapq
+import os
+import struct
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from app.batch import PostBatch
+from app.trends.trend_detector import count_terms, score_trends
+
+# Count the pipeline's frequency trends with a sketch instead of exact counters
+TREND_SKETCH_ENABLED = os.getenv("TREND_SKETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+# Terms a sketch holds; memory is O(capacity + vocabulary of one chunk)
+TREND_SKETCH_CAPACITY = int(os.getenv("TREND_SKETCH_CAPACITY", "2048"))
+# Posts counted exactly at a time before being folded into the sketch
+TREND_SKETCH_CHUNK = int(os.getenv("TREND_SKETCH_CHUNK", "5000"))
+
+_MAGIC = b"HHS1"
+_HEADER = struct.Struct("<4sqqqq")
+
+
+class HeavyHitterSketch:
+    def __init__(self, capacity=TREND_SKETCH_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0  # W: weight of everything added
+        self.error = 0  # D: weight removed by pruning
+        # term -> [Misra-Gries weight, freq, engagement, used as hashtag], in first-seen order
+        self.terms = {}
+
+    @classmethod
+    def from_counters(cls, hashtag_counter, keyword_counter, engagement_counter, capacity=TREND_SKETCH_CAPACITY):
+        """A sketch of count_terms output; exact until it is pruned to capacity."""
+        sketch = cls(capacity)
+        for term, freq in (hashtag_counter + keyword_counter).items():
+            engagement = engagement_counter[term]
+            sketch.terms[term] = [10 * freq + engagement, freq, engagement, term in hashtag_counter]
+            sketch.total += 10 * freq + engagement
+        sketch._prune()
+        return sketch
+
+    def add_posts(self, posts, chunk_size=TREND_SKETCH_CHUNK):
+        """Adds post dicts (text, likes, reposts) from any iterable, chunk_size posts at a time."""
+        chunk = []
+        for post in posts:
+            chunk.append(post)
+            if len(chunk) >= chunk_size:
+                self.merge(HeavyHitterSketch.from_counters(*count_terms(chunk), capacity=self.capacity))
+                chunk = []
+        if chunk:
+            self.merge(HeavyHitterSketch.from_counters(*count_terms(chunk), capacity=self.capacity))
+        return self
+
+    def merge(self, other):
+        """Folds another sketch (a shard, an earlier run) into this one, keeping this one's capacity."""
+        for term, (weight, freq, engagement, hashtag) in other.terms.items():
+            entry = self.terms.get(term)
+            if entry is None:
+                self.terms[term] = [weight, freq, engagement, hashtag]
+            else:
+                entry[0] += weight
+                entry[1] += freq
+                entry[2] += engagement
+                entry[3] = entry[3] or hashtag
+        self.total += other.total
+        self.error += other.error
+        self._prune()
+        return self
+
+    def _prune(self):
+        # Subtracting the capacity+1-th largest weight from at least capacity+1 terms keeps
+        # held weight + (capacity + 1) x D <= W, which is where D's bound comes from
+        if len(self.terms) <= self.capacity:
+            return
+        delta = heapq.nlargest(self.capacity + 1, (entry[0] for entry in self.terms.values()))[-1]
+        self.error += delta
+        self.terms = {term: entry for term, entry in self.terms.items() if entry[0] > delta}
+        for entry in self.terms.values():
+            entry[0] -= delta
+
+    def top(self, top_n=10, exclude=None):
+        """detect_trends' filters and ranking applied to the estimates. Returns [(term, score)]."""
+        hashtag_counter, keyword_counter, engagement_counter = Counter(), Counter(), Counter()
+        for term, (_, freq, engagement, hashtag) in self.terms.items():
+            (hashtag_counter if hashtag else keyword_counter)[term] = freq
+            engagement_counter[term] = engagement
+        return score_trends(hashtag_counter, keyword_counter, engagement_counter, top_n=top_n, exclude=exclude)
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "terms": len(self.terms),
+            "total_weight": self.total,
+            # Largest possible underestimate of any score, now and in the worst case for this W
+            "max_score_error": self.error / 10,
+            "score_error_bound": round(self.total / (self.capacity + 1) / 10, 2),
+        }
+
+    def to_bytes(self):
+        """zlib-compressed header, int64 columns, hashtag bitmap and newline-joined terms."""
+        terms = list(self.terms)
+        values = np.array([entry[:3] for entry in self.terms.values()], dtype="<i8").reshape(len(terms), 3)
+        hashtags = np.packbits(np.fromiter((entry[3] for entry in self.terms.values()), dtype=bool, count=len(terms)))
+        header = _HEADER.pack(_MAGIC, self.capacity, self.total, self.error, len(terms))
+        # Terms come from \w and [a-z] matches, so they never contain a newline
+        return zlib.compress(header + values.tobytes() + hashtags.tobytes() + "\n".join(terms).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            data = zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f"Not a heavy-hitter sketch: {e}")
+        if data[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("Not a heavy-hitter sketch")
+        _, capacity, total, error, n_terms = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        values = np.frombuffer(data, dtype="<i8", count=3 * n_terms, offset=offset).reshape(n_terms, 3)
+        offset += values.nbytes
+        n_bytes = (n_terms + 7) // 8
+        hashtags = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=n_bytes, offset=offset), count=n_terms)
+        terms = data[offset + n_bytes:].decode("utf-8").split("\n") if n_terms else []
+
+        sketch = cls(capacity)
+        sketch.total = total
+        sketch.error = error
+        sketch.terms = {
+            term: [weight, freq, engagement, bool(hashtag)]
+            for term, (weight, freq, engagement), hashtag in zip(terms, values.tolist(), hashtags.tolist())
+        }
+        return sketch
+
+
+def detect_trends_sketched(posts, top_n=10, exclude=None, capacity=None):
+    """
+    Approximate detect_trends in bounded memory (see the module docstring for
+    the error bounds). posts is an iterable of post dicts or an app.batch.PostBatch.
+    """
+    if isinstance(posts, PostBatch):
+        posts = posts.trend_posts()
+    sketch = HeavyHitterSketch(capacity or TREND_SKETCH_CAPACITY).add_posts(posts)
+    return sketch.top(top_n=top_n, exclude=exclude)
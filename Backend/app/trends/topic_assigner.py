@@ -0,0 +1,50 @@
+class TopicAssigner:
+    """
+    Matches posts against a ranked list of trend terms in a single scan.
+
+    Terms are indexed by their word tuple, so each post is split once and
+    looked up word by word (and n-gram by n-gram for multi-word terms),
+    independent of how many trends there are. Matching is on whole words:
+    the trend "tech" matches "tech news" but not "biotech".
+    Expects cleaned text (lowercase, words separated by whitespace).
+    """
+
+    def __init__(self, terms):
+        # terms are ordered by importance; a lower index wins when a post matches several
+        self.terms = list(terms)
+        self.index = {}
+        for rank, term in enumerate(self.terms):
+            words = tuple(term.lower().split())
+            if words and words not in self.index:
+                self.index[words] = rank
+        self.max_words = max((len(words) for words in self.index), default=0)
+
+    def match(self, text):
+        """Returns the ranks of every term found in text, most important first."""
+        if not text or not self.index:
+            return []
+
+        words = text.split()
+        found = set()
+        if self.max_words == 1:
+            for word in words:
+                rank = self.index.get((word,))
+                if rank is not None:
+                    found.add(rank)
+        else:
+            for start in range(len(words)):
+                for size in range(1, min(self.max_words, len(words) - start) + 1):
+                    rank = self.index.get(tuple(words[start:start + size]))
+                    if rank is not None:
+                        found.add(rank)
+        return sorted(found)
+
+    def assign(self, text, multi_topic=False):
+        """
+        Returns the matched terms for text: the most important one only,
+        or every match when multi_topic is set. Empty list if nothing matches.
+        """
+        ranks = self.match(text)
+        if not multi_topic:
+            ranks = ranks[:1]
+        return [self.terms[rank] for rank in ranks]
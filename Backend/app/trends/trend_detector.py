@@ -28,12 +28,16 @@ def calculate_engagement(likes: int, reposts: int) -> int:
     """
     return likes + (2 * reposts)
 
+def extract_hashtags(text):
+    return re.findall(r"#(\w+)", text.lower())
+
 def extract_keywords(text):
     words = re.findall(r"\b[a-z]{3,}\b", text.lower())
     return [w for w in words if w not in STOPWORDS and len(w) >= 4]
 
 
-def detect_trends(posts, top_n=10, exclude=None):
+def count_terms(posts):
+    """Counts hashtags (weighted x2) and keywords over posts, plus the engagement behind each term."""
     hashtag_counter = Counter()
     keyword_counter = Counter()
     engagement_counter = Counter()
@@ -45,7 +49,7 @@ def detect_trends(posts, top_n=10, exclude=None):
         engagement = calculate_engagement(likes, reposts)
 
         # Hashtags
-        hashtags = re.findall(r"#(\w+)", text.lower())
+        hashtags = extract_hashtags(text)
         for tag in hashtags:
             hashtag_counter[tag] += 2
             engagement_counter[tag] += engagement
@@ -56,12 +60,22 @@ def detect_trends(posts, top_n=10, exclude=None):
             keyword_counter[kw] += 1
             engagement_counter[kw] += engagement
 
+    return hashtag_counter, keyword_counter, engagement_counter
+
+
+def detect_trends(posts, top_n=10, exclude=None):
+    hashtag_counter, keyword_counter, engagement_counter = count_terms(posts)
+    return score_trends(hashtag_counter, keyword_counter, engagement_counter, top_n=top_n, exclude=exclude)
+
+
+def score_trends(hashtag_counter, keyword_counter, engagement_counter, top_n=10, exclude=None):
+    """Scores and ranks terms from hashtag (weighted x2), keyword and engagement counts."""
     trends = []
     combined = hashtag_counter + keyword_counter
-    exclude = exclude or set()                      # ← fix: indented into function
-    hashtag_items = set(hashtag_counter.keys())     # ← fix: indented into function
+    exclude = exclude or set()
+    hashtag_items = set(hashtag_counter.keys())
 
-    for item, freq in combined.items():             # ← fix: indented into function
+    for item, freq in combined.items():
         if item in exclude or item in NOISE_WORDS:
             continue
         if item not in hashtag_items and freq < 3:
@@ -71,5 +85,5 @@ def detect_trends(posts, top_n=10, exclude=None):
         score = freq + (engagement_counter[item] / 10) + (2 if item in hashtag_items else 0)
         trends.append((item, round(score, 2)))
 
-    trends.sort(key=lambda x: ((x[0] in hashtag_items), x[1]), reverse=True)  # ← fix: indented into function
-    return trends[:top_n]                           # ← fix: indented into function
\ No newline at end of file
+    trends.sort(key=lambda x: ((x[0] in hashtag_items), x[1]), reverse=True)
+    return trends[:top_n]
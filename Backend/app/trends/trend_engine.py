@@ -0,0 +1,161 @@
+import re
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from app.batch import PostBatch
+from app.trends.trend_detector import STOPWORDS, NOISE_WORDS, calculate_engagement
+
+# Every hashtag and keyword is a run of word characters, optionally preceded by "#":
+# a hashtag is "#" plus the whole run, a keyword is a run of only a-z letters (same as
+# detect_trends' r"#(\w+)" and r"\b[a-z]{3,}\b"). Posts are joined with SEPARATOR so the whole
+# batch is tokenized by one findall call and each token's post is recovered from the separators.
+SEPARATOR = "\x01"
+TOKEN_PATTERN = re.compile(r"#?\w+|" + SEPARATOR)
+KEYWORD_PATTERN = re.compile(r"[a-z]{3,}")
+
+
+def _is_keyword(word):
+    return word not in STOPWORDS and len(word) >= 4
+
+
+class TermMatrix:
+    """
+    Sparse post x term occurrence counts for a batch of posts.
+
+    counts holds every hashtag and keyword occurrence, hashtag_counts only the
+    hashtag ones. first_seen gives each term's position in the order
+    detect_trends first encountered it (hashtags and keywords separately),
+    which is its tie-break when scores are equal.
+    """
+
+    def __init__(self, terms, counts, hashtag_counts, first_seen, engagement):
+        self.terms = terms
+        self.counts = counts
+        self.hashtag_counts = hashtag_counts
+        self.first_seen = first_seen
+        self.engagement = engagement
+
+    @classmethod
+    def from_posts(cls, posts):
+        engagement = np.fromiter(
+            (calculate_engagement(post.get("likes", 0), post.get("reposts", 0)) for post in posts),
+            dtype=np.int64, count=len(posts)
+        )
+        return cls.from_columns([post["text"] for post in posts], engagement)
+
+    @classmethod
+    def from_columns(cls, texts, engagement):
+        """Builds the matrix from a list of post texts and an aligned engagement array."""
+        texts = [text.lower() for text in texts]
+        # SEPARATOR is neither "#" nor a word character, so blanking it out of a post
+        # changes none of that post's tokens
+        texts = [text.replace(SEPARATOR, " ") if SEPARATOR in text else text for text in texts]
+        tokens = TOKEN_PATTERN.findall(SEPARATOR.join(texts))
+
+        # Map each distinct token to an id once (in C, in order of first appearance),
+        # then classify the much smaller set of distinct tokens
+        codes, distinct = pd.factorize(np.array(tokens, dtype=object))
+        token_ids = {token: code for code, token in enumerate(distinct)}
+
+        vocab = {}
+        terms = []
+        hashtag_term = np.full(len(token_ids), -1, dtype=np.int64)
+        keyword_term = np.full(len(token_ids), -1, dtype=np.int64)
+        separator_code = -1
+
+        for token, code in token_ids.items():
+            if token == SEPARATOR:
+                separator_code = code
+                continue
+            word = token[1:] if token[0] == "#" else token
+            is_keyword = KEYWORD_PATTERN.fullmatch(word) is not None and _is_keyword(word)
+            if token[0] != "#" and not is_keyword:
+                continue
+
+            idx = vocab.get(word)
+            if idx is None:
+                idx = vocab[word] = len(terms)
+                terms.append(word)
+            if token[0] == "#":
+                hashtag_term[code] = idx
+            if is_keyword:
+                keyword_term[code] = idx
+
+        is_separator = codes == separator_code
+        rows = np.cumsum(is_separator)
+        token_rows, codes = rows[~is_separator], codes[~is_separator]
+
+        tag_terms = hashtag_term[codes]
+        tag_rows = token_rows[tag_terms >= 0]
+        tag_terms = tag_terms[tag_terms >= 0]
+        keyword_terms = keyword_term[codes]
+        keyword_rows = token_rows[keyword_terms >= 0]
+        keyword_terms = keyword_terms[keyword_terms >= 0]
+
+        shape = (len(texts), len(terms))
+        counts = csr_matrix(
+            (
+                np.ones(len(tag_terms) + len(keyword_terms), dtype=np.int64),
+                (np.concatenate([tag_rows, keyword_rows]), np.concatenate([tag_terms, keyword_terms])),
+            ),
+            shape=shape,
+        )
+        hashtag_counts = csr_matrix((np.ones(len(tag_terms), dtype=np.int64), (tag_rows, tag_terms)), shape=shape)
+
+        # Order of each term's first keyword occurrence, overridden by the order of its
+        # first hashtag occurrence for terms that were ever used as a hashtag
+        first_seen = np.zeros(len(terms), dtype=np.int64)
+        for occurrences in (keyword_terms, tag_terms):
+            _, seen = pd.factorize(occurrences)
+            first_seen[seen] = np.arange(len(seen))
+
+        return cls(terms, counts, hashtag_counts, first_seen, engagement)
+
+
+def detect_trends_vectorized(posts, top_n=10, exclude=None):
+    """
+    Same result as trend_detector.detect_trends, computed from a sparse term
+    matrix with array operations and a partial top-N selection. posts is a
+    list of post dicts or an app.batch.PostBatch (read by column, cleaned text).
+    """
+    if top_n <= 0 or not len(posts):
+        return []
+
+    if isinstance(posts, PostBatch):
+        matrix = TermMatrix.from_columns(posts.cleaned_texts, posts.engagement)
+    else:
+        matrix = TermMatrix.from_posts(posts)
+    if not matrix.terms:
+        return []
+
+    hashtag_freq = np.asarray(matrix.hashtag_counts.sum(axis=0)).ravel()
+    # Hashtags count twice: once in counts and once more in hashtag_counts
+    freq = np.asarray(matrix.counts.sum(axis=0)).ravel() + hashtag_freq
+    engagement = matrix.counts.T @ matrix.engagement
+    is_hashtag = hashtag_freq > 0
+
+    # score = freq + engagement / 10 + hashtag bonus, kept as an exact integer of tenths
+    # so ranking matches the rounded float scores of detect_trends
+    tenths = 10 * (freq + 2 * is_hashtag) + engagement
+
+    exclude = exclude or set()
+    blocked = np.fromiter(
+        (term in exclude or term in NOISE_WORDS for term in matrix.terms), dtype=bool, count=len(matrix.terms)
+    )
+    candidates = np.flatnonzero(~blocked & (freq >= 2) & (is_hashtag | (freq >= 3)))
+    if candidates.size == 0:
+        return []
+
+    # Hashtags rank above keywords, then by score
+    rank = is_hashtag[candidates] * (int(tenths.max()) + 1) + tenths[candidates]
+
+    if candidates.size > top_n:
+        # Keep everything tied with the N-th best so the tie-break below sees all of them
+        kth = np.partition(rank, candidates.size - top_n)[candidates.size - top_n]
+        keep = rank >= kth
+        candidates, rank = candidates[keep], rank[keep]
+
+    order = np.lexsort((matrix.first_seen[candidates], -rank))[:top_n]
+    return [(matrix.terms[i], int(tenths[i]) / 10) for i in candidates[order]]
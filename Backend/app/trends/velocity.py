@@ -0,0 +1,186 @@
+import hashlib
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.batch import PostBatch
+from app.trends.trend_detector import NOISE_WORDS, extract_hashtags, extract_keywords
+
+# Width of a time bucket and how many buckets the timeline keeps (24 x 5 min = 2 hours)
+TREND_BUCKET_SECONDS = int(os.getenv("TREND_BUCKET_SECONDS", "300"))
+TREND_BUCKETS = int(os.getenv("TREND_BUCKETS", "24"))
+# The newest buckets that make up "now"; the older ones are the rolling baseline
+TREND_RECENT_BUCKETS = int(os.getenv("TREND_RECENT_BUCKETS", "3"))
+
+# Count-min sketch size: memory is DEPTH x WIDTH x TREND_BUCKETS counters whatever the vocabulary
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+
+RANKINGS = ("frequency", "velocity", "burst")
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Parses a Bluesky created_at string (ISO 8601) into epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class TrendTimeline:
+    """
+    Per-term counts in fixed time buckets, kept as a ring buffer of count-min sketches.
+
+    Counts are only ever overestimated, by at most ~e/WIDTH of the bucket's total
+    with probability 1 - e^-DEPTH. Time is driven by the posts' created_at, not the
+    wall clock, so replayed batches bucket the same way as live ones; posts older
+    than the ring are dropped.
+    """
+
+    def __init__(self, bucket_seconds=TREND_BUCKET_SECONDS, n_buckets=TREND_BUCKETS,
+                 width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width, n_buckets), dtype=np.int32)
+        self._salts = [f"cms-row-{row}".encode("utf-8") for row in range(depth)]
+        self.first = None  # absolute bucket number of the oldest and newest bucket seen
+        self.latest = None
+
+    def _columns(self, terms):
+        """
+        (len(terms), depth) sketch columns; each row hashes with blake2b under its own salt.
+        (crc32 with a different start value per row is not enough: it is affine in the
+        start value, so equal-length terms that collide in one row collide in all of them.)
+        """
+        encoded = [term.encode("utf-8") for term in terms]
+        return np.array(
+            [
+                [int.from_bytes(hashlib.blake2b(data, digest_size=8, salt=salt).digest(), "little") % self.width
+                 for salt in self._salts]
+                for data in encoded
+            ],
+            dtype=np.int64
+        ).reshape(len(terms), self.depth)
+
+    def _advance(self, bucket):
+        if self.latest is None:
+            self.first = self.latest = bucket
+            return
+        if bucket <= self.latest:
+            return
+        # Buckets the ring wraps onto start empty
+        for absolute in range(max(self.latest + 1, bucket - self.n_buckets + 1), bucket + 1):
+            self.counts[:, :, absolute % self.n_buckets] = 0
+        self.latest = bucket
+
+    def add_many(self, items):
+        """Adds (timestamp, {term: weight}) items."""
+        items = [(timestamp, terms) for timestamp, terms in items if timestamp is not None and terms]
+        if not items:
+            return
+        self._advance(max(int(timestamp // self.bucket_seconds) for timestamp, _ in items))
+        for timestamp, terms in items:
+            bucket = int(timestamp // self.bucket_seconds)
+            if bucket <= self.latest - self.n_buckets:
+                continue
+            self.first = min(self.first, bucket)
+            columns = self._columns(list(terms))
+            weights = np.fromiter(terms.values(), dtype=np.int32, count=len(terms))
+            for row in range(self.depth):
+                np.add.at(self.counts[row, :, bucket % self.n_buckets], columns[:, row], weights)
+
+    def series(self, terms):
+        """(len(terms), n_buckets) estimated counts, oldest bucket first."""
+        if not terms or self.latest is None:
+            return np.zeros((len(terms), self.n_buckets), dtype=np.int32)
+        columns = self._columns(terms)
+        estimates = self.counts[np.arange(self.depth), columns].min(axis=1)
+        # Rotate the ring so the newest bucket is last
+        return np.roll(estimates, -(self.latest + 1) % self.n_buckets, axis=1)
+
+    def observed_buckets(self):
+        if self.latest is None:
+            return 0
+        return min(self.n_buckets, self.latest - self.first + 1)
+
+
+def trend_dynamics(series, observed, recent=TREND_RECENT_BUCKETS):
+    """
+    Velocity, acceleration and burst score per row of a (terms, buckets) series.
+
+    velocity is the per-bucket rate over the last `recent` buckets minus the rate
+    over the `recent` before them; acceleration is the change in velocity.
+    burst is a Poisson z-score of the recent rate against the mean rate of the
+    older observed buckets (the rolling baseline), smoothed by +1 so terms with
+    no history don't divide by zero.
+    """
+    series = series.astype(np.float64)
+    n_buckets = series.shape[1]
+
+    def rate(end):
+        window = series[:, max(0, n_buckets - end - recent):n_buckets - end]
+        return window.mean(axis=1) if window.shape[1] else np.zeros(len(series))
+
+    now, previous, before = rate(0), rate(recent), rate(2 * recent)
+    velocity = now - previous
+    acceleration = velocity - (previous - before)
+    baseline_buckets = series[:, n_buckets - observed:n_buckets - recent] if observed > recent else series[:, :0]
+    baseline = baseline_buckets.mean(axis=1) if baseline_buckets.shape[1] else np.zeros(len(series))
+    burst = (now - baseline) / np.sqrt(baseline + 1)
+    return velocity, acceleration, burst
+
+
+def detect_trends_by_velocity(posts, top_n=10, exclude=None, ranking="burst", timeline=None):
+    """
+    Alternative to detect_trends that ranks terms by how fast they are rising
+    ("velocity") or by how far their recent rate exceeds their baseline
+    ("burst"), using each post's created_at. Terms must clear the same
+    frequency and noise filters as detect_trends. posts is a list of post dicts
+    or an app.batch.PostBatch. Returns [(term, score)].
+
+    The sketch only bounds the time-bucketed counts, which is what a timeline
+    kept across calls (passed in as `timeline`) accumulates; the candidate
+    terms and their frequency filter come from exact counts over this call's
+    posts, so per-call memory still grows with their vocabulary.
+    """
+    if ranking not in ("velocity", "burst"):
+        raise ValueError(f"Unknown ranking '{ranking}'")
+    exclude = exclude or set()
+    timeline = timeline or TrendTimeline()
+
+    totals = Counter()
+    hashtags = set()
+    items = []
+    if isinstance(posts, PostBatch):
+        texts_and_times = zip(posts.cleaned_texts, posts.created_at)
+    else:
+        texts_and_times = ((post["text"], post.get("created_at")) for post in posts)
+    for text, created_at in texts_and_times:
+        terms = Counter()
+        for tag in extract_hashtags(text):
+            terms[tag] += 2
+            hashtags.add(tag)
+        for keyword in extract_keywords(text):
+            terms[keyword] += 1
+        totals.update(terms)
+        items.append((parse_timestamp(created_at), terms))
+    timeline.add_many(items)
+
+    candidates = [
+        term for term, freq in totals.items()
+        if term not in exclude and term not in NOISE_WORDS and freq >= 2 and (term in hashtags or freq >= 3)
+    ]
+    if not candidates:
+        return []
+    velocity, _, burst = trend_dynamics(timeline.series(candidates), timeline.observed_buckets())
+    scores = velocity if ranking == "velocity" else burst
+    # Ties go to the more frequent term
+    order = sorted(range(len(candidates)), key=lambda i: (scores[i], totals[candidates[i]]), reverse=True)
+    return [(candidates[i], round(float(scores[i]), 2)) for i in order[:top_n]]
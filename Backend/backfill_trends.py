@@ -0,0 +1,69 @@
+import sys
+import os
+import argparse
+import json
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.preprocessing.cleaner import clean_text
+from app.trends.heavy_hitters import TREND_SKETCH_CAPACITY, HeavyHitterSketch
+from app.trends.trend_detector import detect_trends
+
+
+def read_posts(path):
+    """Streams cleaned posts from a JSON lines corpus (as recorded by benchmarks/bench_pipeline.py)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            post = json.loads(line)
+            text = post.get("cleaned_text") or clean_text(post["text"])
+            if text:
+                yield {"text": text, "likes": post.get("likes", 0), "reposts": post.get("reposts", 0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Trend detection over large corpora in bounded memory, with mergeable sketch files."
+    )
+    parser.add_argument("--corpus", action="append", default=[], help="JSON lines of posts (repeatable)")
+    parser.add_argument("--merge", action="append", default=[], help="Sketch file to merge in, e.g. a shard (repeatable)")
+    parser.add_argument("--capacity", type=int, default=TREND_SKETCH_CAPACITY, help="Terms the sketch holds")
+    parser.add_argument("--out", help="Write the combined sketch to this file")
+    parser.add_argument("--top", type=int, default=20, help="Number of trends to print")
+    parser.add_argument("--exclude", default="", help="Comma-separated terms to leave out (e.g. the query)")
+    parser.add_argument("--exact", action="store_true",
+                        help="Also run exact detect_trends on the corpus and compare (needs memory for every term)")
+    args = parser.parse_args()
+    exclude = {term.strip().lower() for term in args.exclude.split(",") if term.strip()}
+
+    sketch = HeavyHitterSketch(args.capacity)
+    for path in args.corpus:
+        sketch.add_posts(read_posts(path))
+    for path in args.merge:
+        with open(path, "rb") as f:
+            sketch.merge(HeavyHitterSketch.from_bytes(f.read()))
+
+    trends = sketch.top(top_n=args.top, exclude=exclude)
+    print(json.dumps(sketch.stats()))
+    for term, score in trends:
+        print(f"{score:>10.1f}  {term}")
+
+    if args.out:
+        data = sketch.to_bytes()
+        with open(args.out, "wb") as f:
+            f.write(data)
+        print(f"Wrote {len(data)} bytes to {args.out}")
+
+    if args.exact:
+        posts = [post for path in args.corpus for post in read_posts(path)]
+        exact = dict(detect_trends(posts, top_n=args.top, exclude=exclude))
+        found = sum(term in exact for term, _ in trends)
+        worst = max((exact[term] - score for term, score in trends if term in exact), default=0)
+        print(f"{found}/{len(exact)} exact top trends found; largest score underestimate {worst:.1f}"
+              f" (bound {sketch.error / 10:.1f})")
+
+
+if __name__ == "__main__":
+    main()
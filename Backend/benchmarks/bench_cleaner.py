@@ -0,0 +1,70 @@
+"""
+Measures text cleaning throughput (posts/sec): the original per-post cleaner,
+clean_many's Python engine and its pyarrow engine.
+
+Usage: python benchmarks/bench_cleaner.py [sizes...]   (default: 1000 100000 1000000)
+"""
+import os
+import random
+import re
+import sys
+import time
+
+import emoji
+
+# Run from Backend/ so app is importable
+sys.path.append(os.getcwd())
+
+from app.preprocessing.cleaner import clean_many
+
+SAMPLES = [
+    "Just shipped a new release of our #AI toolkit! Check it out https://example.com/release/v2",
+    "Honestly the keynote was... fine? @someone thoughts on the new #GPU lineup",
+    "Loving this weather 🌞🔥 can't wait for the weekend!!!",
+    "Thread 1/5: why #rustlang ownership finally clicked for me -> https://t.co/abc123",
+    "BREAKING: Big tech layoffs continue; 10,000 jobs cut at $BIGCO",
+    "café au lait and code ☕ #devlife",
+]
+
+
+def original_clean_text(text):
+    # clean_text before precompiled patterns and clean_many
+    if not text:
+        return ""
+    text = re.sub(r'http\S+', '', text)
+    text = emoji.demojize(text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.lower()
+
+
+def make_texts(n_posts, ascii_only=False, seed=0):
+    rng = random.Random(seed)
+    samples = [sample for sample in SAMPLES if sample.isascii()] if ascii_only else SAMPLES
+    return [f"{rng.choice(samples)} {rng.randint(0, 10 ** 6)}" for _ in range(n_posts)]
+
+
+def bench(func, texts):
+    start = time.perf_counter()
+    result = func(texts)
+    return len(texts) / (time.perf_counter() - start), result
+
+
+def main(sizes):
+    engines = [
+        ("original", lambda texts: [original_clean_text(text) for text in texts]),
+        ("python", lambda texts: clean_many(texts, engine="python")),
+        ("arrow", lambda texts: clean_many(texts, engine="arrow")),
+    ]
+    print(f"{'corpus':>6} {'posts':>10} " + " ".join(f"{name + ' posts/s':>18}" for name, _ in engines) + "  match")
+    # Non-ASCII posts (emoji, accents) always take the Python path, so both mixes are reported
+    for corpus in ("ascii", "mixed"):
+        for n_posts in sizes:
+            texts = make_texts(n_posts, ascii_only=corpus == "ascii")
+            rates, outputs = zip(*(bench(func, texts) for _, func in engines))
+            match = all(output == outputs[0] for output in outputs)
+            print(f"{corpus:>6} {n_posts:>10} " + " ".join(f"{rate:>18,.0f}" for rate in rates) + f"  {match}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000])
@@ -0,0 +1,304 @@
+"""
+Offline end-to-end benchmark of run_pipeline.
+
+Posts are replayed from a recorded corpus (JSON lines, as written by --record)
+or generated synthetically, through a stub of fetch_public_posts, so no
+Bluesky credentials are needed. By default the models are fast deterministic
+stand-ins, which isolates the pipeline's own overhead; --models real loads the
+transformers models instead.
+
+Per-stage numbers come from the run's timings block (app.metrics).
+Results are written as JSON and can be compared against a stored baseline;
+the exit status is 1 when any stage regressed by more than --tolerance.
+
+Usage (from Backend/):
+    python benchmarks/bench_pipeline.py                                # synthetic corpus, fake models
+    python benchmarks/bench_pipeline.py --corpus posts.jsonl --models real --output results.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline_pipeline.json
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline_pipeline.json
+    python benchmarks/bench_pipeline.py --record posts.jsonl --query tech --limit 1000   # needs BSKY_* credentials
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Caches and the post store would turn repeat runs into lookups, so both are off
+os.environ["RESULT_CACHE_PATH"] = ""
+os.environ["RESULT_CACHE_MEMORY_ITEMS"] = "0"
+os.environ["POST_STORE_PATH"] = ""
+os.environ["ROLLUP_STORE_PATH"] = ""
+os.environ["PIPELINE_METRICS"] = "true"
+
+# Run from Backend/ so app is importable
+sys.path.append(os.getcwd())
+
+import app.pipeline as pipeline
+from app import metrics
+from app.preprocessing.dedup import DEDUP_ENABLED
+from app.ml.registry import models
+
+DEFAULT_SIZES = [100, 1000, 5000]
+QUERY = "tech"
+
+WORDS = (
+    "python rust golang javascript kubernetes docker cloud security privacy startup funding layoffs "
+    "election senate climate energy battery electric football playoffs music album concert movie "
+    "trailer bitcoin ethereum market stocks inflation science research space rocket launch telescope "
+    "recipe coffee travel flight hotel weekend update release version feature bug performance"
+).split()
+FILLER = "the a is and to of for with this that just really new today my our".split()
+EXTRAS = ["🔥", "🚀", "❤️", "café", "naïve", "!!!", "?", "...", "@someone"]
+
+
+# --- Corpora ---
+
+def synthetic_corpus(n_posts, seed=0):
+    """Deterministic Bluesky-like posts with a Zipf-ish topic mix, hashtags, links and emoji."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(n_posts):
+        tokens = rng.choices(WORDS, weights=weights, k=rng.randint(3, 8)) + rng.choices(FILLER, k=rng.randint(2, 8))
+        rng.shuffle(tokens)
+        if rng.random() < 0.4:
+            tokens.append("#" + rng.choices(WORDS, weights=weights)[0])
+        if rng.random() < 0.3:
+            tokens.append(f"https://example.com/{i}")
+        if rng.random() < 0.2:
+            tokens.append(rng.choice(EXTRAS))
+        posts.append({
+            "uri": f"at://bench/post/{i}",
+            "text": " ".join(tokens),
+            "created_at": (start + timedelta(seconds=i)).isoformat().replace("+00:00", "Z"),
+            "likes": int(rng.paretovariate(1.5)) - 1,
+            "reposts": int(rng.paretovariate(2.0)) - 1,
+        })
+    return posts
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record_corpus(path, query, limit):
+    """Fetches live posts once and writes them as JSON lines for later replay."""
+    from app.api.bluesky_client import fetch_public_posts
+    posts = fetch_public_posts(limit=limit, query=query)
+    with open(path, "w", encoding="utf-8") as f:
+        for post in posts:
+            f.write(json.dumps(post, ensure_ascii=False) + "\n")
+    print(f"Recorded {len(posts)} posts to {path}")
+
+
+def replay_fetch(corpus):
+    """A fetch_public_posts stand-in serving the first `limit` corpus posts, repeating it if needed."""
+    def fetch(limit=100, query=QUERY, since=None):
+        posts = []
+        for i in range(limit):
+            post = dict(corpus[i % len(corpus)])
+            if i >= len(corpus):
+                post["uri"] = f"{post.get('uri')}#{i // len(corpus)}"
+            posts.append(post)
+        return posts
+    return fetch
+
+
+# --- Deterministic model stand-ins ---
+
+class _NoCache:
+    def stats(self):
+        return {}
+
+
+def _digest(text):
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:4], "big")
+
+
+class FakeSentimentAnalyzer:
+    """Same interface as SentimentAnalyzer; the score is a hash of the text."""
+    LABELS = {-2: "Very Negative", -1: "Negative", 0: "Neutral", 1: "Positive", 2: "Very Positive"}
+    cache = _NoCache()
+
+    def analyze(self, text):
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts, batch_size=32):
+        results = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            metrics.record_model_call("sentiment", len(batch))
+            for text in batch:
+                score = _digest(text) % 5 - 2 if text else 0
+                results.append({"score": score, "label": self.LABELS[score]})
+        return results
+
+
+class FakeCategorizer:
+    """Same interface as Categorizer; the category is a hash of the topic name."""
+    CATEGORIES = ["Technology", "Politics", "Sports", "Entertainment", "Finance", "Science", "General"]
+    cache = _NoCache()
+
+    def categorize(self, text):
+        return self.categorize_many([text])[0]
+
+    def categorize_many(self, texts):
+        metrics.record_model_call("categorizer", len(texts))
+        return [self.CATEGORIES[_digest(text) % len(self.CATEGORIES)] for text in texts]
+
+
+def use_fake_models():
+    models.register("sentiment", FakeSentimentAnalyzer)
+    models.register("categorizer", FakeCategorizer)
+
+
+# --- Measurement ---
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def bench_size(n_posts, repeats):
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = pipeline.run_pipeline(limit=n_posts, query=QUERY)
+        runs.append((time.perf_counter() - start, result["timings"]))
+
+    totals = [elapsed for elapsed, _ in runs]
+    stage_times = {}
+    for _, timings in runs:
+        for stage in timings["stages"]:
+            stage_times.setdefault(stage["stage"], []).append(stage["wall_seconds"])
+    p50 = statistics.median(totals)
+    return {
+        "posts": n_posts,
+        "repeats": repeats,
+        "end_to_end": {
+            "p50_seconds": p50,
+            "p95_seconds": percentile(totals, 0.95),
+            "posts_per_sec": n_posts / p50 if p50 else None,
+        },
+        "stages": {
+            name: {
+                "p50_seconds": statistics.median(times),
+                "p95_seconds": percentile(times, 0.95),
+                "posts_per_sec": n_posts / statistics.median(times) if statistics.median(times) else None,
+            }
+            for name, times in stage_times.items()
+        },
+        "models": runs[-1][1]["models"],
+        "peak_rss_bytes": runs[-1][1]["peak_rss_bytes"],
+    }
+
+
+def compare(report, baseline, tolerance, min_seconds):
+    """Prints p50 changes against the baseline and returns the regressions."""
+    baseline_sizes = {entry["posts"]: entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst baseline ({baseline['meta'].get('created_at')}), tolerance {tolerance:.0%}:")
+    for entry in report["results"]:
+        base = baseline_sizes.get(entry["posts"])
+        if base is None:
+            continue
+        rows = [("end_to_end", entry["end_to_end"], base["end_to_end"])]
+        rows += [(name, stats, base["stages"].get(name)) for name, stats in entry["stages"].items()]
+        for name, current, previous in rows:
+            if previous is None:
+                continue
+            now, then = current["p50_seconds"], previous["p50_seconds"]
+            change = (now - then) / then if then else 0.0
+            # Tiny stages are dominated by timer noise, so they need an absolute slowdown too
+            regressed = change > tolerance and now - then > min_seconds
+            if regressed:
+                regressions.append({"posts": entry["posts"], "stage": name, "baseline": then, "current": now})
+            print(f"{entry['posts']:>8} {name:<14} {then:>9.4f}s -> {now:>9.4f}s {change:>+8.1%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (posts per run)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per size")
+    parser.add_argument("--corpus", help="Recorded corpus (JSON lines); synthetic posts when omitted")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpus")
+    parser.add_argument("--models", choices=["fake", "real"], default="fake")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Write the results JSON here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown before a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--record", help="Fetch live posts into this corpus file and exit")
+    parser.add_argument("--query", default=QUERY, help="Search query for --record")
+    parser.add_argument("--limit", type=int, default=1000, help="Posts to fetch for --record")
+    args = parser.parse_args()
+    # Per-run INFO logging would dominate the smaller sizes
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    if args.record:
+        record_corpus(args.record, args.query, args.limit)
+        return 0
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(max(args.sizes), seed=args.seed)
+    pipeline.fetch_public_posts = replay_fetch(corpus)
+    if args.models == "fake":
+        use_fake_models()
+
+    # Untimed run so model loading and first-call setup don't land in the first size
+    pipeline.run_pipeline(limit=min(args.sizes), query=QUERY)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "models": args.models,
+            "corpus": args.corpus or f"synthetic(seed={args.seed})",
+            "pipeline_workers": int(os.getenv("PIPELINE_WORKERS", "0")),
+            "dedup": DEDUP_ENABLED,
+        },
+        "results": [],
+    }
+    print(f"{'posts':>8} {'p50':>10} {'p95':>10} {'posts/s':>10}  slowest stage")
+    for n_posts in args.sizes:
+        entry = bench_size(n_posts, args.repeats)
+        report["results"].append(entry)
+        slowest = max(entry["stages"].items(), key=lambda item: item[1]["p50_seconds"])
+        e2e = entry["end_to_end"]
+        print(f"{n_posts:>8} {e2e['p50_seconds']:>9.4f}s {e2e['p95_seconds']:>9.4f}s {e2e['posts_per_sec']:>10,.0f}"
+              f"  {slowest[0]} ({slowest[1]['p50_seconds']:.4f}s)")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Dedup changes the work each stage does, so runs with and without it don't compare
+        if baseline["meta"].get("dedup", DEDUP_ENABLED) != DEDUP_ENABLED:
+            print(f"Baseline was recorded with dedup={baseline['meta']['dedup']}, this run has dedup={DEDUP_ENABLED}; "
+                  f"set DEDUP_ENABLED to match or re-save the baseline")
+            return 2
+        report["regressions"] = compare(report, baseline, args.tolerance, args.min_seconds)
+        status = 1 if report["regressions"] else 0
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
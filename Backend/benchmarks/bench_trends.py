@@ -0,0 +1,51 @@
+"""
+Compares detect_trends with the vectorized trend engine on synthetic corpora.
+
+Usage: python benchmarks/bench_trends.py [sizes...]   (default: 10000 100000 1000000)
+"""
+import os
+import random
+import sys
+import time
+
+# Run from Backend/ so app is importable
+sys.path.append(os.getcwd())
+
+from app.trends.trend_detector import detect_trends
+from app.trends.trend_engine import detect_trends_vectorized
+
+VOCAB_SIZE = 20000
+
+
+def make_corpus(n_posts, seed=0):
+    rng = random.Random(seed)
+    # Zipf-like vocabulary so a few terms trend and most are rare
+    vocab = [f"term{chr(97 + i % 26)}{chr(97 + (i // 26) % 26)}{chr(97 + (i // 676) % 26)}" for i in range(VOCAB_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCAB_SIZE)]
+    words = rng.choices(vocab, weights=weights, k=n_posts * 12)
+    posts = []
+    for i in range(n_posts):
+        tokens = words[i * 12:(i + 1) * 12]
+        if i % 5 == 0:
+            tokens.append("#" + tokens[0])
+        posts.append({"text": " ".join(tokens), "likes": rng.randint(0, 100), "reposts": rng.randint(0, 20)})
+    return posts
+
+
+def bench(func, posts):
+    start = time.perf_counter()
+    result = func(posts, top_n=20)
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    print(f"{'posts':>10} {'detect_trends':>15} {'vectorized':>12} {'speedup':>8}  match")
+    for n_posts in sizes:
+        posts = make_corpus(n_posts)
+        baseline_time, baseline = bench(detect_trends, posts)
+        fast_time, fast = bench(detect_trends_vectorized, posts)
+        print(f"{n_posts:>10} {baseline_time:>14.2f}s {fast_time:>11.2f}s {baseline_time / fast_time:>7.1f}x  {fast == baseline}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,137 @@
+import sys
+import os
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+# Compare model output only: no on-disk cache, and no in-memory cache answering the repeats
+os.environ.setdefault("RESULT_CACHE_PATH", "")
+os.environ["RESULT_CACHE_MEMORY_ITEMS"] = "0"
+
+from app.ml.backends import BACKENDS
+from app.preprocessing.cleaner import clean_text
+
+SAMPLE_POSTS = [
+    "Absolutely love the new release, everything feels faster!",
+    "This update broke my whole workflow. Terrible.",
+    "Not sure how I feel about the keynote, some good parts and some meh.",
+    "Worst customer support I've ever dealt with, never again",
+    "The team shipped a solid fix today, thanks everyone",
+    "Meh. It's fine I guess.",
+    "I'm so excited for the launch tomorrow!!! 🚀",
+    "Prices keep going up and wages don't, this is exhausting",
+    "Great game last night, what a comeback",
+    "The movie was too long and the ending made no sense",
+    "Honestly one of the best books I've read this year",
+    "Flight delayed four hours again. Of course.",
+    "New paper on protein folding is out, results look promising",
+    "Can't believe they cancelled the show after one season",
+    "Coffee shop down the street is decent, nothing special",
+    "Election results are in and people are furious",
+    "This recipe turned out perfect, the family loved it",
+    "Server's down again, third time this week",
+    "Pretty happy with the new laptop so far",
+    "I hate how every app now wants a subscription",
+]
+SAMPLE_TOPICS = [
+    "iphone", "openai", "linux", "election", "senate", "football", "nba", "netflix", "concert",
+    "bitcoin", "inflation", "nasa", "climate", "vacation", "airport", "recipe", "coffee", "fitness",
+]
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(backend, texts, topics, repeats):
+    """Runs in a fresh process so load time and memory belong to this backend alone."""
+    from app.ml.categorizer import Categorizer
+    from app.ml.sentiment import SentimentAnalyzer
+
+    base_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    analyzer = SentimentAnalyzer(backend=backend)
+    categorizer = Categorizer(backend=backend)
+    load_time = time.perf_counter() - start
+
+    sentiment_times, category_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sentiments = analyzer.analyze_many(texts)
+        sentiment_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        categories = categorizer.categorize_many(topics)
+        category_times.append(time.perf_counter() - start)
+
+    return {
+        "requested": backend,
+        "backend": analyzer.backend,
+        "load_seconds": load_time,
+        "sentiment_seconds": min(sentiment_times),
+        "category_seconds": min(category_times),
+        "model_rss_mb": _peak_rss_mb() - base_rss,
+        "scores": [result["score"] for result in sentiments],
+        "categories": categories,
+    }
+
+
+def measure(backend, texts, topics, repeats):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_measure, backend, texts, topics, repeats).result()
+
+
+def check(backends, texts, topics, repeats, min_agreement, max_mean_star_diff):
+    reference = measure("pytorch", texts, topics, repeats)
+    print(f"{'backend':<18} {'sentiment':>10} {'speedup':>8} {'categories':>11} {'speedup':>8} {'model MB':>9}"
+          f" {'star agree':>11} {'mean |Δ|':>9} {'cat agree':>10}")
+    rows = [reference] + [measure(backend, texts, topics, repeats) for backend in backends]
+    failures = []
+    for row in rows:
+        star_agreement = sum(a == b for a, b in zip(row["scores"], reference["scores"])) / len(texts)
+        mean_diff = sum(abs(a - b) for a, b in zip(row["scores"], reference["scores"])) / len(texts)
+        category_agreement = sum(a == b for a, b in zip(row["categories"], reference["categories"])) / len(topics)
+        name = row["requested"] if row["backend"] == row["requested"] else f"{row['requested']}->{row['backend']}"
+        print(f"{name:<18} {row['sentiment_seconds']:>9.3f}s"
+              f" {reference['sentiment_seconds'] / row['sentiment_seconds']:>7.2f}x"
+              f" {row['category_seconds']:>10.3f}s {reference['category_seconds'] / row['category_seconds']:>7.2f}x"
+              f" {row['model_rss_mb']:>9.0f} {star_agreement:>11.1%} {mean_diff:>9.3f} {category_agreement:>10.1%}")
+        # A backend that fell back to FP32 didn't load, which is a failure even though it agrees
+        if (row["backend"] != row["requested"] or star_agreement < min_agreement
+                or category_agreement < min_agreement or mean_diff > max_mean_star_diff):
+            failures.append(row["requested"])
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks quantized/ONNX backends against the FP32 PyTorch models.")
+    parser.add_argument("backends", nargs="*", default=[b for b in BACKENDS if b != "pytorch"])
+    parser.add_argument("--corpus", help="JSON lines of posts (e.g. recorded by benchmarks/bench_pipeline.py)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.9,
+                        help="Minimum share of identical star labels and category picks")
+    parser.add_argument("--max-mean-star-diff", type=float, default=0.15,
+                        help="Maximum mean absolute star difference")
+    args = parser.parse_args()
+
+    posts = SAMPLE_POSTS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            posts = [json.loads(line)["text"] for line in f if line.strip()]
+    texts = [text for text in (clean_text(post) for post in posts) if text]
+
+    failures = check(args.backends, texts, SAMPLE_TOPICS, args.repeats, args.min_agreement, args.max_mean_star_diff)
+    if failures:
+        print(f"Outside tolerance: {', '.join(failures)}")
+        sys.exit(1)
+    print("All backends within tolerance.")
+
+
+if __name__ == "__main__":
+    main()
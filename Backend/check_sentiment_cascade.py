@@ -0,0 +1,78 @@
+import sys
+import os
+import argparse
+import json
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+# Compare model output only, not whatever an earlier run left in the on-disk cache
+os.environ.setdefault("RESULT_CACHE_PATH", "")
+
+from app.ml.cascade import LexiconScorer, SENTIMENT_CASCADE_THRESHOLD
+from app.ml.sentiment import SentimentAnalyzer
+from app.preprocessing.cleaner import clean_text
+from check_backend_parity import SAMPLE_POSTS
+
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+
+
+def report(texts, reference, lexicon, thresholds):
+    """Escalation rate and agreement with BERT-only output of the cascade at each threshold."""
+    print(f"{'threshold':>9} {'escalated':>10} {'exact':>7} {'within 1':>9} {'mean |Δ|':>9} {'lexicon exact':>14}")
+    rows = {}
+    for threshold in thresholds:
+        cascade = [
+            bert if confidence < threshold else score
+            for bert, (score, confidence) in zip(reference, lexicon)
+        ]
+        answered = [(score, bert) for bert, (score, confidence) in zip(reference, lexicon) if confidence >= threshold]
+        row = {
+            "escalation_rate": 1 - len(answered) / len(texts),
+            "agreement": sum(a == b for a, b in zip(cascade, reference)) / len(texts),
+            "within_one": sum(abs(a - b) <= 1 for a, b in zip(cascade, reference)) / len(texts),
+            "mean_diff": sum(abs(a - b) for a, b in zip(cascade, reference)) / len(texts),
+            # Accuracy on the posts the lexicon answered, which is what the threshold trades off
+            "lexicon_agreement": sum(a == b for a, b in answered) / len(answered) if answered else None,
+        }
+        rows[threshold] = row
+        lexicon_agreement = f"{row['lexicon_agreement']:.1%}" if answered else "-"
+        print(f"{threshold:>9.2f} {row['escalation_rate']:>10.1%} {row['agreement']:>7.1%}"
+              f" {row['within_one']:>9.1%} {row['mean_diff']:>9.3f} {lexicon_agreement:>14}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the cascaded sentiment engine against BERT-only output.")
+    parser.add_argument("--corpus", help="JSON lines of posts (e.g. recorded by benchmarks/bench_pipeline.py)")
+    parser.add_argument("--threshold", type=float, default=SENTIMENT_CASCADE_THRESHOLD,
+                        help="Threshold to check against the tolerances")
+    parser.add_argument("--min-agreement", type=float, default=0.85,
+                        help="Minimum share of star labels identical to BERT-only")
+    parser.add_argument("--max-escalation", type=float, default=0.5,
+                        help="Maximum share of posts sent to the transformer")
+    args = parser.parse_args()
+
+    posts = SAMPLE_POSTS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            posts = [json.loads(line)["text"] for line in f if line.strip()]
+    texts = [text for text in (clean_text(post) for post in posts) if text]
+
+    scorer = LexiconScorer()
+    if scorer.analyzer is None:
+        print("The VADER lexicon isn't installed: python -m nltk.downloader vader_lexicon")
+        sys.exit(1)
+    reference = [result["score"] for result in SentimentAnalyzer().analyze_many(texts)]
+    lexicon = [scorer.score(text) for text in texts]
+
+    rows = report(texts, reference, lexicon, sorted(set(THRESHOLDS) | {args.threshold}))
+    row = rows[args.threshold]
+    if row["agreement"] < args.min_agreement or row["escalation_rate"] > args.max_escalation:
+        print(f"Threshold {args.threshold} is outside tolerance.")
+        sys.exit(1)
+    print(f"Threshold {args.threshold} is within tolerance.")
+
+
+if __name__ == "__main__":
+    main()
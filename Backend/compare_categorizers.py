@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+# Compare model output only, not whatever an earlier run left in the on-disk cache
+os.environ.setdefault("RESULT_CACHE_PATH", "")
+
+from app.ml.categorizer import Categorizer, EmbeddingCategorizer
+
+# Typical trend names produced by detect_trends, with the category we expect
+SAMPLE_TOPICS = {
+    "iphone": "Technology", "openai": "Technology", "linux": "Technology", "python": "Technology",
+    "election": "Politics", "senate": "Politics", "congress": "Politics", "trump": "Politics",
+    "football": "Sports", "nba": "Sports", "worldcup": "Sports", "olympics": "Sports",
+    "netflix": "Entertainment", "movie": "Entertainment", "concert": "Entertainment", "oscars": "Entertainment",
+    "bitcoin": "Finance", "stocks": "Finance", "inflation": "Finance", "crypto": "Finance",
+    "nasa": "Science", "climate": "Science", "vaccine": "Science", "physics": "Science",
+    "vacation": "Travel", "airport": "Travel", "flights": "Travel", "tokyo": "Travel",
+    "recipe": "Food", "pizza": "Food", "coffee": "Food", "vegan": "Food",
+    "fitness": "Lifestyle", "fashion": "Lifestyle", "wellness": "Lifestyle", "skincare": "Lifestyle",
+}
+
+def compare():
+    topics = list(SAMPLE_TOPICS)
+
+    print("Loading zero-shot categorizer...")
+    zero_shot = Categorizer()
+    start = time.perf_counter()
+    zero_shot_labels = zero_shot.categorize_many(topics)
+    zero_shot_time = time.perf_counter() - start
+
+    print("Loading embedding categorizer...")
+    embedding = EmbeddingCategorizer()
+    start = time.perf_counter()
+    embedding_labels = embedding.categorize_many(topics)
+    embedding_time = time.perf_counter() - start
+
+    print(f"{'topic':<12} {'expected':<14} {'zero-shot':<14} {'embedding':<14}")
+    for topic, zs, emb in zip(topics, zero_shot_labels, embedding_labels):
+        marker = "" if zs == emb else "  *"
+        print(f"{topic:<12} {SAMPLE_TOPICS[topic]:<14} {zs:<14} {emb:<14}{marker}")
+
+    total = len(topics)
+    agreement = sum(zs == emb for zs, emb in zip(zero_shot_labels, embedding_labels))
+    zero_shot_correct = sum(zs == SAMPLE_TOPICS[t] for t, zs in zip(topics, zero_shot_labels))
+    embedding_correct = sum(emb == SAMPLE_TOPICS[t] for t, emb in zip(topics, embedding_labels))
+
+    print(f"Agreement with zero-shot: {agreement}/{total} ({agreement / total:.0%})")
+    print(f"Zero-shot accuracy: {zero_shot_correct}/{total} ({zero_shot_correct / total:.0%}) in {zero_shot_time:.2f}s")
+    print(f"Embedding accuracy: {embedding_correct}/{total} ({embedding_correct / total:.0%}) in {embedding_time:.2f}s")
+
+if __name__ == "__main__":
+    compare()
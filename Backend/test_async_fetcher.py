@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.api import bluesky_client
+from app.api.async_bluesky_client import AsyncBlueskyFetcher
+
+
+class StubError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class StubBluesky:
+    """Fakes the parts of atproto.AsyncClient the fetcher uses: login and search_posts."""
+
+    def __init__(self, pages_per_query=3, per_page=5, failures=None):
+        self.pages_per_query = pages_per_query
+        self.per_page = per_page
+        self.failures = list(failures or [])  # status codes raised by the next calls
+        self.logins = 0
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = SimpleNamespace(bsky=SimpleNamespace(feed=SimpleNamespace(search_posts=self.search_posts)))
+
+    async def login(self, handle, password):
+        self.logins += 1
+
+    async def search_posts(self, params):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                raise StubError(self.failures.pop(0), {"retry-after": "0"})
+
+            page = int(params.get("cursor") or 0)
+            posts = [
+                SimpleNamespace(
+                    uri=f"at://{params['q']}/{page}-{i}",
+                    record=SimpleNamespace(text=f"{params['q']} post {page}-{i}", created_at="2026-01-01T00:00:00Z"),
+                    like_count=i,
+                    repost_count=None,
+                )
+                for i in range(self.per_page)
+            ]
+            cursor = str(page + 1) if page + 1 < self.pages_per_query else None
+            return SimpleNamespace(posts=posts, cursor=cursor)
+        finally:
+            self.in_flight -= 1
+
+
+def make_fetcher(stub, **kwargs):
+    return AsyncBlueskyFetcher(client_factory=lambda: stub, credentials=("handle", "password"),
+                               backoff_seconds=0, **kwargs)
+
+
+def test_fetch_posts_pages_until_limit():
+    stub = StubBluesky()
+    posts = asyncio.run(make_fetcher(stub).fetch_posts("tech", limit=12))
+
+    assert len(posts) == 12
+    assert posts[0] == {"uri": "at://tech/0-0", "text": "tech post 0-0", "created_at": "2026-01-01T00:00:00Z", "likes": 0, "reposts": 0}
+    assert stub.calls == 3
+
+
+def test_fetch_many_logs_in_once_and_bounds_concurrency():
+    stub = StubBluesky()
+    fetcher = make_fetcher(stub, max_concurrency=2)
+    results = asyncio.run(fetcher.fetch_many(["a", "b", "c", "d"], limit=15))
+
+    assert {q: len(p) for q, p in results.items()} == {"a": 15, "b": 15, "c": 15, "d": 15}
+    assert all(post["text"].startswith(f"{q} ") for q, posts in results.items() for post in posts)
+    assert stub.logins == 1
+    assert stub.max_in_flight == 2
+
+
+def test_retries_rate_limits_and_relogs_on_401():
+    stub = StubBluesky(pages_per_query=1, failures=[429, 500, 401])
+    fetcher = make_fetcher(stub)
+    posts = asyncio.run(fetcher.fetch_posts("tech", limit=5))
+
+    assert len(posts) == 5
+    assert stub.logins == 2
+
+
+def test_gives_up_after_max_retries():
+    stub = StubBluesky(failures=[500] * 10)
+    posts = asyncio.run(make_fetcher(stub, max_retries=2).fetch_posts("tech", limit=5))
+
+    assert posts == []
+    assert stub.calls == 3
+
+
+def test_sync_fetch_relogs_once_on_expired_session():
+    class SyncStub:
+        def __init__(self, failures):
+            self.failures = list(failures)
+            self.app = SimpleNamespace(bsky=SimpleNamespace(feed=SimpleNamespace(search_posts=self.search_posts)))
+
+        def search_posts(self, params):
+            if self.failures:
+                raise StubError(self.failures.pop(0))
+            post = SimpleNamespace(uri="at://tech/0", record=SimpleNamespace(text="tech post", created_at=""),
+                                   like_count=3, repost_count=1)
+            return SimpleNamespace(posts=[post], cursor=None)
+
+    refreshes = []
+    stub = SyncStub([401])
+
+    def get_client(refresh=False):
+        refreshes.append(refresh)
+        return stub
+
+    original = bluesky_client.get_client
+    bluesky_client.get_client = get_client
+    try:
+        posts = bluesky_client.fetch_public_posts(limit=5, query="tech")
+        assert [post["likes"] for post in posts] == [3]
+        assert refreshes == [False, True]
+
+        # A second rejection right after logging in again ends the fetch instead of looping
+        stub.failures = [401, 401]
+        refreshes.clear()
+        assert bluesky_client.fetch_public_posts(limit=5, query="tech") == []
+        assert refreshes == [False, True]
+    finally:
+        bluesky_client.get_client = original
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"{name}: ok")
@@ -0,0 +1,96 @@
+import sys
+import os
+
+import numpy as np
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.batch import PostBatch
+from app.trends.trend_engine import detect_trends_vectorized
+from app.trends.velocity import detect_trends_by_velocity
+
+
+def make_post(i, text, likes=0, reposts=0, duplicate_count=1, sentiment=0.0, label=None):
+    return {
+        "id": f"p{i}", "uri": f"at://x/{i}", "original_text": text.upper(), "cleaned_text": text,
+        "created_at": f"2026-01-01T00:{i:02d}:00Z", "likes": likes, "reposts": reposts,
+        "engagement_score": likes + 2 * reposts, "duplicate_count": duplicate_count,
+        "sentiment_score": sentiment, "sentiment_label": label,
+    }
+
+
+POSTS = [
+    make_post(0, "rust is fast #rust", likes=3, sentiment=1.0, label="4 stars"),
+    make_post(1, "python and rust", reposts=2, duplicate_count=3, sentiment=-1.0, label="2 stars"),
+    make_post(2, "nothing here"),
+    make_post(3, "python python #python", likes=1, reposts=1, sentiment=2.0, label="5 stars"),
+    make_post(4, "rust rust #rust", likes=5, sentiment=0.0, label="3 stars"),
+]
+TOPICS = {"rust": 0, "python": 1}
+
+
+def test_group_by_topic():
+    batch = PostBatch.from_posts(POSTS)
+    batch.set_topics([["rust"], ["python", "rust"], [], ["python"], ["rust"]], TOPICS)
+    assert batch.assigned().tolist() == [0, 1, 3, 4]
+
+    stats = batch.group_by_topic(2)
+    # A collapsed post counts duplicate_count times, with its own sentiment
+    assert stats["post_count"].tolist() == [1 + 3 + 1, 3 + 1]
+    assert stats["engagement_score"].tolist() == [3 + 4 + 5, 4 + 3]
+    assert stats["sentiment_sum"].tolist() == [1.0 - 3.0 + 0.0, -3.0 + 2.0]
+
+
+def test_group_by_category_counts_posts_once():
+    batch = PostBatch.from_posts(POSTS)
+    batch.set_topics([["rust"], ["python", "rust"], [], ["python"], ["rust"]], TOPICS)
+
+    # Both topics in one category: post 1 is in two of its topics but counts once
+    stats = batch.group_by_category(np.array([0, 0]), 1)
+    assert stats["post_count"].tolist() == [1 + 3 + 1 + 1]
+    assert stats["engagement_score"].tolist() == [3 + 4 + 3 + 5]
+    assert stats["sentiment_sum"].tolist() == [1.0 - 3.0 + 2.0 + 0.0]
+
+    # One category per topic: the same as grouping by topic
+    stats = batch.group_by_category(np.array([0, 1]), 2)
+    by_topic = batch.group_by_topic(2)
+    assert all(stats[key].tolist() == by_topic[key].tolist() for key in stats)
+
+
+def test_to_records():
+    batch = PostBatch.from_posts(POSTS)
+    batch.set_topics([["rust"], ["python", "rust"], [], ["python"], ["rust"]], TOPICS)
+    records = batch.to_records([1, 3], ["id-rust", "id-python"])
+    assert [record["id"] for record in records] == ["p1", "p3"]
+    assert records[0]["topic_id"] == "id-python"
+    assert records[0]["topic_ids"] == ["id-python", "id-rust"]
+    assert records[0]["text"] == "PYTHON AND RUST"
+    assert records[0]["duplicate_count"] == 3
+    assert records[1]["engagement_score"] == 3
+    # Plain Python values, so the records serialize to JSON as they are
+    assert type(records[1]["sentiment_score"]) is float and type(records[1]["likes"]) is int
+    assert batch.to_records([], ["id-rust", "id-python"]) == []
+
+
+def test_trends_read_batch_columns():
+    posts = [make_post(i, text, likes=i) for i, text in enumerate(
+        ["#rust release today", "rust compiler news", "python release", "#rust again",
+         "python python tips", "python packaging", "release notes rust"] * 3
+    )]
+    batch = PostBatch.from_posts(posts)
+    as_dicts = [
+        {"text": p["cleaned_text"], "likes": p["likes"], "reposts": p["reposts"], "created_at": p["created_at"]}
+        for p in posts
+    ]
+    assert detect_trends_vectorized(batch, top_n=5) == detect_trends_vectorized(as_dicts, top_n=5)
+    assert detect_trends_by_velocity(batch, top_n=5) == detect_trends_by_velocity(as_dicts, top_n=5)
+    assert batch.trend_posts() == as_dicts
+
+
+if __name__ == "__main__":
+    test_group_by_topic()
+    test_group_by_category_counts_posts_once()
+    test_to_records()
+    test_trends_read_batch_columns()
+    print("PostBatch tests passed.")
@@ -0,0 +1,109 @@
+import sys
+import os
+import shutil
+import tempfile
+
+import nltk
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.ml.cascade import CascadeSentimentAnalyzer, LexiconScorer
+
+# A few entries in the VADER lexicon format (word, mean rating, std, ratings)
+LEXICON = {"love": 3.2, "great": 3.1, "good": 1.9, "hate": -2.7, "terrible": -2.1, "smiling": 1.6, "broke": -1.0}
+
+
+class FakeCache:
+    def stats(self):
+        return {"memory_items": 0}
+
+
+class FakeModel:
+    """Stands in for SentimentAnalyzer: every text it sees is neutral, and it records what it saw."""
+
+    def __init__(self):
+        self.cache = FakeCache()
+        self.seen = []
+
+    def analyze_many(self, texts, batch_size=32):
+        self.seen.extend(texts)
+        return [{"score": 0, "label": "Neutral"} for _ in texts]
+
+
+def make_scorer():
+    # NLTK only opens resources under its data path, so the lexicon goes in a temporary one
+    data_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(data_dir, "sentiment"))
+    with open(os.path.join(data_dir, "sentiment", "test_lexicon.txt"), "w") as f:
+        # No trailing newline: VADER parses every line, including an empty last one
+        f.write("\n".join(f"{word}\t{rating}\t0.5\t[]" for word, rating in LEXICON.items()))
+    nltk.data.path.insert(0, data_dir)
+    try:
+        return LexiconScorer("sentiment/test_lexicon.txt")
+    finally:
+        nltk.data.path.remove(data_dir)
+        shutil.rmtree(data_dir)
+
+
+def test_lexicon_confidence():
+    scorer = make_scorer()
+    score, confidence = scorer.score("love this so much great")
+    assert score == 2 and confidence > 0.6
+    score, confidence = scorer.score("i hate this terrible update")
+    assert score < 0 and confidence > 0.6
+    # No sentiment words, mixed sentiment and long posts are left to the transformer
+    assert scorer.score("the meeting is at noon") == (0, 0.0)
+    assert scorer.score("love the design but the update broke everything and i hate it")[1] < 0.6
+    assert scorer.score("love " * 40) == (0, 0.0)
+    # Demojized emoji are split into words
+    assert scorer.score("smiling_face_with_hearteyes")[0] > 0
+
+
+def test_cascade_escalates_uncertain_posts():
+    model = FakeModel()
+    cascade = CascadeSentimentAnalyzer(model, scorer=make_scorer(), threshold=0.6)
+    texts = ["love this so much great", "the meeting is at noon", "i hate this terrible update", ""]
+    results = cascade.analyze_many(texts)
+
+    assert results[0] == {"score": 2, "label": "Very Positive"}
+    assert results[2]["score"] < 0
+    assert results[1] == {"score": 0, "label": "Neutral"}
+    assert model.seen == ["the meeting is at noon", ""]
+
+    stats = cascade.cache.stats()
+    assert stats["memory_items"] == 0
+    assert stats["cascade"]["lexicon_answered"] == 2
+    assert stats["cascade"]["escalation_rate"] == 0.5
+
+
+def test_threshold_and_audit():
+    model = FakeModel()
+    # Nothing is confident enough at threshold 1: everything goes to the model
+    cascade = CascadeSentimentAnalyzer(model, scorer=make_scorer(), threshold=1.01)
+    cascade.analyze_many(["love this so much great", "i hate this terrible update"])
+    assert len(model.seen) == 2
+
+    model = FakeModel()
+    cascade = CascadeSentimentAnalyzer(model, scorer=make_scorer(), threshold=0.6, audit_rate=1.0)
+    results = cascade.analyze_many(["love this so much great"])
+    # Audited answers still come from the lexicon; the model's answer only feeds the agreement stat
+    assert results[0]["score"] == 2
+    assert model.seen == ["love this so much great"]
+    assert cascade.stats()["audited"] == 1 and cascade.stats()["audit_agreement"] == 0.0
+
+
+def test_missing_lexicon_escalates_everything():
+    scorer = LexiconScorer("sentiment/nonexistent_lexicon.txt")
+    assert scorer.analyzer is None
+    model = FakeModel()
+    CascadeSentimentAnalyzer(model, scorer=scorer).analyze_many(["love this so much great"])
+    assert model.seen == ["love this so much great"]
+
+
+if __name__ == "__main__":
+    test_lexicon_confidence()
+    test_cascade_escalates_uncertain_posts()
+    test_threshold_and_audit()
+    test_missing_lexicon_escalates_everything()
+    print("Cascade sentiment tests passed.")
@@ -0,0 +1,57 @@
+import os
+import random
+import re
+import sys
+
+import emoji
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.preprocessing.cleaner import clean_text, clean_many
+
+
+def reference_clean_text(text):
+    # The original four-pass clean_text, kept as the compatibility reference
+    if not text:
+        return ""
+    text = re.sub(r'http\S+', '', text)
+    text = emoji.demojize(text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.lower()
+
+
+PIECES = [
+    "Hello", "WORLD", "don't", "#AI", "@user", "https://t.co/x?y=1", "http://a.b/🔥c", "xhttp://mid", "http",
+    "🔥", "❤️", "👩‍💻", "1️⃣", "café", "Straße", "İstanbul", "naïve", "日本語", "ß", "ǅ", "_under_score_",
+    "tab\there", "v\x0btab", "\x1c\x1f", " ", " ", "　", " ", "\x85", "...", "—", "$100", "50%",
+    "", " ", "\n\n",
+]
+
+
+def make_texts(n, seed=11):
+    rng = random.Random(seed)
+    texts = [None, "", "   ", " "]
+    for _ in range(n):
+        parts = [rng.choice(PIECES) for _ in range(rng.randint(1, 10))]
+        texts.append(rng.choice(["", " ", "\t"]).join(parts) if rng.random() < 0.3 else " ".join(parts))
+    return texts
+
+
+def test_clean_text_matches_reference():
+    for text in make_texts(3000):
+        assert clean_text(text) == reference_clean_text(text), repr(text)
+
+
+def test_clean_many_matches_clean_text():
+    texts = make_texts(3000, seed=5) + ["plain ascii post https://x.y about #tech!"] * 50
+    expected = [reference_clean_text(text) for text in texts]
+    assert clean_many(texts, engine="python") == expected
+    assert clean_many(texts, engine="arrow") == expected
+
+
+if __name__ == "__main__":
+    test_clean_text_matches_reference()
+    test_clean_many_matches_clean_text()
+    print("clean_text and clean_many match the reference cleaner.")
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.preprocessing.dedup import cluster_near_duplicates, collapse_duplicates
+
+SPAM = "win a free iphone today just click the link in our bio and share with friends"
+
+
+def post(text, likes=0, reposts=0):
+    return {"cleaned_text": text, "likes": likes, "reposts": reposts, "engagement_score": likes + 2 * reposts}
+
+
+def test_near_duplicates_share_a_cluster():
+    texts = [
+        SPAM,
+        "the senate passed the climate bill after a long debate on energy policy",
+        SPAM + " now",
+        SPAM,
+        "new python release brings a faster interpreter and better error messages",
+    ]
+    assert cluster_near_duplicates(texts) == [0, 1, 0, 0, 4]
+
+
+def test_collapse_keeps_the_most_engaged_copy_with_cluster_totals():
+    posts = [post(SPAM, likes=1), post("an unrelated post about football scores tonight", likes=5), post(SPAM, likes=10, reposts=2)]
+    collapsed = collapse_duplicates(posts)
+
+    assert [p["likes"] for p in collapsed] == [5, 11]
+    spam = collapsed[1]
+    assert spam is posts[2]
+    assert spam["duplicate_count"] == 2
+    assert spam["engagement_score"] == 11 + 2 * 2
+    assert posts[0]["duplicate_of"] is spam
+    assert collapsed[0]["duplicate_count"] == 1
+
+
+if __name__ == "__main__":
+    test_near_duplicates_share_a_cluster()
+    test_collapse_keeps_the_most_engaged_copy_with_cluster_totals()
+    print("Dedup tests passed.")
@@ -0,0 +1,96 @@
+import sys
+import os
+import random
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.trends.heavy_hitters import HeavyHitterSketch
+from app.trends.trend_detector import count_terms, detect_trends
+
+
+def make_corpus(n_posts, vocabulary=3000, seed=0):
+    """Posts with a Zipf-like vocabulary: a few terms are common, most are rare."""
+    rng = random.Random(seed)
+    words = [f"term{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676 % 26)}" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    posts = []
+    for _ in range(n_posts):
+        terms = rng.choices(words, weights=weights, k=6)
+        text = " ".join(terms[:5]) + f" #{terms[5]}"
+        posts.append({"text": text, "likes": rng.randint(0, 20), "reposts": rng.randint(0, 5)})
+    return posts
+
+
+def exact_weights(posts):
+    hashtags, keywords, engagement = count_terms(posts)
+    freq = hashtags + keywords
+    return {term: 10 * count + engagement[term] for term, count in freq.items()}, freq, engagement
+
+
+def test_exact_when_vocabulary_fits():
+    posts = make_corpus(2000, vocabulary=300)
+    sketch = HeavyHitterSketch(capacity=1000).add_posts(posts, chunk_size=len(posts))
+    assert sketch.error == 0
+    assert sketch.top(top_n=20, exclude={"termaaa"}) == detect_trends(posts, top_n=20, exclude={"termaaa"})
+
+    # Counted in chunks, every score is still exact (only the order of ties can differ)
+    chunked = HeavyHitterSketch(capacity=1000).add_posts(posts, chunk_size=150)
+    assert dict(chunked.top(top_n=1000)) == dict(detect_trends(posts, top_n=1000))
+
+
+def test_error_bounds():
+    posts = make_corpus(5000)
+    weights, freq, engagement = exact_weights(posts)
+    sketch = HeavyHitterSketch(capacity=200).add_posts(posts, chunk_size=500)
+
+    assert len(sketch.terms) <= 200
+    assert 0 < sketch.error <= sketch.total / 201
+    assert sketch.total == sum(weights.values())
+    for term, (_, estimated_freq, estimated_engagement, _) in sketch.terms.items():
+        # Never overestimated, and underestimated by at most D
+        assert 0 <= freq[term] - estimated_freq <= sketch.error / 10
+        assert 0 <= engagement[term] - estimated_engagement <= sketch.error
+    # Every term heavier than D is held
+    assert all(term in sketch.terms for term, weight in weights.items() if weight > sketch.error)
+
+    # The exact top trends are found, with scores within D / 10
+    approximate = dict(sketch.top(top_n=10))
+    for term, score in detect_trends(posts, top_n=10):
+        assert 0 <= score - approximate[term] <= sketch.error / 10
+
+
+def test_merge_shards():
+    posts = make_corpus(4000)
+    weights, _, _ = exact_weights(posts)
+    shards = [HeavyHitterSketch(capacity=200).add_posts(posts[i::4], chunk_size=300) for i in range(4)]
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+    assert merged.total == sum(weights.values())
+    assert len(merged.terms) <= 200 and merged.error <= merged.total / 201
+    assert all(term in merged.terms for term, weight in weights.items() if weight > merged.error)
+    assert [term for term, _ in merged.top(top_n=5)] == [term for term, _ in detect_trends(posts, top_n=5)]
+
+
+def test_serialization():
+    sketch = HeavyHitterSketch(capacity=300).add_posts(make_corpus(3000))
+    data = sketch.to_bytes()
+    restored = HeavyHitterSketch.from_bytes(data)
+    assert restored.terms == sketch.terms
+    assert (restored.capacity, restored.total, restored.error) == (sketch.capacity, sketch.total, sketch.error)
+    assert len(data) < 20 * len(sketch.terms)
+    assert HeavyHitterSketch.from_bytes(HeavyHitterSketch(capacity=5).to_bytes()).terms == {}
+    try:
+        HeavyHitterSketch.from_bytes(b"not a sketch")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_exact_when_vocabulary_fits()
+    test_error_bounds()
+    test_merge_shards()
+    test_serialization()
+    print("Heavy-hitter sketch tests passed.")
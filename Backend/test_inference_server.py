@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.ml.inference_server import InferenceError, InferenceServer, RemoteModel
+
+
+class FakeSentiment:
+    def __init__(self):
+        self.calls = []
+
+    def analyze_many(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return [{"score": len(text) % 5 - 2, "label": text} for text in texts]
+
+
+class FakeCategorizer:
+    def categorize_many(self, texts):
+        return [text.upper() for text in texts]
+
+
+def start_server(models, **kwargs):
+    path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    loop = asyncio.new_event_loop()
+    server = InferenceServer(models, **kwargs)
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(path), loop).result(timeout=5)
+    return path
+
+
+def test_remote_models_match_local_results():
+    sentiment = FakeSentiment()
+    path = start_server({"sentiment": sentiment, "categorizer": FakeCategorizer()})
+
+    remote = RemoteModel("sentiment", path)
+    texts = ["good", "bad news", "good", ""]
+    assert remote.analyze_many(texts) == sentiment.analyze_many(texts)
+    assert remote.analyze_many([]) == []
+    assert RemoteModel("categorizer", path).categorize_many(["ai", "nba"]) == ["AI", "NBA"]
+    assert "batches" in remote.cache.stats()
+
+    try:
+        RemoteModel("missing", path).analyze("x")
+        assert False, "expected InferenceError"
+    except InferenceError:
+        pass
+
+
+def test_concurrent_requests_share_a_batch():
+    sentiment = FakeSentiment()
+    path = start_server({"sentiment": sentiment}, max_batch=64, max_latency_ms=200)
+    remote = RemoteModel("sentiment", path)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: remote.analyze_many([f"post {i}", "shared"]), range(8)))
+
+    assert [result[0]["label"] for result in results] == [f"post {i}" for i in range(8)]
+    # Eight requests arriving within the latency budget go through the model together, duplicates once
+    assert len(sentiment.calls) < 8
+    assert sum(call.count("shared") for call in sentiment.calls) == len(sentiment.calls)
+
+
+if __name__ == "__main__":
+    test_remote_models_match_local_results()
+    test_concurrent_requests_share_a_batch()
+    print("Inference server tests passed.")
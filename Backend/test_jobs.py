@@ -0,0 +1,61 @@
+import sys
+import os
+import asyncio
+import threading
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.jobs import JobManager, DONE, FAILED
+
+
+def blocking_runner(release):
+    def run(**params):
+        release.wait(5)
+        return {"params": params}
+    return run
+
+
+def test_cancelled_queued_job_is_not_reused():
+    release = threading.Event()
+    manager = JobManager(workers=1, runner=blocking_runner(release))
+    running = manager.submit(q=1)
+    queued = manager.submit(q=2)
+    # Cancelling the shared future while it is still queued used to leave it in _in_flight for good
+    assert queued.future.cancel()
+    assert queued.status == FAILED
+
+    retry = manager.submit(q=2)
+    assert retry is not queued
+    release.set()
+    assert retry.future.result(5).status == DONE
+    assert running.future.result(5).status == DONE
+    assert retry.result == {"params": {"q": 2}}
+
+
+def test_cancelled_waiter_does_not_cancel_job():
+    release = threading.Event()
+    manager = JobManager(workers=1, runner=blocking_runner(release))
+    manager.submit(q=1)
+    queued = manager.submit(q=2)
+
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(manager.wait(queued))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_waiter())
+    assert not queued.future.cancelled()
+    assert manager.submit(q=2) is queued
+    release.set()
+    assert queued.future.result(5).status == DONE
+
+
+if __name__ == "__main__":
+    test_cancelled_queued_job_is_not_reused()
+    test_cancelled_waiter_does_not_cancel_job()
+    print("Job manager tests passed.")
@@ -0,0 +1,70 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app import metrics
+
+
+def test_timed_run_collects_stages_and_model_calls():
+    registry = metrics.MetricsRegistry()
+    original = metrics.registry
+    metrics.registry = registry
+    try:
+        @metrics.timed_run
+        def run():
+            with metrics.stage("clean", items=3):
+                pass
+            with metrics.stage("sentiment") as stage:
+                metrics.record_model_call("sentiment", 2)
+                metrics.record_model_call("sentiment", 1)
+                stage.items = 3
+            return {"posts": []}
+
+        result = run()
+    finally:
+        metrics.registry = original
+
+    timings = result["timings"]
+    assert [s["stage"] for s in timings["stages"]] == ["clean", "sentiment"]
+    assert timings["stages"][1]["items"] == 3
+    assert timings["models"]["sentiment"] == {"calls": 2, "items": 3, "max_batch_size": 2}
+    assert "peak_rss_bytes" not in timings["stages"][0]
+
+    text = registry.render()
+    assert 'pipeline_stage_duration_seconds_count{stage="clean"} 1' in text
+    assert 'pipeline_stage_items_total{stage="sentiment"} 3' in text
+    assert 'model_calls_total{model="sentiment"} 2' in text
+
+
+def test_stage_reports_its_own_memory_change():
+    if metrics.current_rss_bytes() is None:
+        return  # No /proc on this platform
+
+    @metrics.timed_run
+    def run():
+        with metrics.stage("allocate"):
+            # Touch every page so it is resident
+            held = bytearray(b"x" * (64 * 1024 * 1024))
+        with metrics.stage("after"):
+            pass
+        return {"held": len(held)}
+
+    stages = {record["stage"]: record for record in run()["timings"]["stages"]}
+    assert stages["allocate"]["rss_delta_bytes"] >= 32 * 1024 * 1024
+    # Later stages no longer repeat the largest stage's figure
+    assert abs(stages["after"]["rss_delta_bytes"]) < 16 * 1024 * 1024
+
+
+def test_model_calls_outside_a_run_only_hit_the_registry():
+    before = metrics.registry.model_calls["test-model"]
+    metrics.record_model_call("test-model", 4)
+    assert metrics.registry.model_calls["test-model"] == before + 1
+
+
+if __name__ == "__main__":
+    test_timed_run_collects_stages_and_model_calls()
+    test_model_calls_outside_a_run_only_hit_the_registry()
+    test_stage_reports_its_own_memory_change()
+    print("Metrics tests passed.")
@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app import parallel
+from app.preprocessing.cleaner import clean_many
+from app.trends.heavy_hitters import detect_trends_sketched
+from app.trends.trend_detector import detect_trends
+
+WORDS = ("python rust golang cloud security election climate football music bitcoin market science "
+         "space rocket coffee travel release update").split()
+EXTRAS = ["#Python", "#rust", "https://example.com/x", "@someone", "🚀", "café", "!!!", "AI"]
+
+
+def make_posts(n_posts=400, seed=0):
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n_posts):
+        tokens = rng.choices(WORDS, k=rng.randint(3, 8)) + rng.choices(EXTRAS, k=rng.randint(0, 2))
+        rng.shuffle(tokens)
+        posts.append({"text": " ".join(tokens), "likes": rng.randint(0, 20), "reposts": rng.randint(0, 5)})
+    return posts
+
+
+def test_parallel_matches_serial():
+    posts = make_posts()
+    texts = [post["text"] for post in posts]
+    workers = parallel.PIPELINE_WORKERS
+    parallel.PIPELINE_WORKERS = 2
+    try:
+        # Workers are spawned, so they only run app code; shards are merged in order
+        assert parallel.clean_many(texts) == clean_many(texts)
+        trends = detect_trends(posts, top_n=10)
+        assert len(trends) == 10 and parallel.detect_trends(posts, top_n=10) == trends
+        assert parallel.detect_trends(posts, top_n=5, exclude={"python"}) == detect_trends(
+            posts, top_n=5, exclude={"python"})
+        assert parallel.detect_trends_sketched(posts, top_n=10) == detect_trends_sketched(posts, top_n=10)
+    finally:
+        if parallel._executor is not None:
+            parallel._executor.shutdown()
+            parallel._executor = None
+        parallel.PIPELINE_WORKERS = workers
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    print("Parallel pipeline tests passed.")
@@ -0,0 +1,87 @@
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.storage.post_store import PostStore
+
+
+def make_post(i, text=None, likes=0, reposts=0, hour=0):
+    return {"uri": f"at://x/{i}", "text": text or f"post {i}", "created_at": f"2026-01-01T{hour:02d}:{i:02d}:00Z",
+            "likes": likes, "reposts": reposts}
+
+
+def open_store():
+    directory = tempfile.mkdtemp()
+    return PostStore(os.path.join(directory, "posts.sqlite3")), directory
+
+
+def analysed(post, score=1.0):
+    return {**post, "cleaned_text": post["text"].lower(), "sentiment_score": score,
+            "sentiment_label": "4 stars", "topic_names": ["rust"]}
+
+
+def test_upsert_refreshes_engagement_and_keeps_analysis():
+    store, directory = open_store()
+    try:
+        post = make_post(1, likes=1)
+        store.add_posts([post], "tech")
+        store.save_analysis([analysed(post)])
+        # The same post comes back from the API with more likes
+        store.add_posts([make_post(1, likes=9, reposts=2)], "tech")
+        stored = store.recent_posts("tech", 10)
+        assert len(stored) == 1
+        assert (stored[0]["likes"], stored[0]["reposts"]) == (9, 2)
+        assert stored[0]["sentiment_score"] == 1.0 and stored[0]["cleaned_text"] == "post 1"
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_edited_text_clears_analysis():
+    store, directory = open_store()
+    try:
+        post = make_post(1)
+        store.add_posts([post], "tech")
+        store.save_analysis([analysed(post)])
+        store.add_posts([make_post(1, text="edited post")], "tech")
+        stored = store.recent_posts("tech", 10)[0]
+        assert stored["text"] == "edited post"
+        assert stored["cleaned_text"] is None and stored["sentiment_score"] is None
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_recent_posts_order_and_limit():
+    store, directory = open_store()
+    try:
+        store.add_posts([make_post(i) for i in (3, 1, 4, 2)], "tech")
+        store.add_posts([make_post(9)], "news")
+        assert [post["uri"] for post in store.recent_posts("tech", 3)] == ["at://x/4", "at://x/3", "at://x/2"]
+        assert [post["uri"] for post in store.recent_posts("news", 3)] == ["at://x/9"]
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_fetch_since_backfills_and_refreshes():
+    store, directory = open_store()
+    try:
+        assert store.fetch_since("tech", 10) is None
+        store.add_posts([make_post(i, hour=5) for i in range(10)], "tech")
+        # Fewer posts stored than asked for: fetch the newest ones again to backfill
+        assert store.fetch_since("tech", 200) is None
+        # Enough stored: continue from an hour before the newest post (05:09)
+        assert store.fetch_since("tech", 10) == "2026-01-01T04:09:00Z"
+        assert store.fetch_since("tech", 10, refresh_seconds=0) == "2026-01-01T05:09:00Z"
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_upsert_refreshes_engagement_and_keeps_analysis()
+    test_edited_text_clears_analysis()
+    test_recent_posts_order_and_limit()
+    test_fetch_since_backfills_and_refreshes()
+    print("Post store tests passed.")
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.progress import PipelineCancelled, ProgressReporter, format_event, stream_events
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def parse(message):
+    lines = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_reporter_stops_after_cancel():
+    events = []
+    reporter = ProgressReporter(lambda event, data: events.append(event))
+    reporter.emit("topics", {})
+    reporter.cancelled.set()
+    try:
+        reporter.emit("posts", {})
+        assert False, "emit after cancel should raise"
+    except PipelineCancelled:
+        pass
+    assert events == ["topics"]
+
+
+def test_format_event():
+    assert format_event("topics", {"topics": []}) == 'event: topics\ndata: {"topics": []}\n\n'
+
+
+def test_stream_events_in_order():
+    def run(progress, query):
+        progress.emit("topics", {"topics": [query]})
+        progress.emit("posts", {"posts": [1, 2]})
+        return {"categories": [], "topics": [], "posts": []}
+
+    async def collect():
+        return [parse(message) async for message in stream_events(run, FakeRequest(), query="tech")]
+
+    events = asyncio.run(collect())
+    assert [event for event, _ in events] == ["topics", "posts", "result"]
+    assert events[0][1] == {"topics": ["tech"]}
+
+
+def test_stream_events_error():
+    def run(progress):
+        raise RuntimeError("fetch failed")
+
+    async def collect():
+        return [parse(message) async for message in stream_events(run, FakeRequest())]
+
+    assert asyncio.run(collect()) == [("error", {"detail": "fetch failed"})]
+
+
+def test_disconnect_cancels_run():
+    release = threading.Event()
+    stopped = threading.Event()
+
+    def run(progress):
+        progress.emit("topics", {})
+        release.wait(5)
+        try:
+            progress.emit("posts", {})
+        except PipelineCancelled:
+            stopped.set()
+            raise
+
+    async def consume():
+        events = stream_events(run, FakeRequest())
+        first = await events.__anext__()
+        # Client goes away after the first event: the server closes the generator
+        await events.aclose()
+        release.set()
+        return first
+
+    assert parse(asyncio.run(consume()))[0] == "topics"
+    assert stopped.wait(5)
+
+
+if __name__ == "__main__":
+    test_reporter_stops_after_cancel()
+    test_format_event()
+    test_stream_events_in_order()
+    test_stream_events_error()
+    test_disconnect_cancels_run()
+    print("Progress streaming tests passed.")
@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.ml.registry import FAILED, READY, ModelRegistry, require_loaded
+
+
+class SentimentAnalyzer:
+    """Shaped like app.ml.sentiment.SentimentAnalyzer: is_loaded is False when the pipeline failed to load."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+
+    @property
+    def is_loaded(self):
+        return self.analyzer is not None
+
+
+def test_wrapper_without_pipeline_fails_the_load():
+    registry = ModelRegistry()
+    registry.register("sentiment", lambda: require_loaded(SentimentAnalyzer(None)))
+    try:
+        registry.get("sentiment")
+        assert False, "expected the load to fail"
+    except RuntimeError:
+        pass
+    assert registry.status()["sentiment"]["state"] == FAILED
+    assert not registry.is_ready() and registry.has_failed()
+
+
+def test_loaded_wrapper_is_ready():
+    registry = ModelRegistry()
+    registry.register("sentiment", lambda: require_loaded(SentimentAnalyzer(object())))
+    registry.get("sentiment")
+    assert registry.status()["sentiment"]["state"] == READY
+    assert registry.is_ready()
+
+
+def test_failed_load_is_retried_after_backoff():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("model files missing")
+        return object()
+
+    registry = ModelRegistry()
+    registry.register("sentiment", factory)
+    for _ in range(3):
+        try:
+            registry.get("sentiment")
+            assert False, "expected the load to fail"
+        except (OSError, RuntimeError):
+            pass
+    # Requests during the backoff fail fast instead of loading again
+    assert len(calls) == 1
+    status = registry.status()["sentiment"]
+    assert status["state"] == FAILED and status["failures"] == 1 and status["retry_at"] is not None
+
+    registry._status["sentiment"]["retry_at"] = 0
+    registry.get("sentiment")
+    assert len(calls) == 2 and registry.is_ready() and not registry.has_failed()
+
+
+if __name__ == "__main__":
+    test_wrapper_without_pipeline_fails_the_load()
+    test_loaded_wrapper_is_ready()
+    test_failed_load_is_retried_after_backoff()
+    print("Model registry tests passed.")
@@ -0,0 +1,81 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.ml.cache import ResultCache
+
+
+def open_dir():
+    directory = tempfile.mkdtemp()
+    return os.path.join(directory, "cache.sqlite3"), directory
+
+
+def test_persists_across_instances():
+    path, directory = open_dir()
+    try:
+        ResultCache("model-a", path=path).set_many([("hello", {"score": 1}), ("bye", {"score": -1})])
+
+        cache = ResultCache("model-a", path=path)
+        assert cache.get_many(["hello", "bye", "new"]) == [{"score": 1}, {"score": -1}, None]
+        assert cache.stats()["disk_items"] == 2
+        # Results are namespaced by model
+        assert ResultCache("model-b", path=path).get("hello") is None
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_disk_hits_are_promoted_to_memory():
+    path, directory = open_dir()
+    try:
+        ResultCache("model", path=path).set("hello", {"score": 2})
+
+        cache = ResultCache("model", path=path)
+        assert cache.get("hello") == {"score": 2}
+        assert cache.get("hello") == {"score": 2}
+        stats = cache.stats()
+        assert (stats["disk_hits"], stats["memory_hits"], stats["memory_items"]) == (1, 1, 1)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache("model", path="", memory_max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == [1, None, 3]
+    assert cache.stats()["memory_items"] == 2
+
+
+def test_disk_tier_evicts_least_recently_used():
+    path, directory = open_dir()
+    try:
+        writer = ResultCache("model", path=path, memory_max_items=0, disk_max_items=2)
+        writer.set("a", 1)
+        time.sleep(0.01)
+        writer.set("b", 2)
+        time.sleep(0.01)
+        # Reading "a" from disk refreshes its access time, so "b" goes first
+        assert writer.get("a") == 1
+        time.sleep(0.01)
+        writer.set("c", 3)
+
+        cache = ResultCache("model", path=path)
+        assert cache.get_many(["a", "b", "c"]) == [1, None, 3]
+        assert cache.stats()["disk_items"] == 2
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_persists_across_instances()
+    test_disk_hits_are_promoted_to_memory()
+    test_memory_tier_evicts_least_recently_used()
+    test_disk_tier_evicts_least_recently_used()
+    print("Result cache tests passed.")
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.results import RunView
+
+
+def make_view(n_posts=5):
+    return RunView({
+        "categories": [{"id": "c1", "name": "Technology"}],
+        "topics": [{"id": "t1", "name": "rust", "category_id": "c1"}],
+        "posts": [
+            {"id": f"p{i}", "topic_id": "t1", "text": f"post {i}", "sentiment_score": 0, "posted_at": None}
+            for i in range(n_posts)
+        ],
+    })
+
+
+def test_topic_posts_pages():
+    view = make_view()
+    page = view.topic_posts("t1", page_size=2)
+    assert [post["id"] for post in page["items"]] == ["p0", "p1"]
+    assert page["total"] == 5 and page["next_cursor"] == "2"
+    last = view.topic_posts("t1", cursor="4", page_size=2)
+    assert [post["id"] for post in last["items"]] == ["p4"] and last["next_cursor"] is None
+
+
+def test_invalid_cursors_are_rejected():
+    view = make_view()
+    for cursor in ("abc", "-5", "6"):
+        try:
+            view.topic_posts("t1", cursor=cursor)
+            assert False, f"expected cursor {cursor} to be rejected"
+        except ValueError as e:
+            assert str(e) == "Invalid cursor"
+    # The end of the list is a valid (empty) page
+    assert view.topic_posts("t1", cursor="5")["items"] == []
+
+
+if __name__ == "__main__":
+    test_topic_posts_pages()
+    test_invalid_cursors_are_rejected()
+    print("RunView tests passed.")
@@ -0,0 +1,101 @@
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.storage.rollups import RollupStore, TOPIC, CATEGORY
+from app.trends.velocity import parse_timestamp
+
+CATEGORIES = {"rust": "Technology", "python": "Technology", "football": "Sports"}
+SINCE = parse_timestamp("2026-01-01T00:00:00Z")
+UNTIL = parse_timestamp("2026-01-02T00:00:00Z")
+
+
+def make_post(i, hour, topics, likes=0, sentiment=0.0):
+    return {
+        "uri": f"at://x/{i}", "created_at": f"2026-01-01T{hour:02d}:{i % 60:02d}:00Z",
+        "topic_names": topics, "engagement_score": likes, "sentiment_score": sentiment,
+    }
+
+
+def open_store():
+    directory = tempfile.mkdtemp()
+    return RollupStore(os.path.join(directory, "rollups.sqlite3")), directory
+
+
+def test_hourly_rollups():
+    store, directory = open_store()
+    try:
+        store.upsert([
+            make_post(0, 9, ["rust"], likes=3, sentiment=2.0),
+            make_post(1, 9, ["rust", "python"], likes=1, sentiment=-1.0),
+            make_post(2, 10, ["rust"], likes=4, sentiment=0.0),
+            make_post(3, 10, ["football"], likes=7, sentiment=1.0),
+            make_post(4, 10, []),
+        ], CATEGORIES)
+
+        hours = store.series(TOPIC, "rust", SINCE, UNTIL)
+        assert [hour["hour"] for hour in hours] == ["2026-01-01T09:00:00Z", "2026-01-01T10:00:00Z"]
+        assert hours[0]["post_count"] == 2 and hours[0]["engagement_sum"] == 4
+        assert hours[0]["avg_sentiment"] == 0.5
+        assert hours[0]["sentiment_distribution"]["extreme_positive"] == 1
+        assert hours[0]["sentiment_distribution"]["negative"] == 1
+
+        # A post with two topics in the same category counts once for the category
+        technology = store.series(CATEGORY, "Technology", SINCE, UNTIL)
+        assert [hour["post_count"] for hour in technology] == [2, 1]
+
+        totals = store.totals(CATEGORY, SINCE, UNTIL)
+        assert [(row["name"], row["post_count"]) for row in totals] == [("Technology", 3), ("Sports", 1)]
+        assert store.totals(TOPIC, SINCE, SINCE + 3600 * 9) == []
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_rerun_replaces_contributions():
+    store, directory = open_store()
+    try:
+        posts = [make_post(0, 9, ["rust"], likes=3, sentiment=2.0), make_post(1, 9, ["rust"], likes=1)]
+        store.upsert(posts, CATEGORIES)
+        # The same posts in the next run: nothing changes
+        assert store.upsert(posts, CATEGORIES) == 0
+        assert store.series(TOPIC, "rust", SINCE, UNTIL)[0]["post_count"] == 2
+
+        # Re-analysed with more likes and a new topic: the old contribution is replaced
+        store.upsert([make_post(1, 9, ["python"], likes=5, sentiment=-2.0)], CATEGORIES)
+        rust = store.series(TOPIC, "rust", SINCE, UNTIL)[0]
+        python = store.series(TOPIC, "python", SINCE, UNTIL)[0]
+        assert (rust["post_count"], rust["engagement_sum"]) == (1, 3)
+        assert (python["post_count"], python["engagement_sum"], python["avg_sentiment"]) == (1, 5, -2.0)
+        assert store.series(CATEGORY, "Technology", SINCE, UNTIL)[0]["post_count"] == 2
+
+        # A post that no longer matches a topic drops out, and so do empty hours
+        store.upsert([make_post(0, 9, []), make_post(1, 9, [])], CATEGORIES)
+        assert store.series(TOPIC, "rust", SINCE, UNTIL) == []
+        assert store.totals(CATEGORY, SINCE, UNTIL) == []
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_duplicates_count_through_representative():
+    store, directory = open_store()
+    try:
+        representative = make_post(0, 9, ["rust"], likes=6, sentiment=1.0)
+        representative["duplicate_count"] = 3
+        copies = [dict(make_post(i, 9, ["rust"], likes=2), duplicate_of=representative) for i in (1, 2)]
+        store.upsert([representative] + copies, CATEGORIES)
+        rust = store.series(TOPIC, "rust", SINCE, UNTIL)[0]
+        assert (rust["post_count"], rust["engagement_sum"], rust["avg_sentiment"]) == (3, 6, 1.0)
+        assert rust["sentiment_distribution"]["positive"] == 3
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_hourly_rollups()
+    test_rerun_replaces_contributions()
+    test_duplicates_count_through_representative()
+    print("Rollup tests passed.")
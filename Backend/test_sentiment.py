@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+# Keep the sentiment cache in memory for the test
+os.environ["RESULT_CACHE_PATH"] = ""
+
+from app.ml.cache import ResultCache
+from app.ml.sentiment import SentimentAnalyzer
+
+
+class FakePipeline:
+    """Stands in for the transformers pipeline: n words -> n stars (capped at 5), recording each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    @staticmethod
+    def _label(text):
+        return {"label": f"{min(5, len(text.split()))} stars", "score": 0.9}
+
+    def __call__(self, texts, batch_size=None, truncation=False):
+        if isinstance(texts, str):
+            return [self._label(texts)]
+        self.batches.append(list(texts))
+        return [self._label(text) for text in texts]
+
+
+def make_analyzer():
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    analyzer.analyzer = FakePipeline()
+    analyzer.backend = "pytorch"
+    analyzer.cache = ResultCache("test-sentiment", path="")
+    return analyzer
+
+
+TEXTS = [
+    "one two three four five six",
+    "one",
+    "",
+    "one two three",
+    "one two",
+    "one two three four",
+    "a much longer post that goes on and on about many things",
+]
+
+
+def test_batches_are_length_sorted():
+    analyzer = make_analyzer()
+    analyzer.analyze_many(TEXTS, batch_size=2)
+
+    batches = analyzer.analyzer.batches
+    assert all(len(batch) <= 2 for batch in batches)
+    lengths = [len(text) for batch in batches for text in batch]
+    assert lengths == sorted(lengths)
+    # Empty texts never reach the model
+    assert sum(len(batch) for batch in batches) == len(TEXTS) - 1
+
+
+def test_results_in_input_order():
+    analyzer = make_analyzer()
+    results = analyzer.analyze_many(TEXTS, batch_size=2)
+
+    assert len(results) == len(TEXTS)
+    assert [result["score"] for result in results] == [2, -2, 0, 0, -1, 1, 2]
+    assert results[1]["label"] == "Very Negative" and results[2]["label"] == "Neutral"
+    # Matches scoring the texts one at a time
+    assert results == [analyzer.analyze(text) for text in TEXTS]
+
+
+def test_cached_texts_skip_the_model():
+    analyzer = make_analyzer()
+    first = analyzer.analyze_many(TEXTS, batch_size=4)
+    calls = len(analyzer.analyzer.batches)
+
+    assert analyzer.analyze_many(list(reversed(TEXTS)), batch_size=4) == list(reversed(first))
+    assert len(analyzer.analyzer.batches) == calls
+
+
+if __name__ == "__main__":
+    test_batches_are_length_sorted()
+    test_results_in_input_order()
+    test_cached_texts_skip_the_model()
+    print("Sentiment analyzer tests passed.")
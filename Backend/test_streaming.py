@@ -0,0 +1,99 @@
+import sys
+import os
+import asyncio
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app import streaming
+
+
+class FakeFetcher:
+    """Stands in for AsyncBlueskyFetcher: counts fetches and fails while `failing` is set."""
+
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.fetches = []
+
+    async def fetch_posts(self, query, limit):
+        self.fetches.append(query)
+        await asyncio.sleep(0.01)
+        if self.failing:
+            raise RuntimeError("fetch failed")
+        return []
+
+
+def reset(fetcher):
+    for query in list(streaming._streams):
+        streaming._stop(query)
+    streaming._starting.clear()
+    streaming._fetcher = fetcher
+
+
+def test_failed_first_fetch_is_not_registered():
+    fetcher = FakeFetcher(failing=True)
+
+    async def run():
+        reset(fetcher)
+        try:
+            await streaming.get_stream("tech")
+            assert False, "expected the fetch error"
+        except RuntimeError:
+            pass
+        assert "tech" not in streaming._streams and "tech" not in streaming._stream_tasks
+
+        # The next caller retries instead of getting an empty, never-polled stream
+        fetcher.failing = False
+        stream = await streaming.get_stream("tech")
+        assert streaming._streams["tech"] is stream and "tech" in streaming._stream_tasks
+        reset(None)
+
+    asyncio.run(run())
+
+
+def test_concurrent_first_callers_share_one_start():
+    fetcher = FakeFetcher()
+
+    async def run():
+        reset(fetcher)
+        streams = await asyncio.gather(*(streaming.get_stream("tech") for _ in range(5)))
+        assert all(stream is streams[0] for stream in streams)
+        assert fetcher.fetches == ["tech"]
+        reset(None)
+
+    asyncio.run(run())
+
+
+def test_streams_are_capped_and_idle_ones_stopped():
+    fetcher = FakeFetcher()
+    max_queries = streaming.STREAM_MAX_QUERIES
+    streaming.STREAM_MAX_QUERIES = 2
+
+    async def run():
+        reset(fetcher)
+        await streaming.get_stream("a")
+        await streaming.get_stream("b")
+        await streaming.get_stream("a")  # "b" is now the least recently used
+        b_task = streaming._stream_tasks["b"]
+        await streaming.get_stream("c")
+        assert set(streaming._streams) == {"a", "c"}
+        await asyncio.sleep(0)
+        assert b_task.cancelled()
+
+        # Streams nobody has read for STREAM_IDLE_SECONDS are stopped on the next start
+        streaming._last_access["a"] -= streaming.STREAM_IDLE_SECONDS + 1
+        await streaming.get_stream("d")
+        assert set(streaming._streams) == {"c", "d"}
+        reset(None)
+
+    try:
+        asyncio.run(run())
+    finally:
+        streaming.STREAM_MAX_QUERIES = max_queries
+
+
+if __name__ == "__main__":
+    test_failed_first_fetch_is_not_registered()
+    test_concurrent_first_callers_share_one_start()
+    test_streams_are_capped_and_idle_ones_stopped()
+    print("Streaming tests passed.")
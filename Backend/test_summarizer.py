@@ -0,0 +1,80 @@
+import os
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+# Keep the summary cache in memory for the test
+os.environ["RESULT_CACHE_PATH"] = ""
+
+from app.ml import summarizer as summarizer_module
+from app.ml.cache import ResultCache
+from app.ml.summarizer import TopicSummarizer, content_fingerprint
+
+
+class FakeTokenizer:
+    def __call__(self, texts, **kwargs):
+        return {"inputs": list(texts)}
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return outputs
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def generate(self, inputs, **kwargs):
+        self.batches.append(inputs)
+        return [f"summary of {text.split()[1]}" for text in inputs]
+
+
+def make_summarizer():
+    summarizer = TopicSummarizer.__new__(TopicSummarizer)
+    summarizer.tokenizer = FakeTokenizer()
+    summarizer.model = FakeModel()
+    summarizer.cache = ResultCache("test-summarizer", path="")
+    return summarizer
+
+
+def test_summaries_are_batched_and_cached_by_content():
+    summarizer = make_summarizer()
+    topics = {"ai": ["ai post one", "ai post two"], "nba": ["nba finals tonight"], "empty": []}
+
+    assert summarizer.summarize_many(topics) == {"ai": "summary of ai", "nba": "summary of nba", "empty": None}
+    assert len(summarizer.model.batches) == 1
+
+    # Same posts in the same order: served from the cache
+    summarizer.summarize_many({"ai": ["ai post one", "ai post two"]})
+    assert len(summarizer.model.batches) == 1
+
+    # Reordered posts change what the model reads, so the topic is regenerated
+    summarizer.summarize_many({"ai": ["ai post two", "ai post one"]})
+    assert summarizer.model.batches[-1] == ["summarize: ai post two ai post one"]
+
+    # A new post changes the fingerprint and regenerates only that topic
+    summarizer.summarize_many({"ai": ["ai post three"], "nba": ["nba finals tonight"]})
+    assert summarizer.model.batches[-1] == ["summarize: ai post three"]
+
+
+def test_budget_skips_uncached_topics():
+    summarizer = make_summarizer()
+    summarizer.summarize_many({"ai": ["ai post"]})
+    result = summarizer.summarize_many({"ai": ["ai post"], "nba": ["nba post"]}, budget_seconds=-1)
+    assert result == {"ai": "summary of ai", "nba": None}
+
+
+def test_input_stops_once_past_the_token_budget():
+    posts = ["word " * 1000] * 10
+    text = TopicSummarizer._input_text(posts)
+    assert len(text) < len(" ".join(posts))
+    assert len(text) >= summarizer_module.MAX_INPUT_TOKENS * summarizer_module.CHARS_PER_TOKEN_BOUND
+    assert content_fingerprint("ai", ["a", "b"]) != content_fingerprint("ai", ["b", "a"])
+    assert content_fingerprint("ai", ["a", "b"]) != content_fingerprint("ai", ["a", "b", "a"])
+
+
+if __name__ == "__main__":
+    test_summaries_are_batched_and_cached_by_content()
+    test_budget_skips_uncached_topics()
+    test_input_stops_once_past_the_token_budget()
+    print("Summarizer tests passed.")
@@ -0,0 +1,62 @@
+import sys
+import os
+import random
+import re
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.preprocessing.cleaner import clean_text
+from app.trends.topic_assigner import TopicAssigner
+
+
+def regex_assign(terms, text, multi_topic=False):
+    """The per-trend assignment TopicAssigner replaces: one whole-word regex per trend, in rank order."""
+    matches = [term for term in terms if re.search(r"\b" + re.escape(term) + r"\b", text)]
+    return matches if multi_topic else matches[:1]
+
+
+def test_whole_words_only():
+    assigner = TopicAssigner(["tech", "rust"])
+    assert assigner.assign("biotech stocks rally") == []
+    assert assigner.assign("trusty rustacean") == []
+    assert assigner.assign("new tech for biotech") == ["tech"]
+    # Hashtags are cleaned to plain words, so they match too
+    assert assigner.assign(clean_text("Loving #Rust today!")) == ["rust"]
+    assert assigner.assign("") == [] and TopicAssigner([]).assign("tech") == []
+
+
+def test_multi_word_trends():
+    assigner = TopicAssigner(["machine learning", "learning", "open source ai"])
+    assert assigner.assign("machine learning is everywhere", multi_topic=True) == ["machine learning", "learning"]
+    assert assigner.assign("learning machine code") == ["learning"]
+    assert assigner.assign("why open source ai wins", multi_topic=True) == ["open source ai"]
+    assert assigner.assign("open source tools") == []
+
+
+def test_priority_order():
+    assigner = TopicAssigner(["election", "football", "rust"])
+    # The most important trend wins, whatever order the words appear in
+    assert assigner.assign("rust football election") == ["election"]
+    assert assigner.assign("rust football election", multi_topic=True) == ["election", "football", "rust"]
+    assert assigner.assign("rust and football") == ["football"]
+
+
+def test_agrees_with_regex_assignment():
+    rng = random.Random(0)
+    terms = ["ai", "rust", "machine learning", "climate", "open source", "tech", "bitcoin", "learning", "nasa"]
+    vocabulary = terms + ["biotech", "trusty", "the", "new", "Machine", "#Climate", "open-source", "AI!",
+                          "learnings", "bitcoins", "space", "launch", "today", "sourcecode", "nasas"]
+    texts = [clean_text(" ".join(rng.choices(vocabulary, k=rng.randint(1, 12)))) for _ in range(2000)]
+    assigner = TopicAssigner(terms)
+    for text in texts:
+        assert assigner.assign(text) == regex_assign(terms, text), text
+        assert assigner.assign(text, multi_topic=True) == regex_assign(terms, text, multi_topic=True), text
+
+
+if __name__ == "__main__":
+    test_whole_words_only()
+    test_multi_word_trends()
+    test_priority_order()
+    test_agrees_with_regex_assignment()
+    print("Topic assigner tests passed.")
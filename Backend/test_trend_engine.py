@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.trends.trend_detector import detect_trends
+from app.trends.trend_engine import detect_trends_vectorized
+
+WORDS = [
+    "python", "rust", "openai", "election", "football", "bitcoin", "climate", "netflix", "coffee",
+    "the", "and", "with", "like", "people", "news", "today", "data", "cloud", "apple", "music",
+    "café", "naïve", "python3", "gpu_cluster", "ai", "tech", "Linux", "AI-powered", "launch",
+]
+HASHTAGS = ["#python", "#AI", "#tech", "#worldcup", "#café", "#ml_ops", "#2026", "#bitcoin", "#news", "##dup"]
+
+
+def make_corpus(n_posts, seed=7):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n_posts):
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(0, 12))]
+        tokens += [rng.choice(HASHTAGS) for _ in range(rng.randint(0, 3))]
+        rng.shuffle(tokens)
+        posts.append({
+            "text": " ".join(tokens) + rng.choice(["", "!", " https://x.co/abc", "..."]),
+            "likes": rng.randint(0, 50),
+            "reposts": rng.randint(0, 20),
+        })
+    return posts
+
+
+def test_matches_detect_trends():
+    for n_posts in (0, 1, 5, 50, 500):
+        posts = make_corpus(n_posts, seed=n_posts)
+        for top_n in (0, 1, 5, 20, 1000):
+            for exclude in (None, {"tech"}, {"python", "bitcoin"}):
+                expected = detect_trends(posts, top_n=top_n, exclude=exclude)
+                assert detect_trends_vectorized(posts, top_n=top_n, exclude=exclude) == expected
+
+
+def test_matches_on_score_ties():
+    # Equal scores must keep detect_trends' first-seen order
+    posts = [{"text": t, "likes": 0, "reposts": 0} for t in ["gamma beta alpha"] * 3 + ["#zeta #eta"]]
+    assert detect_trends_vectorized(posts, top_n=10) == detect_trends(posts, top_n=10)
+
+
+if __name__ == "__main__":
+    test_matches_detect_trends()
+    test_matches_on_score_ties()
+    print("Trend engine matches detect_trends.")
@@ -0,0 +1,72 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(os.getcwd())
+
+from app.trends.velocity import TrendTimeline, detect_trends_by_velocity
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def post(text, minutes):
+    return {"text": text, "likes": 0, "reposts": 0,
+            "created_at": (START + timedelta(minutes=minutes)).isoformat().replace("+00:00", "Z")}
+
+
+def make_posts():
+    posts = []
+    # "football" is steady for two hours; "eclipse" only shows up in the last 15 minutes
+    for minute in range(0, 120, 2):
+        posts.append(post("football match highlights", minute))
+    for minute in range(105, 120):
+        posts.append(post("eclipse photos everywhere", minute))
+        posts.append(post("eclipse tonight", minute))
+    return posts
+
+
+def test_burst_ranks_rising_term_above_steady_one():
+    trends = detect_trends_by_velocity(make_posts(), top_n=5, ranking="burst")
+    names = [name for name, _ in trends]
+    assert names.index("eclipse") < names.index("football")
+    velocity = dict(detect_trends_by_velocity(make_posts(), top_n=5, ranking="velocity"))
+    assert velocity["eclipse"] > 0
+    assert abs(velocity["football"]) < 1
+
+
+def test_timeline_memory_is_bounded_and_ring_wraps():
+    timeline = TrendTimeline(bucket_seconds=60, n_buckets=10)
+    size = timeline.counts.nbytes
+    base = START.timestamp()
+    timeline.add_many((base + i, {f"term{i}": 1}) for i in range(5000))
+    assert timeline.counts.nbytes == size
+
+    timeline = TrendTimeline(bucket_seconds=60, n_buckets=10)
+    timeline.add_many([(base, {"old": 5})])
+    assert timeline.series(["old"])[0, -1] >= 5
+    # Twenty minutes later the old bucket has been reused
+    timeline.add_many([(base + 20 * 60, {"new": 1})])
+    assert timeline.series(["old"]).sum() == 0
+
+
+def test_sketch_rows_hash_independently():
+    timeline = TrendTimeline(width=256, depth=4)
+    # Equal-length terms: with crc32 seeded per row, a collision in row 0 repeated in every row
+    terms = [f"term{i:05d}" for i in range(2000)]
+    columns = timeline._columns(terms)
+    by_column = {}
+    collisions = 0
+    for term, row in zip(terms, columns.tolist()):
+        for other in by_column.get(row[0], []):
+            collisions += 1
+            assert row[1:] != other[1:], f"{term} collides in every row"
+        by_column.setdefault(row[0], []).append(row)
+    assert collisions > 0
+
+
+if __name__ == "__main__":
+    test_burst_ranks_rising_term_above_steady_one()
+    test_timeline_memory_is_bounded_and_ring_wraps()
+    test_sketch_rows_hash_independently()
+    print("Velocity tests passed.")
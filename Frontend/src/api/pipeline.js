@@ -13,7 +13,129 @@ export const fetchPipelineData = async (query = "news") => {
   if (!response.ok) {
     throw new Error('Failed to fetch pipeline data');
   }
-  const data = await response.json();
+  return transformPipelineData(await response.json());
+};
+
+// Same result as fetchPipelineData, but over /pipeline/events: onUpdate gets the partial
+// data each time the server finishes a stage (topics first, then posts as their sentiment
+// is scored, then categories), and the promise resolves with the final data.
+// Aborting the signal closes the stream, which cancels the run on the server.
+export const streamPipelineData = (query = "news", onUpdate = () => {}, signal = null) => {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/pipeline/events?limit=50&query=${encodeURIComponent(query)}`);
+    let topics = [];
+    let categories = [];
+    let posts = [];
+    const update = () => onUpdate(transformPipelineData(partialPipelineData(categories, topics, posts)));
+
+    signal?.addEventListener('abort', () => {
+      source.close();
+      reject(new DOMException('Aborted', 'AbortError'));
+    });
+    source.addEventListener('topics', (e) => {
+      topics = JSON.parse(e.data).topics;
+      update();
+    });
+    source.addEventListener('posts', (e) => {
+      posts = posts.concat(JSON.parse(e.data).posts);
+      update();
+    });
+    source.addEventListener('categories', (e) => {
+      const data = JSON.parse(e.data);
+      categories = data.categories;
+      topics = data.topics;
+      update();
+    });
+    source.addEventListener('result', (e) => {
+      source.close();
+      resolve(transformPipelineData(JSON.parse(e.data)));
+    });
+    // Covers both the server's "error" event and a dropped connection
+    source.addEventListener('error', () => {
+      source.close();
+      reject(new Error('Failed to fetch pipeline data'));
+    });
+  });
+};
+
+// Until the "categories" event, topics only have a name and score: fill in their
+// counts from the posts received so far.
+const partialPipelineData = (categories, topics, posts) => {
+  if (categories.length > 0) return { categories, topics, posts };
+  const partialTopics = topics.map(topic => {
+    const topicPosts = posts.filter(p => p.topic_ids.includes(topic.id));
+    const postCount = topicPosts.reduce((sum, p) => sum + (p.duplicate_count || 1), 0);
+    const sentimentSum = topicPosts.reduce((sum, p) => sum + p.sentiment_score * (p.duplicate_count || 1), 0);
+    return {
+      ...topic,
+      category_id: null,
+      post_count: postCount,
+      engagement_score: topicPosts.reduce((sum, p) => sum + p.engagement_score, 0),
+      avg_sentiment: postCount ? sentimentSum / postCount : 0,
+    };
+  });
+  return { categories, topics: partialTopics, posts };
+};
+
+const transformCategory = (cat) => {
+  const meta = CATEGORY_META[cat.name] || CATEGORY_META["Other"];
+  return {
+    ...cat,
+    total_tweets: cat.total_posts, // Map to frontend expected field
+    icon: meta.icon,
+    color: meta.color,
+    description: `Analysis of ${cat.name} trends`,
+    // relevance_score and avg_sentiment are already present
+  };
+};
+
+// Fills in the fields the topic cards expect from a topic's totals and posting times
+const transformTopic = (topic, { catName, maxEngagement, totalLikes, totalRetweets, times, dist }) => {
+  if (totalLikes === 0 && totalRetweets === 0) {
+    totalLikes = Math.floor((topic.engagement_score || 0) / 2);
+    totalRetweets = Math.floor((topic.engagement_score || 0) / 4);
+  }
+
+  const relevance = Math.round((topic.engagement_score / maxEngagement) * 100);
+
+  let trendDuration = "24h";
+  if (times.length > 0) {
+    const minT = Math.min(...times);
+    const maxT = Math.max(...times);
+    const diffMs = Math.max(0, maxT - minT);
+    const hrs = Math.round(diffMs / 3600000);
+    trendDuration = hrs < 1 ? "<1h" : (hrs < 48 ? `${hrs}h` : `${Math.round(hrs/24)}d`);
+  }
+
+  return {
+    ...topic,
+    total_tweets: topic.post_count,
+    total_likes: totalLikes,
+    total_retweets: totalRetweets,
+    total_replies: 0,
+    trend_duration: trendDuration,
+    is_rising: topic.engagement_score > 5,
+    description: topic.summary || `Viral topic in ${catName}`,
+    relevance_score: relevance,
+    sentiment_distribution: dist
+  };
+};
+
+const transformPost = (post) => ({
+  ...post,
+  content: post.text,
+  likes: post.likes || 0,
+  retweets: post.reposts || 0,
+  replies: 0,
+  author_name: "Bluesky User",
+  author_handle: "@bluesky.user",
+  author_avatar: `https://ui-avatars.com/api/?name=Bluesky+User&background=random`,
+  author_verified: false,
+});
+
+const toTime = (postedAt) => postedAt ? new Date(postedAt).getTime() : null;
+
+const transformPipelineData = (data) => {
   const categoryMap = {};
   data.categories.forEach(c => categoryMap[c.id] = c.name);
   const postsByTopic = {};
@@ -23,22 +145,9 @@ export const fetchPipelineData = async (query = "news") => {
   });
   const maxEngagement = data.topics.reduce((m, t) => Math.max(m, t.engagement_score || 0), 1);
 
-  // Transform Categories
-  const categories = data.categories.map(cat => {
-    const meta = CATEGORY_META[cat.name] || CATEGORY_META["Other"];
-    return {
-      ...cat,
-      total_tweets: cat.total_posts, // Map to frontend expected field
-      icon: meta.icon,
-      color: meta.color,
-      description: `Analysis of ${cat.name} trends`,
-      // relevance_score and avg_sentiment are already present
-    };
-  });
+  const categories = data.categories.map(transformCategory);
 
-  // Transform Topics
   const topics = data.topics.map(topic => {
-    const catName = categoryMap[topic.category_id] || "General";
     const topicPosts = postsByTopic[topic.id] || [];
     const dist = { extreme_negative: 0, negative: 0, neutral: 0, positive: 0, extreme_positive: 0 };
     topicPosts.forEach(p => {
@@ -50,55 +159,56 @@ export const fetchPipelineData = async (query = "news") => {
       else dist.negative++;
     });
 
-    let totalLikes = topicPosts.reduce((sum, p) => sum + (p.likes || 0), 0);
-    let totalRetweets = topicPosts.reduce((sum, p) => sum + (p.reposts || 0), 0);
-    if (totalLikes === 0 && totalRetweets === 0) {
-      totalLikes = Math.floor((topic.engagement_score || 0) / 2);
-      totalRetweets = Math.floor((topic.engagement_score || 0) / 4);
-    }
-
-    const relevance = Math.round((topic.engagement_score / maxEngagement) * 100);
-
-    const times = topicPosts
-      .map(p => p.posted_at ? new Date(p.posted_at).getTime() : null)
-      .filter((t) => typeof t === 'number');
-    let trendDuration = "24h";
-    if (times.length > 0) {
-      const minT = Math.min(...times);
-      const maxT = Math.max(...times);
-      const diffMs = Math.max(0, maxT - minT);
-      const hrs = Math.round(diffMs / 3600000);
-      trendDuration = hrs < 1 ? "<1h" : (hrs < 48 ? `${hrs}h` : `${Math.round(hrs/24)}d`);
-    }
-
-    return {
-      ...topic,
-      total_tweets: topic.post_count,
-      total_likes: totalLikes,
-      total_retweets: totalRetweets,
-      total_replies: 0,
-      trend_duration: trendDuration,
-      is_rising: topic.engagement_score > 5,
-      description: `Viral topic in ${catName}`,
-      relevance_score: relevance,
-      sentiment_distribution: dist
-    };
+    return transformTopic(topic, {
+      catName: categoryMap[topic.category_id] || "General",
+      maxEngagement,
+      totalLikes: topicPosts.reduce((sum, p) => sum + (p.likes || 0), 0),
+      totalRetweets: topicPosts.reduce((sum, p) => sum + (p.reposts || 0), 0),
+      times: topicPosts.map(p => toTime(p.posted_at)).filter((t) => typeof t === 'number'),
+      dist,
+    });
   });
 
-  // Transform Posts
-  const posts = data.posts.map(post => {
-    return {
-      ...post,
-      content: post.text,
-      likes: post.likes || 0,
-      retweets: post.reposts || 0,
-      replies: 0,
-      author_name: "Bluesky User",
-      author_handle: "@bluesky.user",
-      author_avatar: `https://ui-avatars.com/api/?name=Bluesky+User&background=random`,
-      author_verified: false,
-    };
-  });
+  const posts = data.posts.map(transformPost);
 
   return { categories, topics, posts };
-};
\ No newline at end of file
+};
+
+// Categories and topics only, with sentiment distribution and totals computed on the server.
+// The returned job_id identifies the run for fetchTopicPosts.
+export const fetchPipelineSummary = async (query = "news", limit = 50) => {
+  const response = await fetch(`/pipeline/summary?limit=${limit}&query=${encodeURIComponent(query)}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch pipeline summary');
+  }
+  const data = await response.json();
+  const categoryMap = {};
+  data.categories.forEach(c => categoryMap[c.id] = c.name);
+  const maxEngagement = data.topics.reduce((m, t) => Math.max(m, t.engagement_score || 0), 1);
+
+  return {
+    job_id: data.job_id,
+    categories: data.categories.map(transformCategory),
+    topics: data.topics.map(topic => transformTopic(topic, {
+      catName: categoryMap[topic.category_id] || "General",
+      maxEngagement,
+      totalLikes: topic.total_likes || 0,
+      totalRetweets: topic.total_reposts || 0,
+      times: [toTime(topic.first_posted_at), toTime(topic.last_posted_at)].filter((t) => typeof t === 'number'),
+      dist: topic.sentiment_distribution,
+    })),
+  };
+};
+
+// One page of a topic's posts. Pass the previous page's next_cursor to get the next one.
+export const fetchTopicPosts = async (jobId, topicId, { cursor = null, pageSize = 20, fields = null } = {}) => {
+  const params = new URLSearchParams({ page_size: pageSize });
+  if (cursor) params.set('cursor', cursor);
+  if (fields) params.set('fields', fields.join(','));
+  const response = await fetch(`/pipeline/jobs/${jobId}/topics/${topicId}/posts?${params}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch topic posts');
+  }
+  const page = await response.json();
+  return { ...page, items: page.items.map(transformPost) };
+};
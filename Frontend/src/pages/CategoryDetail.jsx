@@ -5,7 +5,7 @@ import { ArrowLeft, TrendingUp, MessageSquare, Cpu, Landmark, Film, Trophy, Hear
 import { Button } from "@/components/ui/button";
 import { Link } from "react-router-dom";
 import { createPageUrl } from "@/utils";
-import { fetchPipelineData } from "@/api/pipeline";
+import { fetchPipelineSummary } from "@/api/pipeline";
 
 import TopicCard from "@/components/dashboard/TopicCard";
 import SentimentChart from "@/components/charts/SentimentChart";
@@ -27,8 +27,8 @@ export default function CategoryDetail() {
   const selectedQuery = urlParams.get('query') || 'news';
 
   const { data, isLoading } = useQuery({
-    queryKey: ['pipeline', selectedQuery],
-    queryFn: () => fetchPipelineData(selectedQuery),
+    queryKey: ['pipeline-summary', selectedQuery],
+    queryFn: () => fetchPipelineSummary(selectedQuery),
     staleTime: 60000,
     refetchOnWindowFocus: false,
   });
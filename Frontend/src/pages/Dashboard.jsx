@@ -1,12 +1,12 @@
 import React, { useState, useEffect } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { motion } from 'framer-motion';
 import { TrendingUp, Hash, MessageSquare, BarChart3, RefreshCw, Sparkles, Heart } from 'lucide-react';
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Link } from "react-router-dom";
 import { createPageUrl } from "@/utils";
-import { fetchPipelineData } from "@/api/pipeline";
+import { streamPipelineData } from "@/api/pipeline";
 
 import StatsCard from "@/components/dashboard/StatsCard";
 import CategoryCard from "@/components/dashboard/CategoryCard";
@@ -18,9 +18,16 @@ export default function Dashboard() {
   const initialQuery = params.get('query') || 'news';
   const [selectedQuery, setSelectedQuery] = useState(initialQuery);
 
+  const queryClient = useQueryClient();
+  // Partial results are written to the cache as they stream in, so topics render
+  // before sentiment and categories are done
   const { data, isLoading, refetch } = useQuery({
     queryKey: ['pipeline', selectedQuery],
-    queryFn: () => fetchPipelineData(selectedQuery),
+    queryFn: ({ signal }) => streamPipelineData(
+      selectedQuery,
+      (partial) => queryClient.setQueryData(['pipeline', selectedQuery], partial),
+      signal
+    ),
   });
 
   const categories = data?.categories || [];
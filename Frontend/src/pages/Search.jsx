@@ -8,7 +8,7 @@ import { Badge } from "@/components/ui/badge";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { Link } from "react-router-dom";
 import { createPageUrl } from "@/utils";
-import { fetchPipelineData } from "@/api/pipeline";
+import { fetchPipelineSummary } from "@/api/pipeline";
 
 import TopicCard from "@/components/dashboard/TopicCard";
 import CategoryCard from "@/components/dashboard/CategoryCard";
@@ -31,8 +31,8 @@ export default function Search() {
   }, [searchQuery]);
 
   const { data, isLoading } = useQuery({
-    queryKey: ['pipeline', selectedQuery],
-    queryFn: () => fetchPipelineData(selectedQuery),
+    queryKey: ['pipeline-summary', selectedQuery],
+    queryFn: () => fetchPipelineSummary(selectedQuery),
   });
 
   const categories = data?.categories || [];
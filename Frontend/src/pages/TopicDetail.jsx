@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { motion } from 'framer-motion';
 import { ArrowLeft, TrendingUp, Clock, Flame, Bookmark, Download, Heart, Repeat2, MessageCircle } from 'lucide-react';
 import { Button } from "@/components/ui/button";
@@ -12,7 +12,7 @@ import TweetCard from "@/components/dashboard/TweetCard";
 import SentimentChart from "@/components/charts/SentimentChart";
 import EngagementChart from "@/components/charts/EngagementChart";
 
-import { fetchPipelineData } from "@/api/pipeline";
+import { fetchPipelineSummary, fetchTopicPosts } from "@/api/pipeline";
 import { Skeleton } from "@/components/ui/skeleton";
 
 export default function TopicDetail() {
@@ -22,15 +22,24 @@ export default function TopicDetail() {
   const selectedQuery = urlParams.get('query') || 'news';
   const [isSaving] = useState(false);
 
+  // Topic totals come from the summary; posts are paged in from the same run
   const { data, isLoading } = useQuery({
-    queryKey: ['pipeline', selectedQuery],
-    queryFn: () => fetchPipelineData(selectedQuery),
+    queryKey: ['pipeline-summary', selectedQuery],
+    queryFn: () => fetchPipelineSummary(selectedQuery),
   });
 
   const topic = data?.topics.find(t => t.id === topicId);
-  const tweets = data?.posts.filter(p => p.topic_id === topicId) || [];
   const category = data?.categories.find(c => c.id === topic?.category_id);
 
+  const postsQuery = useInfiniteQuery({
+    queryKey: ['topic-posts', data?.job_id, topicId],
+    queryFn: ({ pageParam }) => fetchTopicPosts(data.job_id, topicId, { cursor: pageParam }),
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    enabled: !!topic,
+  });
+  const tweets = postsQuery.data?.pages.flatMap(page => page.items) || [];
+
   const saveReportMutation = useMutation({
     mutationFn: async () => {
       const reportData = {
@@ -234,7 +243,7 @@ export default function TopicDetail() {
             <h2 className="text-xl font-bold text-slate-900 mb-6">
               Top Tweets
             </h2>
-            {isLoading ? (
+            {postsQuery.isLoading ? (
               <div className="space-y-4">
                 {[1, 2, 3].map((i) => (
                   <div key={i} className="h-40 bg-slate-100 rounded-xl animate-pulse" />
@@ -249,6 +258,17 @@ export default function TopicDetail() {
                 {tweets.map((tweet, index) => (
                   <TweetCard key={tweet.id} tweet={tweet} index={index} />
                 ))}
+                {postsQuery.hasNextPage && (
+                  <div className="text-center">
+                    <Button
+                      variant="outline"
+                      onClick={() => postsQuery.fetchNextPage()}
+                      disabled={postsQuery.isFetchingNextPage}
+                    >
+                      {postsQuery.isFetchingNextPage ? 'Loading...' : 'Load more'}
+                    </Button>
+                  </div>
+                )}
               </div>
             )}
           </div>